@@ -0,0 +1,8 @@
+"""Resolver benchmarks against synthetic package universes.
+
+Run ``python -m benchmarks --help`` from the project root for the options.
+"""
+from benchmarks.runner import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+from typing import Callable, Dict, Iterable, List, Optional
+
+from pdm._types import CandidateInfo
+from pdm.exceptions import CandidateInfoNotFound
+from pdm.models.candidates import Candidate
+from pdm.models.environment import Environment
+from pdm.models.repositories import BaseRepository
+from pdm.models.requirements import Requirement
+from pdm.models.specifiers import PySpecSet, parse_version_tuple
+
+from benchmarks.universe import Universe
+
+
+class SyntheticRepository(BaseRepository):
+    """A repository serving packages from a generated universe, fully offline."""
+
+    def __init__(self, universe: Universe, environment: Environment) -> None:
+        super().__init__([], environment)
+        self.universe = universe
+
+    def _get_dependencies_from_universe(self, candidate: Candidate) -> CandidateInfo:
+        try:
+            release = self.universe[candidate.req.key][candidate.version]
+        except KeyError:
+            raise CandidateInfoNotFound(candidate)
+        deps = list(release["dependencies"])
+        for extra in candidate.req.extras or ():
+            deps.extend(release.get("extras_require", {}).get(extra, []))
+        return deps, release["requires_python"], ""
+
+    def dependency_generators(self) -> Iterable[Callable[[Candidate], CandidateInfo]]:
+        return (
+            self._get_dependencies_from_lockfile,
+            self._get_dependencies_from_universe,
+        )
+
+    def get_hashes(self, candidate: Candidate) -> Dict[str, str]:
+        return {}
+
+    def _find_named_matches(
+        self,
+        requirement: Requirement,
+        requires_python: PySpecSet = PySpecSet(),
+        allow_prereleases: Optional[bool] = None,
+        allow_all: bool = False,
+    ) -> List[Candidate]:
+        cans = []
+        for version, release in self.universe.get(requirement.key, {}).items():
+            if not requirement.specifier.contains(version, allow_prereleases):
+                continue
+            can = Candidate(
+                requirement, self.environment, name=requirement.key, version=version
+            )
+            can._requires_python = PySpecSet(release["requires_python"])
+            if allow_all or requires_python.is_subset(can.requires_python):
+                cans.append(can)
+        return sorted(cans, key=lambda c: parse_version_tuple(c.version))
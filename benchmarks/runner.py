@@ -0,0 +1,181 @@
+import argparse
+import itertools
+import json
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+from pdm.context import context
+from pdm.exceptions import ResolutionImpossible, ResolutionTooDeep
+from pdm.models.candidates import identify
+from pdm.models.requirements import parse_requirement
+from pdm.models.specifiers import PySpecSet
+from pdm.project import Project
+from pdm.resolver import RESOLVER_ENGINES, BaseProvider, SimpleReporter, resolve
+
+from benchmarks.repository import SyntheticRepository
+from benchmarks.universe import Universe, generate_universe, pick_roots
+
+
+class QuietReporter(SimpleReporter):
+    def starting(self) -> None:
+        pass
+
+    def ending_round(self, index, state) -> None:
+        pass
+
+    def ending(self, state) -> None:
+        pass
+
+
+def _resolve_once(
+    project: Project,
+    universe: Universe,
+    roots: List[str],
+    engine: str,
+    requires_python: str,
+    prefetch_workers: int,
+) -> Dict[str, Any]:
+    repository = SyntheticRepository(universe, project.environment)
+    requirements = {"default": {}}
+    for line in roots:
+        req = parse_requirement(line)
+        requirements["default"][identify(req)] = req
+    python = PySpecSet(requires_python)
+    provider = BaseProvider(repository, python, prefetch_workers=prefetch_workers)
+    reporter = QuietReporter(
+        list(itertools.chain.from_iterable(r.values() for r in requirements.values()))
+    )
+    profiler = context.profiler
+    profiler.enable()
+    error = None  # type: Optional[str]
+    start = time.perf_counter()
+    try:
+        mapping, *_ = resolve(provider, reporter, requirements, python, engine)
+    except (ResolutionImpossible, ResolutionTooDeep) as e:
+        mapping, error = {}, type(e).__name__
+    finally:
+        elapsed = time.perf_counter() - start
+        profiler.disable()
+    counters = profiler.counters
+    return {
+        "time": elapsed,
+        "resolved": len(mapping),
+        "rounds": counters["rounds"],
+        "pins": counters["pins"],
+        "backtracks": counters["backtracks"],
+        "error": error,
+    }
+
+
+def run_benchmark(
+    universe: Universe,
+    roots: List[str],
+    engine: str = "rounds",
+    requires_python: str = ">=3.7",
+    repeat: int = 3,
+    prefetch_workers: int = 0,
+    trace_memory: bool = True,
+) -> Dict[str, Any]:
+    """Resolve the roots against the universe and measure the resolution.
+
+    The time is the best of ``repeat`` runs. Memory is traced in an extra run as
+    tracing slows the resolution down considerably.
+    """
+    with tempfile.TemporaryDirectory() as root:
+        project = Project(root)
+        project.config["cache_dir"] = root
+        runs = [
+            _resolve_once(
+                project, universe, roots, engine, requires_python, prefetch_workers
+            )
+            for _ in range(repeat)
+        ]
+        result = min(runs, key=lambda run: run["time"])
+        result["engine"] = engine
+        result["times"] = [run["time"] for run in runs]
+        result["peak_memory"] = None
+        if trace_memory:
+            tracemalloc.start()
+            try:
+                _resolve_once(
+                    project, universe, roots, engine, requires_python, prefetch_workers
+                )
+                result["peak_memory"] = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+    return result
+
+
+def _format_result(result: Dict[str, Any]) -> str:
+    peak = result["peak_memory"]
+    return (
+        f"{result['engine']:<13}{result['time']:>9.3f}s"
+        f"{'-' if peak is None else f'{peak / 2 ** 20:.1f}MiB':>11}"
+        f"{result['rounds']:>8}{result['pins']:>8}{result['backtracks']:>11}"
+        f"{result['resolved']:>10}  {result['error'] or 'ok'}"
+    )
+
+
+def main(args: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Benchmark the resolver against a synthetic package universe.",
+    )
+    parser.add_argument("--packages", type=int, default=2000)
+    parser.add_argument("--versions", type=int, default=10)
+    parser.add_argument("--depth", type=int, default=8)
+    parser.add_argument("--max-dependencies", type=int, default=6)
+    parser.add_argument("--roots", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--engine",
+        action="append",
+        choices=sorted(RESOLVER_ENGINES),
+        help="The resolver engine to run, can be given multiple times. "
+        "Default: all engines.",
+    )
+    parser.add_argument("--requires-python", default=">=3.7")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--prefetch-workers", type=int, default=0)
+    parser.add_argument(
+        "--no-memory",
+        dest="trace_memory",
+        action="store_false",
+        help="Don't run the extra pass to trace the peak memory.",
+    )
+    parser.add_argument(
+        "--json", action="store_true", help="Print the results as JSON."
+    )
+    options = parser.parse_args(args)
+
+    universe = generate_universe(
+        options.packages,
+        options.versions,
+        options.depth,
+        options.max_dependencies,
+        options.seed,
+    )
+    roots = pick_roots(universe, options.roots, options.seed)
+    results = [
+        run_benchmark(
+            universe,
+            roots,
+            engine,
+            options.requires_python,
+            options.repeat,
+            options.prefetch_workers,
+            options.trace_memory,
+        )
+        for engine in options.engine or sorted(RESOLVER_ENGINES)
+    ]
+    if options.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(
+        f"{'engine':<13}{'time':>10}{'peak':>11}{'rounds':>8}{'pins':>8}"
+        f"{'backtracks':>11}{'resolved':>10}  result"
+    )
+    for result in results:
+        print(_format_result(result))
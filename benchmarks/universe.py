@@ -0,0 +1,115 @@
+"""Generate synthetic package universes for resolver benchmarks.
+
+A universe is a dictionary in the same shape as ``tests/fixtures/pypi.json``::
+
+    {name: {version: {"requires_python": str,
+                      "dependencies": [str],
+                      "extras_require": {extra: [str]}}}}
+
+Packages are placed in layers and only depend on packages of deeper layers, so
+there are no cycles but lots of diamonds. The constraints are generated to
+always admit the middle version of each package, which keeps every universe
+solvable, while the newer versions tend to pull in conflicting bounds that make
+the resolver work.
+"""
+import random
+import re
+from typing import Any, Dict, List
+
+Universe = Dict[str, Dict[str, Dict[str, Any]]]
+
+MARKERS = [
+    "sys_platform == 'win32'",
+    "os_name == 'posix'",
+    "python_version < '3.8'",
+    "platform_machine == 'x86_64'",
+    "implementation_name == 'cpython'",
+]
+PYTHON_REQUIRES = [">=3.7", ">=3.8", ">=2.7,!=3.0.*,!=3.1.*", "<3.10", ""]
+
+
+def make_version(index: int) -> str:
+    return f"{index // 5 + 1}.{index % 5}"
+
+
+def _make_specifier(rng: random.Random, versions: int) -> str:
+    """Make a specifier that always contains the middle version."""
+    middle = versions // 2
+    kind = rng.random()
+    if kind < 0.3:
+        return ""
+    if kind < 0.6:
+        return f">={make_version(rng.randint(0, middle))}"
+    if kind < 0.8:
+        return f"<{make_version(rng.randint(middle + 1, versions))}"
+    low, high = rng.randint(0, middle), rng.randint(middle + 1, versions)
+    return f">={make_version(low)},<{make_version(high)}"
+
+
+def generate_universe(
+    packages: int = 1000,
+    versions: int = 10,
+    depth: int = 8,
+    max_dependencies: int = 6,
+    seed: int = 0,
+) -> Universe:
+    """Generate a universe of the given size.
+
+    :param packages: the number of packages.
+    :param versions: the number of versions of each package.
+    :param depth: the number of layers, i.e. the depth of the dependency tree.
+    :param max_dependencies: the max number of dependencies of each version.
+    :param seed: the random seed, the same arguments give the same universe.
+    """
+    rng = random.Random(seed)
+    names = [f"pkg-{i:05d}" for i in range(packages)]
+    layers = [names[i::depth] for i in range(depth)]
+    universe = {}  # type: Universe
+    deeper = list(names)
+    for layer in layers:
+        members = set(layer)
+        deeper = [name for name in deeper if name not in members]
+        for name in layer:
+            releases = universe.setdefault(name, {})
+            for index in range(versions):
+                release = {"requires_python": "", "dependencies": []}
+                if index != versions // 2:
+                    release["requires_python"] = rng.choice(PYTHON_REQUIRES)
+                if deeper:
+                    release["dependencies"] = _make_dependencies(
+                        rng, deeper, versions, max_dependencies
+                    )
+                    if rng.random() < 0.2:
+                        release["extras_require"] = {
+                            "extra": _make_dependencies(rng, deeper, versions, 2)
+                        }
+                releases[make_version(index)] = release
+    return universe
+
+
+def _make_dependencies(
+    rng: random.Random, candidates: List[str], versions: int, count: int
+) -> List[str]:
+    dependencies = []
+    for name in rng.sample(candidates, min(len(candidates), rng.randint(0, count))):
+        line = name + _make_specifier(rng, versions)
+        if rng.random() < 0.15:
+            line = line.replace(name, f"{name}[extra]", 1)
+        if rng.random() < 0.2:
+            line += f"; {rng.choice(MARKERS)}"
+        dependencies.append(line)
+    return dependencies
+
+
+def pick_roots(universe: Universe, count: int, seed: int = 0) -> List[str]:
+    """Pick top level requirements from the packages that nothing depends on."""
+    required = set()
+    for releases in universe.values():
+        for release in releases.values():
+            lines = list(release["dependencies"])
+            for extra_lines in release.get("extras_require", {}).values():
+                lines.extend(extra_lines)
+            required.update(re.split(r"[\[<>=;]", line, 1)[0] for line in lines)
+    rng = random.Random(seed)
+    tops = [name for name in sorted(universe) if name not in required]
+    return sorted(rng.sample(tops, min(count, len(tops))))
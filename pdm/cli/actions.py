@@ -12,15 +12,22 @@ import pythonfinder
 import tomlkit
 from pdm.builders import SdistBuilder, WheelBuilder
 from pdm.context import context
-from pdm.exceptions import NoPythonVersion, ProjectError
+from pdm.exceptions import NoPythonVersion, PdmException, ProjectError
 from pdm.installers import Synchronizer, format_dist
 from pdm.models.candidates import Candidate, identify
 from pdm.models.requirements import Requirement, parse_requirement, strip_extras
 from pdm.models.specifiers import bump_version, get_specifier
 from pdm.project import Project
-from pdm.resolver import BaseProvider, EagerUpdateProvider, ReusePinProvider, resolve
+from pdm.resolver import (
+    BaseProvider,
+    EagerUpdateProvider,
+    IncrementalProvider,
+    ReusePinProvider,
+    resolve,
+    resolve_incremental,
+)
 from pdm.resolver.reporters import SpinnerReporter
-from pdm.utils import get_python_version
+from pdm.utils import format_size, get_python_version, parse_size
 
 
 def format_lockfile(mapping, fetched_dependencies, summary_collection):
@@ -97,27 +104,75 @@ def do_lock(
     strategy: str = "all",
     tracked_names: Optional[Iterable[str]] = None,
     requirements: Optional[Dict[str, Dict[str, Requirement]]] = None,
+    engine: str = "rounds",
+    profile: Optional[str] = None,
+    chrome_trace: Optional[str] = None,
+    force: bool = False,
 ) -> Dict[str, Candidate]:
     """Performs the locking process and update lockfile.
 
     :param project: the project instance
-    :param strategy: update stratege: reuse/eager/all
-    :param tracked_names: required when using eager strategy
+    :param strategy: update stratege: reuse/eager/incremental/all
+    :param tracked_names: required when using eager or incremental strategy
     :param requirements: An optional dictionary of requirements, read from pyproject
         if not given.
+    :param engine: the resolver engine to use: rounds/backtracking
+    :param profile: the path to write a JSON report of timings and counters to.
+    :param chrome_trace: the path to write timings in Chrome trace format to.
+    :param force: resolve again even if the resolution fingerprint in lockfile
+        matches.
     """
     check_project_file(project)
+    requirements = requirements or project.all_dependencies
+    fingerprint = project.get_resolution_fingerprint(requirements, engine)
+    # The fingerprint covers neither the packages to update nor the contents of
+    # VCS and local requirements.
+    force = (
+        force
+        or bool(tracked_names)
+        or not all(r.is_named for deps in requirements.values() for r in deps.values())
+    )
+    if not force and project.is_lockfile_fingerprint_match(fingerprint):
+        context.io.echo("Lock file is up to date, skip resolving.")
+        if not project.is_lockfile_hash_match():
+            project.write_lockfile(project.lockfile, False)
+        return project.get_locked_candidates("__all__")
+    lock_args = (project, strategy, tracked_names, requirements, engine, fingerprint)
+    if not profile and not chrome_trace:
+        return _do_lock(*lock_args)
+    profiler = context.profiler
+    profiler.enable()
+    try:
+        return _do_lock(*lock_args)
+    finally:
+        profiler.disable()
+        if profile:
+            profiler.write_report(profile)
+            context.io.echo(f"Profiling report is written to {profile}")
+        if chrome_trace:
+            profiler.write_chrome_trace(chrome_trace)
+            context.io.echo(f"Chrome trace is written to {chrome_trace}")
+
+
+def _do_lock(
+    project: Project,
+    strategy: str,
+    tracked_names: Optional[Iterable[str]],
+    requirements: Dict[str, Dict[str, Requirement]],
+    engine: str,
+    fingerprint: str,
+) -> Dict[str, Candidate]:
     # TODO: multiple dependency definitions for the same package.
     repository = project.get_repository()
-    requirements = requirements or project.all_dependencies
     allow_prereleases = project.allow_prereleases
     requires_python = project.python_requires
     if strategy == "all":
         provider = BaseProvider(repository, requires_python, allow_prereleases)
     else:
-        provider_class = (
-            ReusePinProvider if strategy == "reuse" else EagerUpdateProvider
-        )
+        provider_class = {
+            "reuse": ReusePinProvider,
+            "incremental": IncrementalProvider,
+        }.get(strategy, EagerUpdateProvider)
         preferred_pins = project.get_locked_candidates("__all__")
         provider = provider_class(
             preferred_pins,
@@ -132,12 +187,16 @@ def do_lock(
     # TODO: switch reporter at io level.
     with halo.Halo(text="Resolving dependencies", spinner="dots") as spin:
         reporter = SpinnerReporter(flat_reqs, spin)
-        mapping, dependencies, summaries = resolve(
-            provider, reporter, requirements, requires_python
+        resolve_func = resolve_incremental if strategy == "incremental" else resolve
+        mapping, dependencies, summaries = resolve_func(
+            provider, reporter, requirements, requires_python, engine
         )
-        data = format_lockfile(mapping, dependencies, summaries)
+        with context.profiler.phase("format_lockfile"):
+            data = format_lockfile(mapping, dependencies, summaries)
+        data["root"] = {"resolution_fingerprint": fingerprint}
         spin.succeed("Resolution success")
-    project.write_lockfile(data)
+    with context.profiler.phase("write_lockfile"):
+        project.write_lockfile(data)
 
     return mapping
 
@@ -179,7 +238,7 @@ def do_add(
     section: Optional[str] = None,
     sync: bool = True,
     save: str = "compatible",
-    strategy: str = "reuse",
+    strategy: str = "incremental",
     editables: Iterable[str] = (),
     packages: Iterable[str] = (),
 ) -> None:
@@ -190,7 +249,7 @@ def do_add(
     :param section: specify section to be add to
     :param sync: whether to install added packages
     :param save: save strategy
-    :param strategy: update strategy
+    :param strategy: update strategy (reuse/eager/incremental)
     :param editables: editable requirements
     :param packages: normal requirements
     """
@@ -217,11 +276,12 @@ def do_add(
     all_dependencies.setdefault(section, {}).update(requirements)
     resolved = do_lock(project, strategy, tracked_names, all_dependencies)
 
-    # Update dependency specifiers and lockfile hash.
+    # Update dependency specifiers, lockfile hash and resolution fingerprint.
     save_version_specifiers(requirements, resolved, save)
     project.add_dependencies(requirements)
     lockfile = project.lockfile
     lockfile["root"]["content_hash"] = "md5:" + project.get_content_hash("md5")
+    lockfile["root"]["resolution_fingerprint"] = project.get_resolution_fingerprint()
     project.write_lockfile(lockfile, False)
 
     if sync:
@@ -268,7 +328,7 @@ def do_update(
                 "--unconstrained must be used with package names given."
             )
         # pdm update with no packages given, same as 'lock' + 'sync'
-        do_lock(project)
+        do_lock(project, force=True)
         do_sync(project, sections, dev, default, clean=False)
         return
     section = sections[0] if sections else ("dev" if dev else "default")
@@ -300,14 +360,16 @@ def do_update(
             ", ".join(context.io.green(v, bold=True) for v in tracked_names)
         )
     )
-    resolved = do_lock(project, strategy, tracked_names, all_dependencies)
+    resolved = do_lock(project, strategy, tracked_names, all_dependencies, force=True)
     do_sync(project, sections=(section,), default=False, clean=False)
     if unconstrained:
         # Need to update version constraints
         save_version_specifiers(updated_deps, resolved, save)
         project.add_dependencies(updated_deps)
         lockfile = project.lockfile
+        fingerprint = project.get_resolution_fingerprint()
         lockfile["root"]["content_hash"] = "md5:" + project.get_content_hash("md5")
+        lockfile["root"]["resolution_fingerprint"] = fingerprint
         project.write_lockfile(lockfile, False)
 
 
@@ -357,7 +419,7 @@ def do_remove(
         del deps[matched_name]
 
     project.write_pyproject()
-    do_lock(project, "reuse")
+    do_lock(project, "incremental")
     if sync:
         do_sync(project, sections=(section,), default=False, clean=True)
 
@@ -497,3 +559,41 @@ def do_info(
         context.io.echo(project.root.as_posix())
     if env:
         context.io.echo(json.dumps(project.environment.marker_environment, indent=2))
+
+
+def do_cache_info(project: Project) -> None:
+    """Show the size and hit rate of each bucket in the cache directory."""
+    rows = []
+    for bucket in context.cache_manager.get_info():
+        accesses = bucket["hits"] + bucket["misses"]
+        hit_rate = f"{bucket['hits'] / accesses:.0%}" if accesses else "-"
+        rows.append(
+            (
+                context.io.green(bucket["name"], bold=True),
+                format_size(bucket["size"]),
+                str(bucket["files"]),
+                hit_rate,
+            )
+        )
+    context.io.echo(
+        f"{context.io.cyan('Cache Directory:', bold=True)} "
+        f"{context.cache_dir.as_posix()}"
+    )
+    context.io.display_columns(rows, ["Bucket", "Size", "Files", "Hit rate"])
+
+
+def do_cache_clear(project: Project, buckets: Sequence[str] = ()) -> None:
+    """Remove the given buckets, or the whole cache if none is given."""
+    freed = context.cache_manager.clear(buckets or None)
+    context.io.echo(f"{format_size(freed)} removed from the cache.")
+
+
+def do_cache_prune(project: Project, max_size: Optional[str] = None) -> None:
+    """Evict the least recently used files until the cache fits in the limit."""
+    limit = max_size or project.config.get("cache_max_size")
+    if not limit:
+        raise PdmException(
+            "No size limit is given, pass --max-size or set cache_max_size."
+        )
+    removed, freed = context.cache_manager.prune(parse_size(limit))
+    context.io.echo(f"{removed} files ({format_size(freed)}) removed from the cache.")
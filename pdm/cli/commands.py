@@ -13,6 +13,7 @@ from pdm.cli.options import (
     verbose_option,
 )
 from pdm.context import context
+from pdm.models.caches import CacheManager
 from pdm.project import Project
 from pdm.utils import get_user_email_from_git
 
@@ -86,9 +87,25 @@ def cli():
 
 @cli.command(help="Lock dependencies.")
 @verbose_option
+@click.option(
+    "--profile",
+    metavar="PATH",
+    help="Write a JSON report of timings and counters of the locking to PATH.",
+)
+@click.option(
+    "--chrome-trace",
+    metavar="PATH",
+    help="Write timings of the locking in Chrome trace format to PATH.",
+)
+@click.option(
+    "--force",
+    is_flag=True,
+    default=False,
+    help="Resolve again even if nothing affecting the resolution has changed.",
+)
 @pass_project
-def lock(project):
-    actions.do_lock(project)
+def lock(project, profile, chrome_trace, force):
+    actions.do_lock(project, profile=profile, chrome_trace=chrome_trace, force=force)
 
 
 @cli.command(help="Install dependencies from lock file.")
@@ -112,6 +129,14 @@ def install(project, sections, dev, default, lock):
                 "Lock file hash doesn't match pyproject.toml, regenerating..."
             )
             actions.do_lock(project, strategy="reuse")
+        elif not project.is_lockfile_fingerprint_match(
+            project.get_resolution_fingerprint()
+        ):
+            context.io.echo(
+                "Lock file resolution fingerprint doesn't match the project "
+                "settings, regenerating..."
+            )
+            actions.do_lock(project, strategy="reuse")
     actions.do_sync(project, sections, dev, default, False, False)
 
 
@@ -179,6 +204,8 @@ def sync(project, sections, dev, default, dry_run, clean):
 @click.argument("packages", nargs=-1)
 @pass_project
 def add(project, dev, section, sync, save, strategy, editables, packages):
+    # Only re-resolve the added packages unless an update strategy is given.
+    strategy = strategy or "incremental"
     actions.do_add(project, dev, section, sync, save, strategy, editables, packages)
 
 
@@ -303,3 +330,35 @@ def use(project, python):
 def info(project, python, show_project, env):
     """Show the project information."""
     actions.do_info(project, python, show_project, env)
+
+
+@cli.group()
+def cache():
+    """Control the caches of PDM."""
+    pass
+
+
+@cache.command(name="info")
+@pass_project
+def cache_info(project):
+    """Show the size and hit rate of each cache bucket."""
+    actions.do_cache_info(project)
+
+
+@cache.command(name="clear")
+@click.argument("buckets", nargs=-1, type=click.Choice(CacheManager.BUCKETS))
+@pass_project
+def cache_clear(project, buckets):
+    """Clear the given cache buckets, or all caches if none is given."""
+    actions.do_cache_clear(project, buckets)
+
+
+@cache.command(name="prune")
+@click.option(
+    "--max-size",
+    help="The size limit of the cache, like 2GB. Default to the cache_max_size config.",
+)
+@pass_project
+def cache_prune(project, max_size):
+    """Remove the least recently used files to keep the cache under a size limit."""
+    actions.do_cache_prune(project, max_size)
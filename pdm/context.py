@@ -1,16 +1,24 @@
 from __future__ import annotations
 
-import hashlib
+import atexit
 from pathlib import Path
 from typing import TYPE_CHECKING
 
-from pip_shims import shims
-
 from pdm import __version__
+from pdm.profiler import Profiler
 from pdm.ui import _IO
+from pdm.utils import FinderPool
 
 if TYPE_CHECKING:
-    from pdm.models.caches import CandidateInfoCache, HashCache
+    from pdm.models.caches import (
+        ArtifactHasher,
+        BuiltWheelCache,
+        CacheManager,
+        CandidateInfoCache,
+        HashCache,
+        IndexPageCache,
+        PackageStore,
+    )
 
 
 class Context:
@@ -23,6 +31,12 @@ class Context:
         self.version = __version__
         self.project = None
         self.io = _IO()
+        self.profiler = Profiler()
+        self.finder_pool = FinderPool()
+        atexit.register(self.finder_pool.close)
+        self._cache_managers = {}  # type: dict
+        self._artifact_hashers = {}  # type: dict
+        atexit.register(self._close_cache_managers)
 
     def init(self, project):
         self.project = project
@@ -40,24 +54,68 @@ class Context:
         path.mkdir(parents=True, exist_ok=True)
         return path
 
-    def make_wheel_cache(self) -> shims.WheelCache:
-        return shims.WheelCache(
-            self.cache_dir.as_posix(), shims.FormatControl(set(), set())
-        )
+    @property
+    def cache_manager(self) -> CacheManager:
+        """The manager tracking the usage of the current cache directory."""
+        from pdm.models.caches import CacheManager
+        from pdm.utils import parse_size
+
+        cache_dir = self.cache_dir
+        if cache_dir not in self._cache_managers:
+            max_size = self.project.config.get("cache_max_size")
+            self._cache_managers[cache_dir] = CacheManager(
+                cache_dir, parse_size(max_size) if max_size else None
+            )
+        return self._cache_managers[cache_dir]
+
+    @property
+    def artifact_hasher(self) -> ArtifactHasher:
+        """The hasher of local artifacts, memoized in the current cache directory."""
+        from pdm.models.caches import ArtifactHasher
+
+        cache_dir = self.cache_dir
+        if cache_dir not in self._artifact_hashers:
+            self._artifact_hashers[cache_dir] = ArtifactHasher(
+                self.cache("file_hashes"), manager=self.cache_manager
+            )
+        return self._artifact_hashers[cache_dir]
+
+    def _close_cache_managers(self) -> None:
+        for manager in self._cache_managers.values():
+            manager.close()
+
+    def make_wheel_cache(self) -> BuiltWheelCache:
+        from pdm.models.caches import BuiltWheelCache
+
+        return BuiltWheelCache(self.cache("built_wheels"), self.cache_manager)
 
     def make_candidate_info_cache(self) -> CandidateInfoCache:
         from pdm.models.caches import CandidateInfoCache
 
-        python_hash = hashlib.sha1(
-            str(self.project.python_requires).encode()
-        ).hexdigest()
-        file_name = f"package_meta_{python_hash}.json"
-        return CandidateInfoCache(self.cache_dir / file_name)
+        return CandidateInfoCache(
+            self.cache_dir / "package_meta.db", manager=self.cache_manager
+        )
+
+    def make_index_page_cache(self) -> IndexPageCache:
+        from pdm.models.caches import IndexPageCache
+
+        return IndexPageCache(self.cache("index_pages"), self.cache_manager)
 
     def make_hash_cache(self) -> HashCache:
         from pdm.models.caches import HashCache
 
-        return HashCache(directory=self.cache("hashes").as_posix())
+        return HashCache(
+            directory=self.cache("hashes").as_posix(),
+            manager=self.cache_manager,
+            hasher=self.artifact_hasher,
+        )
+
+    def make_package_store(self) -> PackageStore:
+        from pdm.models.caches import PackageStore
+
+        return PackageStore(
+            self.cache("packages"), self.cache_manager, self.artifact_hasher
+        )
 
 
 context = Context()
@@ -29,6 +29,14 @@ class CorruptedCacheError(PdmException):
     pass
 
 
+class HTTPRangeRequestUnsupported(PdmException):
+    pass
+
+
+class HashMismatchError(PdmException):
+    pass
+
+
 class CandidateInfoNotFound(PdmException):
     def __init__(self, candidate):
         message = (
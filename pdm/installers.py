@@ -1,16 +1,27 @@
+import base64
+import configparser
+import csv
+import hashlib
 import importlib
+import os
 import subprocess
-from typing import Dict, List, Tuple
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
 
 from pip._vendor.pkg_resources import Distribution, EggInfoDistribution, safe_name
 from pip_shims import shims
 
 import distlib.scripts
+from distlib.util import read_exports
 from distlib.wheel import Wheel
 from pdm.context import context
 from pdm.models.candidates import Candidate
+from pdm.models.downloads import Downloader
 from pdm.models.environment import Environment
 from pdm.models.requirements import parse_requirement, strip_extras
+from pdm.utils import link_file
 from vistir import cd
 
 SETUPTOOLS_SHIM = (
@@ -44,6 +55,50 @@ def _print_list_information(word, items, dry=False):
     print(template.format(count=count, suffix=suffix, word=word, items=items))
 
 
+def _get_install_roots(wheel: Wheel) -> Set[str]:
+    """Return the top level paths the wheel writes to, as ``<scheme>/<name>``."""
+    roots = set()
+    with zipfile.ZipFile(os.path.join(wheel.dirname, wheel.filename)) as zf:
+        for name in zf.namelist():
+            parts = name.split("/")
+            if parts[0].endswith(".data") and len(parts) > 2:
+                scheme, root = parts[1], parts[2]
+            else:
+                scheme, root = "purelib", parts[0]
+            if scheme == "platlib":
+                scheme = "purelib"
+            elif scheme == "headers":
+                # Headers share a directory created on demand.
+                root = ""
+            roots.add(f"{scheme}/{os.path.normcase(root)}")
+            if len(parts) == 2 and parts[1] == "entry_points.txt":
+                entry_points = configparser.ConfigParser(delimiters=("=",))
+                entry_points.optionxform = str
+                entry_points.read_string(zf.read(name).decode("utf-8"))
+                for section in ("console_scripts", "gui_scripts"):
+                    if entry_points.has_section(section):
+                        roots.update(
+                            f"scripts/{os.path.normcase(script)}"
+                            for script in entry_points.options(section)
+                        )
+    return roots
+
+
+def _group_by_install_roots(candidates: List[Candidate]) -> List[List[Candidate]]:
+    """Group the candidates whose wheels write to the same top level paths, so that
+    each group can be installed one by one. The order of the candidates is kept.
+    """
+    groups = []  # type: List[Tuple[Set[str], List[int]]]
+    for index, can in enumerate(candidates):
+        roots, members = _get_install_roots(can.wheel), [index]
+        for group in [g for g in groups if not roots.isdisjoint(g[0])]:
+            groups.remove(group)
+            roots |= group[0]
+            members.extend(group[1])
+        groups.append((roots, sorted(members)))
+    return [[candidates[i] for i in members] for _, members in groups]
+
+
 class Installer:  # pragma: no cover
     """The installer that performs the installation and uninstallation actions."""
 
@@ -51,22 +106,113 @@ class Installer:  # pragma: no cover
         self.environment = environment
         self.auto_confirm = auto_confirm
 
-    def install(self, candidate: Candidate) -> None:
+    def prepare(self, candidate: Candidate) -> None:
+        """Build the wheel of the candidate, or the egg info if it is editable."""
         candidate.get_metadata()
+
+    def install(self, candidate: Candidate) -> None:
+        self.prepare(candidate)
         if candidate.req.editable:
             self.install_editable(candidate.ireq)
         else:
             self.install_wheel(candidate.wheel)
 
-    def install_wheel(self, wheel: Wheel) -> None:
-        paths = self.environment.get_paths()
+    def _get_script_maker(self, paths: Dict[str, str]) -> distlib.scripts.ScriptMaker:
         scripts = distlib.scripts.ScriptMaker(None, None)
         scripts.executable = self.environment.python_executable
         scripts.script_template = scripts.script_template.replace(
             "import sys",
             "import sys\nsys.path.insert(0, {!r})".format(paths["platlib"]),
         )
-        wheel.install(paths, scripts)
+        return scripts
+
+    def install_wheel(self, wheel: Wheel) -> None:
+        if self.environment.config["install_cache"]:
+            self.install_wheel_from_store(wheel)
+            return
+        paths = self.environment.get_paths()
+        wheel.install(paths, self._get_script_maker(paths))
+
+    def install_wheel_from_store(self, wheel: Wheel) -> None:
+        """Install the wheel by linking the files unpacked in the package store.
+        Scripts are generated and ``RECORD`` is written for this environment.
+        """
+        paths = self.environment.get_paths()
+        entry = context.make_package_store().get(Path(wheel.dirname, wheel.filename))
+        method = self.environment.config["install_cache_method"]
+        name_ver = f"{wheel.name}-{wheel.version}"
+        info_dir, data_dir = f"{name_ver}.dist-info", f"{name_ver}.data"
+        if wheel.info.get("Root-Is-Purelib") == "true":
+            libdir = paths["purelib"]
+        else:
+            libdir = paths["platlib"]
+        with open(entry / info_dir / "RECORD", newline="", encoding="utf-8") as fp:
+            records = {row[0]: row for row in csv.reader(fp) if row}
+
+        installed = []  # type: List[Tuple[str, str, str]]
+        wheel_scripts = []
+        for root, _, files in os.walk(entry):
+            for filename in files:
+                source = os.path.join(root, filename)
+                arcname = Path(source).relative_to(entry).as_posix()
+                if arcname == f"{info_dir}/RECORD":
+                    continue
+                if arcname.startswith(f"{data_dir}/"):
+                    _, scheme, rest = arcname.split("/", 2)
+                    if scheme == "scripts":
+                        wheel_scripts.append(rest)
+                        continue
+                    target = os.path.join(paths[scheme], rest)
+                else:
+                    target = os.path.join(libdir, arcname)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                used = link_file(source, target, method)
+                if used != method:
+                    context.io.echo(
+                        f"Can't {method} files from {entry}, fall back to {used}",
+                        verbosity=context.io.DETAIL,
+                    )
+                    method = used
+                _, hash_value, size = records.get(arcname, (arcname, "", ""))
+                installed.append((target, hash_value, size))
+
+        # Scripts point to the interpreter of this environment.
+        maker = self._get_script_maker(paths)
+        maker.force = True
+        script_files = []
+        if wheel_scripts:
+            maker.source_dir = (entry / data_dir / "scripts").as_posix()
+            maker.target_dir = paths["scripts"]
+            for script in wheel_scripts:
+                script_files.extend(maker.make(script))
+        entry_points = entry / info_dir / "entry_points.txt"
+        if entry_points.is_file():
+            with entry_points.open("rb") as fp:
+                exports = read_exports(fp)
+            maker.target_dir = paths["scripts"]
+            for section, options in (
+                ("console_scripts", None),
+                ("gui_scripts", {"gui": True}),
+            ):
+                for export in exports.get(section, {}).values():
+                    spec = f"{export.name} = {export.prefix}:{export.suffix}"
+                    if export.flags:
+                        spec += " [%s]" % ",".join(export.flags)
+                    script_files.extend(maker.make(spec, options))
+        for path in script_files:
+            with open(path, "rb") as fp:
+                data = fp.read()
+            digest = base64.urlsafe_b64encode(hashlib.sha256(data).digest())
+            installed.append(
+                (path, "sha256=" + digest.rstrip(b"=").decode(), str(len(data)))
+            )
+
+        record_path = os.path.join(libdir, info_dir, "RECORD")
+        with open(record_path, "w", newline="", encoding="utf-8") as fp:
+            writer = csv.writer(fp)
+            for path, hash_value, size in installed:
+                writer.writerow((os.path.relpath(path, libdir), hash_value, size))
+            writer.writerow((f"{info_dir}/RECORD", "", ""))
 
     def install_editable(self, ireq: shims.InstallRequirement) -> None:
         setup_path = ireq.setup_py_path
@@ -104,6 +250,9 @@ class Installer:  # pragma: no cover
 class Synchronizer:
     """Synchronize the working set with given installation candidates"""
 
+    #: Max number of concurrent downloads before installing.
+    download_workers = 8
+
     def __init__(
         self, candidates: Dict[str, Candidate], environment: Environment
     ) -> None:
@@ -139,6 +288,36 @@ class Synchronizer:
         )
         return to_add, to_update, to_remove
 
+    def _get_download_item(
+        self, candidate: Candidate, finder: shims.PackageFinder
+    ) -> Optional[Tuple[shims.Link, Path, Optional[Dict[str, str]]]]:
+        req = candidate.req
+        if req.editable or req.is_vcs or req.is_file_or_url and req.is_local_dir:
+            return None
+        ireq = candidate.ireq
+        ireq.populate_link(finder, False, bool(candidate.hashes))
+        link = ireq.link
+        if link is None or link.is_file:
+            return None
+        if not link.is_wheel and self.environment.get_cached_wheel(
+            link, candidate.hashes
+        ):
+            return None
+        download_dir = context.cache("wheels" if link.is_wheel else "pkgs")
+        return link, download_dir, candidate.hashes
+
+    def download_candidates(self, candidates: List[Candidate]) -> None:
+        """Fetch the artifacts of the candidates into the cache concurrently, so that
+        building and installing them don't wait for the network one by one.
+        """
+        with self.environment.get_finder(allow_all=True) as finder:
+            with ThreadPoolExecutor(self.download_workers) as executor:
+                items = executor.map(
+                    lambda can: self._get_download_item(can, finder), candidates
+                )
+                items = list({item[0].url: item for item in items if item}.values())
+            Downloader(finder.session, self.download_workers).download_all(items)
+
     def install_candidates(
         self, candidates: List[Candidate], update: bool = False
     ) -> None:
@@ -149,6 +328,7 @@ class Synchronizer:
         """
         installer = self.get_installer()
         working_set = self.environment.get_working_set()
+        workers = self.environment.config["install_workers"]
         for can in candidates:
             if update:
                 dist = working_set[safe_name(can.name).lower()]
@@ -160,6 +340,41 @@ class Synchronizer:
                 installer.uninstall(dist)
             else:
                 context.io.echo(f"Installing {can.format()}...")
+            if workers > 1:
+                # Building is not thread safe, only the installation runs in parallel.
+                installer.prepare(can)
+            else:
+                installer.install(can)
+        if workers > 1:
+            self._install_in_parallel(installer, candidates, workers)
+
+    def _install_in_parallel(
+        self, installer: Installer, candidates: List[Candidate], workers: int
+    ) -> None:
+        """Install the prepared candidates with a thread pool.
+
+        Installing a wheel runs no code of the package, so it doesn't need to wait
+        for the dependencies. Wheels writing to the same top level paths, like
+        namespace packages or scripts with the same name, are installed one by one.
+        Editable candidates run ``setup.py`` which may import the dependencies, so
+        they are installed after all wheels, in order.
+        """
+        wheels, others = [], []
+        for can in candidates:
+            if can.wheel is not None and not can.req.editable:
+                wheels.append(can)
+            else:
+                others.append(can)
+        groups = _group_by_install_roots(wheels)
+        if groups:
+            with context.profiler.phase("install"), ThreadPoolExecutor(
+                min(workers, len(groups))
+            ) as executor:
+                for _ in executor.map(
+                    lambda group: [installer.install(can) for can in group], groups
+                ):
+                    pass
+        for can in others:
             installer.install(can)
 
     def remove_distributions(self, distributions: List[str]) -> None:
@@ -190,6 +405,14 @@ class Synchronizer:
         if not any(lists_to_check):
             context.io.echo("All packages are synced to date, nothing to do.")
             return
+        if (to_add or to_update) and not dry_run:
+            self.download_candidates(
+                [
+                    can
+                    for k, can in self.candidates.items()
+                    if k in to_add or k in to_update
+                ]
+            )
         if to_add and not dry_run:
             self.install_candidates(
                 [can for k, can in self.candidates.items() if k in to_add]
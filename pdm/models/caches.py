@@ -1,77 +1,402 @@
+import atexit
 import hashlib
 import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
 
 import pip_shims
 from pip._vendor import requests
+from pip._vendor.pkg_resources import safe_name
 
+from distlib.wheel import Wheel
 from pdm._types import CandidateInfo
 from pdm.exceptions import CorruptedCacheError
-from vistir.contextmanagers import open_file
+from pdm.utils import get_file_hash
+from vistir.contextmanagers import atomic_open_for_write, open_file
 
 if TYPE_CHECKING:
     from pdm.models.candidates import Candidate
 
+# Size of the chunks read from a remote file to hash it.
+HASH_CHUNK_SIZE = 64 * 1024
+
 
 class CandidateInfoCache:
-    """Cache manager to hold (dependencies, requires_python, summary) info."""
+    """Cache manager to hold (dependencies, requires_python, summary) info.
+
+    The info is stored unfiltered, once per (name, version, source), so it can be
+    shared by all projects and Python versions. Extras are applied by the
+    repository when reading it.
 
-    def __init__(self, cache_file: Path) -> None:
+    The info is stored in a SQLite database in WAL mode, so that several pdm
+    processes can share it safely. Writes are batched and committed every
+    ``batch_size`` changes, on :meth:`flush` and at exit.
+    """
+
+    def __init__(
+        self,
+        cache_file: Path,
+        batch_size: int = 100,
+        manager: Optional["CacheManager"] = None,
+    ) -> None:
         self.cache_file = cache_file
-        self._cache = {}  # type: Dict[str, Any]
-        self._read_cache()
+        self.batch_size = batch_size
+        self.manager = manager
+        self._pending = {}  # type: Dict[str, Optional[str]]
+        # Candidate info may be fetched and saved from prefetching threads.
+        self._lock = threading.RLock()
+        self._conn = None  # type: Optional[sqlite3.Connection]
+        atexit.register(self.flush)
 
-    def _read_cache(self) -> None:
-        if not self.cache_file.exists():
-            self._cache = {}
-            return
-        with self.cache_file.open() as fp:
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
             try:
-                self._cache = json.load(fp)
-            except json.JSONDecodeError:
+                conn = sqlite3.connect(
+                    self.cache_file.as_posix(), timeout=30, check_same_thread=False
+                )
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS candidate_info "
+                    "(key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+                )
+                conn.commit()
+            except sqlite3.DatabaseError:
                 raise CorruptedCacheError("The dependencies cache seems to be broken.")
-
-    def _write_cache(self) -> None:
-        with self.cache_file.open("w") as fp:
-            json.dump(self._cache, fp)
+            self._conn = conn
+        return self._conn
 
     @staticmethod
-    def _get_key(candidate):
-        # type: (Candidate) -> str
+    def _get_key(candidate, source):
+        # type: (Candidate, str) -> str
         # Name and version are set when dependencies are resolved,
-        # so use them for cache key. Local directories won't be cached.
-        if not candidate.name or not candidate.version:
+        # so use them for cache key. Local directories and VCS repositories
+        # may change without a new version, they won't be cached.
+        req = candidate.req
+        if (
+            not candidate.name
+            or not candidate.version
+            or req.editable
+            or req.is_vcs
+            or req.is_file_or_url
+            and req.is_local_dir
+        ):
             raise KeyError
-        extras = (
-            "[{}]".format(",".join(sorted(candidate.req.extras)))
-            if candidate.req.extras
-            else ""
-        )
-        return f"{candidate.name}{extras}-{candidate.version}"
+        return f"{safe_name(candidate.name).lower()}-{candidate.version}@{source}"
 
-    def get(self, candidate):
-        # type: (Candidate) -> CandidateInfo
-        key = self._get_key(candidate)
-        return self._cache[key]
+    def get(self, candidate, source):
+        # type: (Candidate, str) -> CandidateInfo
+        key = self._get_key(candidate, source)
+        with self._lock:
+            if key in self._pending:
+                value = self._pending[key]
+            else:
+                try:
+                    row = (
+                        self._connect()
+                        .execute(
+                            "SELECT value FROM candidate_info WHERE key = ?", (key,)
+                        )
+                        .fetchone()
+                    )
+                except sqlite3.DatabaseError:
+                    raise CorruptedCacheError(
+                        "The dependencies cache seems to be broken."
+                    )
+                value = row[0] if row else None
+        if self.manager is not None:
+            self.manager.record("package_meta", value is not None)
+        if value is None:
+            raise KeyError(key)
+        return json.loads(value)
 
-    def set(self, candidate, value):
-        # type: (Candidate, CandidateInfo) -> None
-        key = self._get_key(candidate)
-        self._cache[key] = value
-        self._write_cache()
+    def _write(self, key: str, value: Optional[str]) -> None:
+        with self._lock:
+            self._pending[key] = value
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+
+    def set(self, candidate, source, value):
+        # type: (Candidate, str, CandidateInfo) -> None
+        try:
+            key = self._get_key(candidate, source)
+        except KeyError:
+            return
+        self._write(key, json.dumps(value))
 
-    def delete(self, candidate):
-        # type: (Candidate) -> None
+    def delete(self, candidate, source):
+        # type: (Candidate, str) -> None
         try:
-            del self._cache[self._get_key(candidate)]
+            key = self._get_key(candidate, source)
         except KeyError:
-            pass
-        self._write_cache()
+            return
+        self._write(key, None)
+
+    def flush(self) -> None:
+        """Commit the pending changes in one transaction."""
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+            conn = self._connect()
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO candidate_info (key, value) VALUES (?, ?)",
+                    [(k, v) for k, v in pending.items() if v is not None],
+                )
+                conn.executemany(
+                    "DELETE FROM candidate_info WHERE key = ?",
+                    [(k,) for k, v in pending.items() if v is None],
+                )
 
     def clear(self) -> None:
-        self._cache.clear()
-        self._write_cache()
+        with self._lock:
+            self._pending.clear()
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            # The database may be broken, start over with a new file.
+            for suffix in ("", "-wal", "-shm"):
+                path = self.cache_file.with_name(self.cache_file.name + suffix)
+                if path.exists():
+                    path.unlink()
+
+
+class IndexPageCache:
+    """Cache of the file records parsed from simple index pages, stored together with
+    the validators of the page so that it can be revalidated with a conditional
+    request.
+    """
+
+    def __init__(
+        self, directory: Path, manager: Optional["CacheManager"] = None
+    ) -> None:
+        self.directory = directory
+        self.manager = manager
+
+    def _get_path(self, url: str) -> Path:
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.directory / digest[:2] / f"{digest[2:]}.json"
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """Return the cached entry of the page, with keys ``etag``, ``last_modified``
+        and ``links``, or None if the page is not cached.
+        """
+        path = self._get_path(url)
+        entry = None
+        if path.is_file():
+            try:
+                with path.open(encoding="utf-8") as fp:
+                    entry = json.load(fp)
+            except (OSError, json.JSONDecodeError):
+                pass
+            else:
+                # Entries without filenames are written by older versions.
+                if entry.get("url") != url or any(
+                    "filename" not in record for record in entry["links"]
+                ):
+                    entry = None
+        if self.manager is not None:
+            self.manager.record("index_pages", entry is not None, path)
+        return entry
+
+    def set(
+        self,
+        url: str,
+        records: List[Dict[str, Any]],
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Cache the file records of the page and return the entry.
+
+        :param url: the URL of the page.
+        :param records: the files on the page, dicts with keys ``url``,
+            ``filename``, ``requires_python``, ``yanked_reason`` and optional
+            ``hashes``.
+        :param etag: the ETag header of the response.
+        :param last_modified: the Last-Modified header of the response.
+        """
+        entry = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "links": records,
+        }
+        path = self._get_path(url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Pages are cached from the fetching threads, never leave a partial file.
+        with atomic_open_for_write(path.as_posix(), encoding="utf-8") as fp:
+            json.dump(entry, fp)
+        return entry
+
+
+class BuiltWheelCache:
+    """Cache of the wheels built from sdists, keyed by the sha256 hash of the sdist
+    and the tag of the interpreter building them.
+    """
+
+    def __init__(
+        self, directory: Path, manager: Optional["CacheManager"] = None
+    ) -> None:
+        self.directory = directory
+        self.manager = manager
+
+    def _get_dir(self, sdist_hash: str, tag: str) -> Path:
+        return self.directory / tag / sdist_hash[:2] / sdist_hash[2:]
+
+    def get(self, sdist_hash: str, tag: str) -> Optional[Path]:
+        """Return the path of the cached wheel, or None if it isn't built yet."""
+        directory = self._get_dir(sdist_hash, tag)
+        wheel = next(directory.glob("*.whl"), None) if directory.is_dir() else None
+        if self.manager is not None:
+            self.manager.record("built_wheels", wheel is not None, wheel)
+        return wheel
+
+    def set(self, sdist_hash: str, tag: str, wheel: Path) -> Path:
+        """Copy the built wheel into the cache and return the cached path."""
+        directory = self._get_dir(sdist_hash, tag)
+        directory.mkdir(parents=True, exist_ok=True)
+        target = directory / wheel.name
+        # Copy to a temporary file first, a concurrent reader never sees
+        # a partial wheel.
+        fd, temp_path = tempfile.mkstemp(suffix=".tmp", dir=directory.as_posix())
+        os.close(fd)
+        shutil.copyfile(wheel.as_posix(), temp_path)
+        os.replace(temp_path, target.as_posix())
+        return target
+
+
+class ArtifactHasher:
+    """Hash local artifacts in a thread pool, memoizing the results by the
+    identity of the file, i.e. (path, size, mtime, inode), so that unchanged files
+    are never hashed again, even by later processes.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        workers: int = 4,
+        manager: Optional["CacheManager"] = None,
+    ) -> None:
+        self.workers = workers
+        self.manager = manager
+        self._store = pip_shims.SafeFileCache(directory.as_posix())
+        self._memo = {}  # type: Dict[str, str]
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _get_key(path: str, hash_name: str) -> str:
+        stat = os.stat(path)
+        return ":".join(
+            [
+                hash_name,
+                os.path.realpath(path),
+                str(stat.st_size),
+                str(stat.st_mtime_ns),
+                str(stat.st_ino),
+            ]
+        )
+
+    def hash_file(self, path: str, hash_name: str = "sha256") -> str:
+        """Return the hash of the file in the form of ``<hash_name>:<hex digest>``."""
+        key = self._get_key(path, hash_name)
+        with self._lock:
+            hash_value = self._memo.get(key)
+        if hash_value is None:
+            stored = self._store.get(key)
+            if self.manager is not None:
+                self.manager.record(
+                    "file_hashes",
+                    stored is not None,
+                    Path(self._store._get_cache_path(key)),
+                )
+            if stored is not None:
+                hash_value = stored.decode("utf8")
+            else:
+                hash_value = f"{hash_name}:{get_file_hash(path, hash_name)}"
+                self._store.set(key, hash_value.encode())
+            with self._lock:
+                self._memo[key] = hash_value
+        return hash_value
+
+    def hash_files(
+        self, paths: Iterable[str], hash_name: str = "sha256"
+    ) -> Dict[str, str]:
+        """Hash many files at once and return a dict of path: hash."""
+        paths = list(dict.fromkeys(paths))
+        if len(paths) <= 1 or self.workers <= 1:
+            return {path: self.hash_file(path, hash_name) for path in paths}
+        with ThreadPoolExecutor(min(self.workers, len(paths))) as executor:
+            hashes = executor.map(lambda p: self.hash_file(p, hash_name), paths)
+            return dict(zip(paths, hashes))
+
+
+class PackageStore:
+    """A store of unpacked wheels shared by all projects, keyed by the sha256 hash
+    of the wheel file. Each entry mirrors the members of the wheel, and projects
+    link the files into their packages directory instead of unpacking it again.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        manager: Optional["CacheManager"] = None,
+        hasher: Optional[ArtifactHasher] = None,
+    ) -> None:
+        self.directory = directory
+        self.manager = manager
+        self.hasher = hasher
+
+    def _get_dir(self, wheel: Path) -> Path:
+        if self.hasher is not None:
+            wheel_hash = self.hasher.hash_file(wheel.as_posix()).split(":", 1)[1]
+        else:
+            wheel_hash = get_file_hash(wheel.as_posix())
+        return self.directory / wheel_hash[:2] / wheel_hash[2:]
+
+    def get(self, wheel: Path) -> Path:
+        """Return the directory the wheel is unpacked in, unpacking it first if it
+        isn't in the store yet.
+
+        :raises DistlibException: if the files don't match the RECORD of the wheel.
+        """
+        entry = self._get_dir(wheel)
+        hit = entry.is_dir()
+        if not hit:
+            self._unpack(wheel, entry)
+        if self.manager is not None:
+            self.manager.record("packages", hit, entry)
+        return entry
+
+    def _unpack(self, wheel: Path, entry: Path) -> None:
+        Wheel(wheel.as_posix()).verify()
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        # Unpack into a temporary directory first, a concurrent reader never sees
+        # a partial entry.
+        temp_dir = tempfile.mkdtemp(suffix=".tmp", dir=entry.parent.as_posix())
+        try:
+            with zipfile.ZipFile(wheel) as zf:
+                for info in zf.infolist():
+                    path = zf.extract(info, temp_dir)
+                    mode = (info.external_attr >> 16) & 0o777
+                    if os.name == "posix" and mode and not info.is_dir():
+                        os.chmod(path, mode)
+            try:
+                os.rename(temp_dir, entry.as_posix())
+            except OSError:
+                # Another process has unpacked the same wheel.
+                if not entry.is_dir():
+                    raise
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
 
 
 class HashCache(pip_shims.SafeFileCache):
@@ -85,24 +410,202 @@ class HashCache(pip_shims.SafeFileCache):
 
     def __init__(self, *args, **kwargs):
         self.session = None  # type: Optional[requests.Session]
+        self.manager = kwargs.pop("manager", None)  # type: Optional[CacheManager]
+        self.hasher = kwargs.pop("hasher", None)  # type: Optional[ArtifactHasher]
         super(HashCache, self).__init__(*args, **kwargs)
 
-    def get_hash(self, link: pip_shims.Link) -> str:
+    def get_known_hash(self, link: pip_shims.Link) -> Optional[str]:
+        """Get the hash from the cache or the link fragment without downloading.
+        Return None if it isn't known yet.
+        """
+        if link.is_file and not link.hash:
+            # Local files may change, they are hashed by the identity instead.
+            return None
+        hash_value = self.get(link.url)
+        if self.manager is not None:
+            self.manager.record(
+                "hashes", bool(hash_value), Path(self._get_cache_path(link.url))
+            )
+        if hash_value:
+            return hash_value.decode("utf8")
         # If there is no link hash (i.e., md5, sha256, etc.), we don't want
         # to store it.
-        hash_value = self.get(link.url)
-        if not hash_value:
-            if link.hash:
-                hash_value = f"{link.hash_name}:{link.hash}"
-            else:
-                hash_value = self._get_file_hash(link)
-            hash_value = hash_value.encode()
-            self.set(link.url, hash_value)
-        return hash_value.decode("utf8")
+        if link.hash:
+            return self.set_hash(link, f"{link.hash_name}:{link.hash}")
+        return None
+
+    def set_hash(self, link: pip_shims.Link, hash_value: str) -> str:
+        self.set(link.url, hash_value.encode())
+        return hash_value
+
+    def get_hash(self, link: pip_shims.Link) -> str:
+        """Get the hash of the link, downloading the file if it isn't known."""
+        hash_value = self.get_known_hash(link)
+        if hash_value:
+            return hash_value
+        if link.is_file and self.hasher is not None:
+            return self.hasher.hash_file(link.file_path, pip_shims.FAVORITE_HASH)
+        return self.set_hash(link, self._get_file_hash(link))
 
     def _get_file_hash(self, link: pip_shims.Link) -> str:
         h = hashlib.new(pip_shims.FAVORITE_HASH)
         with open_file(link.url, self.session) as fp:
-            for chunk in iter(lambda: fp.read(8096), b""):
+            for chunk in iter(lambda: fp.read(HASH_CHUNK_SIZE), b""):
                 h.update(chunk)
         return ":".join([h.name, h.hexdigest()])
+
+
+class CacheManager:
+    """Track the usage of the buckets in the cache directory and keep its size
+    under a limit.
+
+    A hit sets the access time of the cached file, so the least recently used
+    files are evicted first. The modification time is left alone, it is part of
+    the identity of the file memoized by :class:`ArtifactHasher`. Hit rates are saved
+    in ``stats.json`` when the manager is closed.
+    """
+
+    #: Directory buckets that are made of independent files and can be evicted.
+    EVICTABLE_BUCKETS = (
+        "pkgs",
+        "wheels",
+        "built_wheels",
+        "hashes",
+        "file_hashes",
+        "index_pages",
+        "http",
+    )
+    #: Directory buckets whose files are linked into projects. They are not
+    #: evicted nor counted in the size limit, and can only be cleared as a whole.
+    LINKED_BUCKETS = ("packages",)
+    #: Buckets stored in a single database, they can only be cleared as a whole.
+    FILE_BUCKETS = {"package_meta": ("package_meta.db",)}
+    BUCKETS = EVICTABLE_BUCKETS + LINKED_BUCKETS + tuple(FILE_BUCKETS)
+    STATS_FILE = "stats.json"
+
+    def __init__(self, cache_dir: Path, max_size: Optional[int] = None) -> None:
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._counts = {}  # type: Dict[str, Dict[str, int]]
+
+    def record(self, bucket: str, hit: bool, path: Optional[Path] = None) -> None:
+        """Record an access to the cache bucket and update the access time of the
+        file on a hit.
+        """
+        with self._lock:
+            counts = self._counts.setdefault(bucket, {"hits": 0, "misses": 0})
+            counts["hits" if hit else "misses"] += 1
+        if hit and path is not None:
+            try:
+                os.utime(path, ns=(time.time_ns(), os.stat(path).st_mtime_ns))
+            except OSError:
+                pass
+
+    def _get_bucket_files(self, bucket: str) -> List[Path]:
+        if bucket in self.FILE_BUCKETS:
+            return [
+                path
+                for name in self.FILE_BUCKETS[bucket]
+                for suffix in ("", "-wal", "-shm")
+                for path in [self.cache_dir / (name + suffix)]
+                if path.is_file()
+            ]
+        directory = self.cache_dir / bucket
+        if not directory.is_dir():
+            return []
+        return [path for path in directory.rglob("*") if path.is_file()]
+
+    def load_stats(self) -> Dict[str, Dict[str, int]]:
+        try:
+            with (self.cache_dir / self.STATS_FILE).open(encoding="utf-8") as fp:
+                return json.load(fp)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def save_stats(self) -> None:
+        """Add the counts recorded by this process to the saved stats."""
+        with self._lock:
+            counts, self._counts = self._counts, {}
+        if not counts:
+            return
+        stats = self.load_stats()
+        for bucket, bucket_counts in counts.items():
+            saved = stats.setdefault(bucket, {"hits": 0, "misses": 0})
+            for name, value in bucket_counts.items():
+                saved[name] = saved.get(name, 0) + value
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with atomic_open_for_write(
+            (self.cache_dir / self.STATS_FILE).as_posix(), encoding="utf-8"
+        ) as fp:
+            json.dump(stats, fp)
+
+    def get_info(self) -> List[Dict[str, Any]]:
+        """Return the size, file count and hit rate of each bucket."""
+        stats = self.load_stats()
+        result = []
+        for bucket in self.BUCKETS:
+            files = self._get_bucket_files(bucket)
+            counts = stats.get(bucket, {})
+            result.append(
+                {
+                    "name": bucket,
+                    "size": sum(path.stat().st_size for path in files),
+                    "files": len(files),
+                    "hits": counts.get("hits", 0),
+                    "misses": counts.get("misses", 0),
+                }
+            )
+        return result
+
+    def clear(self, buckets: Optional[Iterable[str]] = None) -> int:
+        """Remove the given buckets, or all of them, and return the freed size."""
+        freed = 0
+        for bucket in buckets or self.BUCKETS:
+            if bucket not in self.BUCKETS:
+                raise ValueError(f"Unknown cache bucket: {bucket}")
+            for path in self._get_bucket_files(bucket):
+                freed += path.stat().st_size
+                path.unlink()
+            if bucket not in self.FILE_BUCKETS:
+                shutil.rmtree(self.cache_dir / bucket, ignore_errors=True)
+        stats_file = self.cache_dir / self.STATS_FILE
+        if buckets is None and stats_file.exists():
+            stats_file.unlink()
+        return freed
+
+    def prune(self, max_size: Optional[int] = None) -> Tuple[int, int]:
+        """Evict the least recently used files until the cache fits in ``max_size``.
+
+        :returns: the number of files removed and the freed size.
+        """
+        max_size = self.max_size if max_size is None else max_size
+        if max_size is None:
+            return 0, 0
+        entries = []
+        total = 0
+        for bucket in self.EVICTABLE_BUCKETS + tuple(self.FILE_BUCKETS):
+            for path in self._get_bucket_files(bucket):
+                stat = path.stat()
+                total += stat.st_size
+                if bucket in self.EVICTABLE_BUCKETS:
+                    entries.append((stat.st_atime, stat.st_size, path))
+        removed = freed = 0
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total - freed <= max_size:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            removed += 1
+            freed += size
+        return removed, freed
+
+    def close(self) -> None:
+        """Save the stats, and evict old files if the cache grew in this process."""
+        with self._lock:
+            grown = any(counts["misses"] for counts in self._counts.values())
+        self.save_stats()
+        if grown and self.max_size is not None:
+            self.prune()
@@ -2,8 +2,20 @@ from __future__ import annotations
 
 import functools
 import warnings
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Union
+import zipfile
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Union,
+)
 
+from pip._vendor import requests
+from pip._vendor.packaging.tags import parse_tag
 from pip._vendor.pkg_resources import safe_extra
 from pip_shims import shims
 
@@ -11,7 +23,8 @@ from distlib.database import EggInfoDistribution
 from distlib.metadata import Metadata
 from distlib.wheel import Wheel
 from pdm.context import context
-from pdm.exceptions import ExtrasError, RequirementError
+from pdm.exceptions import ExtrasError, HTTPRangeRequestUnsupported, RequirementError
+from pdm.models.lazy_wheel import get_wheel_metadata_from_url
 from pdm.models.markers import Marker
 from pdm.models.requirements import Requirement, filter_requirements_with_extras
 from pdm.utils import cached_property
@@ -70,6 +83,13 @@ def identify(req: Union[Candidate, Requirement]) -> Optional[str]:
     return req.key + extras
 
 
+def normalize_requires_python(requires_python: str) -> str:
+    """Turn a bare major version like ``3`` into a specifier."""
+    if requires_python.isdigit():
+        requires_python = f">={requires_python},<{int(requires_python) + 1}"
+    return requires_python
+
+
 class Candidate:
     """A concrete candidate that can be downloaded and installed.
     A candidate comes from the PyPI index of a package, or from the requirement itself
@@ -100,6 +120,8 @@ class Candidate:
         if link is None and self.req:
             link = self.ireq.link
         self.link = link
+        # All files of the version, if found from the index.
+        self.links = None  # type: Optional[List[shims.Link]]
         self.hashes = None  # type: Optional[Dict[str, str]]
         self.marker = None
         self.sections = []
@@ -107,6 +129,8 @@ class Candidate:
 
         self.wheel = None
         self.metadata = None
+        # Whether the metadata is read from a remote wheel, without building.
+        self._lazy_metadata = False
 
         # Dependencies from lockfile content.
         self.dependencies = None
@@ -130,12 +154,22 @@ class Candidate:
             raise AttributeError("Non-VCS candidate doesn't have revision attribute")
         return vcs.get_backend(self.req.vcs).get_revision(self.ireq.source_dir)
 
-    def get_metadata(self) -> Optional[Metadata]:
+    def get_metadata(self, allow_lazy: bool = False) -> Optional[Metadata]:
         """Get the metadata of the candidate.
         For editable requirements, egg info are produced, otherwise a wheel is built.
+
+        :param allow_lazy: whether to read the metadata of a remote wheel with HTTP
+            range requests instead, :attr:`wheel` is not set in this case.
         """
-        if self.metadata is not None:
+        if self.metadata is not None and (allow_lazy or not self._lazy_metadata):
             return self.metadata
+        if allow_lazy:
+            metadata = self._get_lazy_metadata()
+            if metadata is not None:
+                self.metadata = metadata
+                self._lazy_metadata = True
+                return metadata
+        self._lazy_metadata = False
         ireq = self.ireq
         built = self.environment.build(ireq, self.hashes)
         if self.req.editable:
@@ -158,31 +192,80 @@ class Candidate:
         self.link = ireq.link
         return self.metadata
 
+    def _get_lazy_metadata(self) -> Optional[Metadata]:
+        link = self.link
+        if (
+            self.req.editable
+            or link is None
+            or not link.is_wheel
+            or link.scheme not in ("http", "https")
+        ):
+            return None
+        with context.profiler.phase("lazy_wheel", self.req.key):
+            with self.environment.get_finder() as finder:
+                try:
+                    return get_wheel_metadata_from_url(
+                        link.url_without_fragment, finder.session
+                    )
+                except (
+                    HTTPRangeRequestUnsupported,
+                    zipfile.BadZipFile,
+                    requests.RequestException,
+                ):
+                    # Fall back to downloading the whole wheel.
+                    return None
+
     def __repr__(self) -> str:
         return f"<Candidate {self.name} {self.version}>"
 
     @classmethod
-    def from_installation_candidate(
+    def from_file_records(
         cls,
-        candidate,  # type: shims.InstallationCandidate
+        records,  # type: List[Dict[str, Any]]
+        version,  # type: Any
         req,  # type: Requirement
         environment,  # type: Environment
     ):
         # type: (...) -> Candidate
-        """Build a candidate from pip's InstallationCandidate."""
+        """Build a candidate from the records of the files of the same version, as
+        found on the index pages. The wheel most specific to the environment is
+        preferred as the link, then the sdist. All files are kept in :attr:`links`.
+        """
+        priorities = environment.wheel_tag_priorities
+
+        def get_priority(record: Dict[str, Any]) -> int:
+            filename = record["filename"]
+            if not filename.endswith(".whl"):
+                return len(priorities)
+            file_tags = parse_tag("-".join(filename[:-4].split("-")[-3:]))
+            return min(
+                (priorities[tag] for tag in file_tags if tag in priorities),
+                default=len(priorities) + 1,
+            )
+
+        links = [
+            shims.Link(
+                record["url"],
+                requires_python=record.get("requires_python"),
+                yanked_reason=record.get("yanked_reason"),
+            )
+            for record in records
+        ]
+        best = min(range(len(records)), key=lambda i: get_priority(records[i]))
         inst = cls(
-            req,
-            environment,
-            name=candidate.name,
-            version=candidate.version,
-            link=candidate.link,
+            req, environment, name=req.project_name, version=version, link=links[best]
         )
+        inst.links = links
         return inst
 
+    def iter_links(self) -> Iterator[shims.Link]:
+        """Iterate over all distribution files of the candidate."""
+        return iter(self.links or [self.link])
+
     def get_dependencies_from_metadata(self) -> List[str]:
         """Get the dependencies of a candidate from metadata."""
         extras = self.req.extras or ()
-        metadata = self.get_metadata()
+        metadata = self.get_metadata(allow_lazy=True)
         if self.req.editable:
             if not metadata:
                 return []
@@ -208,9 +291,7 @@ class Candidate:
                 )
             if not requires_python or requires_python == "UNKNOWN":
                 requires_python = ""
-        if requires_python.isdigit():
-            requires_python = f">={requires_python},<{int(requires_python) + 1}"
-        return requires_python
+        return normalize_requires_python(requires_python)
 
     @requires_python.setter
     def requires_python(self, value: str) -> None:
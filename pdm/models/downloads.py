@@ -0,0 +1,137 @@
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from pip._vendor import requests
+from pip_shims import shims
+
+from pdm.context import context
+from pdm.exceptions import HashMismatchError
+from pdm.utils import format_size
+
+# Size of the chunks streamed from the response to the file.
+CHUNK_SIZE = 64 * 1024
+
+
+class Downloader:
+    """Download files concurrently into the cache, verifying the hashes while
+    streaming. Unfinished downloads are kept as ``<filename>.part`` and resumed
+    with a range request next time.
+
+    :param session: the session to download with, it is shared by the threads.
+    :param workers: the max number of concurrent downloads.
+    """
+
+    def __init__(self, session: requests.Session, workers: int = 4) -> None:
+        self.session = session
+        self.workers = workers
+        self._lock = threading.Lock()
+        self.downloaded_files = 0
+        self.downloaded_bytes = 0
+
+    @staticmethod
+    def _get_expected_hash(
+        link: shims.Link, hashes: Optional[Dict[str, str]]
+    ) -> Optional[Tuple[str, str]]:
+        value = (hashes or {}).get(link.filename)
+        if value and ":" in value:
+            hash_name, hash_value = value.split(":", 1)
+            return hash_name, hash_value
+        if link.hash and link.hash_name in hashlib.algorithms_guaranteed:
+            return link.hash_name, link.hash
+        return None
+
+    def download(
+        self,
+        link: shims.Link,
+        download_dir: Path,
+        hashes: Optional[Dict[str, str]] = None,
+    ) -> Path:
+        """Download the file of the link into the directory if it isn't there yet,
+        and return the path of it.
+
+        :param link: the link to download.
+        :param download_dir: the directory to save the file in.
+        :param hashes: a dict of filename: hash to verify the file against,
+            the hash in the link fragment is used if the file isn't in it.
+        :raises HashMismatchError: if the hash of the downloaded file doesn't match.
+        """
+        target = download_dir / link.filename
+        if target.is_file():
+            return target
+        expected = self._get_expected_hash(link, hashes)
+        hasher = hashlib.new(expected[0] if expected else "sha256")
+        partial = target.with_name(target.name + ".part")
+        download_dir.mkdir(parents=True, exist_ok=True)
+        start = time.perf_counter()
+
+        offset = partial.stat().st_size if partial.is_file() else 0
+        headers = {"Accept-Encoding": "identity"}
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+        with self.session.get(link.url, headers=headers, stream=True) as resp:
+            if offset and resp.status_code == 416:
+                # The partial file is broken, download it again.
+                partial.unlink()
+                return self.download(link, download_dir, hashes)
+            resp.raise_for_status()
+            if offset and resp.status_code == 206:
+                with partial.open("rb") as fp:
+                    for chunk in iter(lambda: fp.read(CHUNK_SIZE), b""):
+                        hasher.update(chunk)
+                mode = "ab"
+            else:
+                # The server ignores the range, start over.
+                offset, mode = 0, "wb"
+            received = 0
+            with partial.open(mode) as fp:
+                for chunk in resp.iter_content(CHUNK_SIZE):
+                    hasher.update(chunk)
+                    fp.write(chunk)
+                    received += len(chunk)
+
+        if expected and hasher.hexdigest() != expected[1]:
+            partial.unlink()
+            raise HashMismatchError(
+                f"Hash of {link.filename} doesn't match, "
+                f"expected {expected[0]}:{expected[1]}, got {hasher.hexdigest()}."
+            )
+        os.replace(partial, target)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.downloaded_files += 1
+            self.downloaded_bytes += received
+        context.profiler.count("downloaded_bytes", received)
+        resumed = f", resumed at {format_size(offset)}" if offset else ""
+        context.io.echo(
+            f"  Downloaded {context.io.cyan(link.filename)} "
+            f"({format_size(received)} in {elapsed:.2f}s{resumed})",
+            verbosity=context.io.DETAIL,
+        )
+        return target
+
+    def download_all(
+        self, items: Iterable[Tuple[shims.Link, Path, Optional[Dict[str, str]]]]
+    ) -> List[Path]:
+        """Download many files at once. The arguments of :meth:`download` are
+        given as tuples, and the paths are returned in the same order.
+        """
+        items = list(items)
+        if not items:
+            return []
+        start = time.perf_counter()
+        with context.profiler.phase("download"):
+            with ThreadPoolExecutor(min(self.workers, len(items))) as executor:
+                paths = list(executor.map(lambda item: self.download(*item), items))
+        if self.downloaded_files:
+            wall_time = time.perf_counter() - start
+            context.io.echo(
+                f"Downloaded {self.downloaded_files} files "
+                f"({format_size(self.downloaded_bytes)}) in {wall_time:.1f}s, "
+                f"{format_size(int(self.downloaded_bytes / (wall_time or 1)))}/s"
+            )
+        return paths
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import collections
+import json
 import os
 import shutil
 import sys
@@ -21,7 +22,9 @@ from pdm.utils import (
     cached_property,
     convert_hashes,
     create_tracked_tempdir,
+    get_file_hash,
     get_finder,
+    get_interpreter_abi_tag,
     get_pep508_environment,
     get_python_version,
 )
@@ -230,22 +233,41 @@ class Environment:
         self,
         sources: Optional[List[Source]] = None,
         ignore_requires_python: bool = False,
+        allow_all: bool = False,
     ) -> shims.PackageFinder:
         """Return the package finder of given index sources.
 
+        The finder and its session are pooled for the whole process, don't close
+        the session.
+
         :param sources: a list of sources the finder should search in.
         :param ignore_requires_python: whether to ignore the python version constraint.
+        :param allow_all: whether the finder allows wheels of all platforms and
+            Python versions, see :func:`allow_all_wheels`.
         """
         sources = sources or []
         python_version = get_python_version(self.python_executable)[:2]
-        finder = get_finder(
-            sources,
-            context.cache_dir.as_posix(),
+        cache_dir = context.cache_dir.as_posix()
+        key = (
+            json.dumps(sources, sort_keys=True),
+            cache_dir,
             python_version,
             ignore_requires_python,
+            allow_all,
+        )
+
+        def make_finder() -> shims.PackageFinder:
+            finder = get_finder(
+                sources, cache_dir, python_version, ignore_requires_python
+            )
+            return allow_all_wheels(finder) if allow_all else finder
+
+        yield context.finder_pool.get(
+            key,
+            make_finder,
+            self.config["pool_connections"],
+            self.config["pool_maxsize"],
         )
-        yield finder
-        finder.session.close()
 
     def build(
         self, ireq: shims.InstallRequirement, hashes: Optional[Dict[str, str]] = None
@@ -262,10 +284,10 @@ class Environment:
         from pdm.builders import WheelBuilder
 
         kwargs = self._make_building_args(ireq)
-        with self.get_finder() as finder:
-            with allow_all_wheels():
-                # temporarily allow all wheels to get a link.
-                ireq.populate_link(finder, False, bool(hashes))
+        with context.profiler.phase("build", ireq.name), self.get_finder() as finder:
+            with self.get_finder(allow_all=True) as all_finder:
+                # allow all wheels to get a link.
+                ireq.populate_link(all_finder, False, bool(hashes))
             if not ireq.editable and not ireq.req.name:
                 ireq.source_dir = kwargs["build_dir"]
             else:
@@ -278,6 +300,25 @@ class Environment:
                 only_download = True
             if hashes:
                 ireq.options["hashes"] = convert_hashes(hashes)
+            # Wheels built from released sdists are cached by the sdist hash.
+            wheel_cache = sdist_hash = None
+            if not (
+                ireq.editable
+                or ireq.link.is_wheel
+                or ireq.link.is_vcs
+                or ireq.link.is_existing_dir()
+            ):
+                wheel_cache = context.make_wheel_cache()
+                sdist_hash = self._get_sdist_hash(ireq.link, hashes, download_dir)
+                if sdist_hash:
+                    cached_wheel = wheel_cache.get(sdist_hash, self.interpreter_tag)
+                    if cached_wheel:
+                        return cached_wheel.as_posix()
+            if not ireq.link.is_file and not ireq.link.is_vcs:
+                cached = Path(download_dir, ireq.link.filename)
+                context.cache_manager.record(
+                    "wheels" if only_download else "pkgs", cached.is_file(), cached
+                )
             if not (ireq.editable and ireq.req.is_local_dir):
                 with global_tempdir_manager():
                     downloaded = shims.shim_unpack(
@@ -288,19 +329,88 @@ class Environment:
                         only_download=only_download,
                         session=finder.session,
                     )
+                    downloaded = getattr(downloaded, "path", downloaded)
                     # Preserve the downloaded file so that it won't be cleared.
                     if downloaded and only_download:
                         try:
                             shutil.copy(downloaded, download_dir)
                         except shutil.SameFileError:
                             pass
+                    if wheel_cache and not sdist_hash and downloaded:
+                        sdist_hash = get_file_hash(downloaded)
             # Now all source is prepared, build it.
             if ireq.link.is_wheel:
                 return (context.cache("wheels") / ireq.link.filename).as_posix()
             builder_class = EditableBuilder if ireq.editable else WheelBuilder
             kwargs["finder"] = finder
             with builder_class(ireq) as builder:
-                return builder.build(**kwargs)
+                built = builder.build(**kwargs)
+            if wheel_cache and sdist_hash:
+                built = wheel_cache.set(
+                    sdist_hash, self.interpreter_tag, Path(built)
+                ).as_posix()
+            return built
+
+    def get_cached_wheel(
+        self, link: shims.Link, hashes: Optional[Dict[str, str]] = None
+    ) -> Optional[Path]:
+        """Return the wheel built from the sdist link if it is cached, without
+        downloading the sdist.
+        """
+        sdist_hash = self._get_sdist_hash(
+            link, hashes, context.cache("pkgs").as_posix()
+        )
+        if not sdist_hash:
+            return None
+        return context.make_wheel_cache().get(sdist_hash, self.interpreter_tag)
+
+    @staticmethod
+    def _get_sdist_hash(
+        link: shims.Link, hashes: Optional[Dict[str, str]], download_dir: str
+    ) -> Optional[str]:
+        """Get the sha256 hash of the sdist without downloading it if possible."""
+        if link.hash_name == "sha256":
+            return link.hash
+        hash_name, _, hash_value = (hashes or {}).get(link.filename, "").partition(":")
+        if hash_name == "sha256" and hash_value:
+            return hash_value
+        for path in (
+            link.file_path if link.is_file else None,
+            os.path.join(download_dir, link.filename),
+        ):
+            if path and os.path.isfile(path):
+                return context.artifact_hasher.hash_file(path).split(":", 1)[1]
+        return None
+
+    @cached_property
+    def wheel_tag_priorities(self) -> Dict[Any, int]:
+        """The wheel tags supported by the interpreter, mapped to their priorities,
+        the lower the better.
+        """
+        python_version = get_python_version(self.python_executable)[:2]
+        tags = shims.TargetPython(py_version_info=python_version).get_tags()
+        return {tag: index for index, tag in enumerate(tags)}
+
+    @cached_property
+    def interpreter_tag(self) -> str:
+        """The tag of the interpreter and platform, like ``cp38-cp38-linux_x86_64``,
+        which the built wheels are compatible with.
+        """
+        info = self.marker_environment
+        impl = info["implementation_name"]
+        impl = {"cpython": "cp", "pypy": "pp", "ironpython": "ip", "jython": "jy"}.get(
+            impl, impl
+        )
+        python_version = get_python_version(self.python_executable)[:2]
+        abi = get_interpreter_abi_tag(self.python_executable) or "none"
+        platform = f"{info['sys_platform']}_{info['platform_machine']}"
+        return "-".join(
+            [
+                impl + "".join(map(str, python_version)),
+                abi,
+                platform.lower().replace("-", "_").replace(".", "_"),
+            ]
+        )
 
     def get_working_set(self) -> WorkingSet:
         """Get the working set based on local packages directory."""
@@ -0,0 +1,147 @@
+import io
+import zipfile
+from typing import Tuple
+
+from pip._vendor import requests
+
+from distlib.metadata import Metadata
+from pdm.exceptions import HTTPRangeRequestUnsupported
+
+# Size of the blocks fetched by range requests. The tail of the file is fetched
+# first as a bigger block since the central directory is there.
+BLOCK_SIZE = 64 * 1024
+TAIL_SIZE = 256 * 1024
+
+
+class LazyZipOverHTTP:
+    """A read-only, seekable file object of a remote file, fetching only the blocks
+    being read with HTTP range requests. It is good enough for :class:`ZipFile`.
+
+    :raises HTTPRangeRequestUnsupported: if the server doesn't support range requests.
+    """
+
+    def __init__(
+        self, url: str, session: requests.Session, block_size: int = BLOCK_SIZE
+    ) -> None:
+        self.url = url
+        self.session = session
+        self.block_size = block_size
+        self._blocks = {}  # type: dict
+        self._pos = 0
+        # Get the length together with the tail, in one request.
+        start, data, self.length = self._request(f"bytes=-{TAIL_SIZE}")
+        self._store(start, data)
+
+    def _request(self, byte_range: str) -> Tuple[int, bytes, int]:
+        resp = self.session.get(
+            self.url,
+            headers={"Range": byte_range, "Accept-Encoding": "identity"},
+            stream=True,
+        )
+        with resp:
+            resp.raise_for_status()
+            content_range = resp.headers.get("Content-Range", "")
+            if resp.status_code != 206 or not content_range.startswith("bytes "):
+                raise HTTPRangeRequestUnsupported(
+                    f"Range requests are not supported by {self.url}"
+                )
+            span, _, length = content_range[6:].partition("/")
+            start = int(span.partition("-")[0])
+            return start, resp.content, int(length)
+
+    def _store(self, start: int, data: bytes) -> None:
+        """Store the data fetched from ``start`` in blocks. Incomplete blocks are
+        only kept at the end of the file.
+        """
+        first = -(-start // self.block_size)
+        offset = first * self.block_size - start
+        while offset < len(data):
+            block_end = offset + self.block_size
+            block = data[offset:block_end]
+            index = (start + offset) // self.block_size
+            if (
+                len(block) == self.block_size
+                or start + offset + len(block) >= self.length
+            ):
+                self._blocks[index] = block
+            offset += self.block_size
+
+    def _ensure_blocks(self, first: int, last: int) -> None:
+        index = first
+        while index <= last:
+            if index in self._blocks:
+                index += 1
+                continue
+            # Fetch each run of consecutive missing blocks in one request.
+            run_end = index
+            while run_end < last and run_end + 1 not in self._blocks:
+                run_end += 1
+            start = index * self.block_size
+            end = min((run_end + 1) * self.block_size, self.length) - 1
+            _, data, _ = self._request(f"bytes={start}-{end}")
+            self._store(start, data)
+            if any(i not in self._blocks for i in range(index, run_end + 1)):
+                raise HTTPRangeRequestUnsupported(
+                    f"Incomplete range response from {self.url}"
+                )
+            index = run_end + 1
+
+    def read(self, size: int = -1) -> bytes:
+        end = self.length if size < 0 else min(self._pos + size, self.length)
+        if end <= self._pos:
+            return b""
+        first, last = self._pos // self.block_size, (end - 1) // self.block_size
+        self._ensure_blocks(first, last)
+        data = b"".join(self._blocks[i] for i in range(first, last + 1))
+        offset = first * self.block_size
+        start, stop = self._pos - offset, end - offset
+        result = data[start:stop]
+        self._pos = end
+        return result
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += self.length
+        if offset < 0:
+            raise ValueError(f"Negative seek position {offset}")
+        self._pos = offset
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seekable(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        self._blocks.clear()
+
+    def __enter__(self) -> "LazyZipOverHTTP":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+def get_wheel_metadata_from_url(url: str, session: requests.Session) -> Metadata:
+    """Read the metadata of a remote wheel, downloading only the central directory
+    and the ``.dist-info/METADATA`` member.
+
+    :raises HTTPRangeRequestUnsupported: if the server doesn't support range requests.
+    :raises zipfile.BadZipFile: if the file is not a valid wheel.
+    """
+    with LazyZipOverHTTP(url, session) as fp, zipfile.ZipFile(fp) as zf:
+        for name in zf.namelist():
+            parts = name.split("/")
+            if (
+                len(parts) == 2
+                and parts[0].endswith(".dist-info")
+                and parts[1] == "METADATA"
+            ):
+                break
+        else:
+            raise zipfile.BadZipFile(f"No .dist-info/METADATA is found in {url}")
+        with zf.open(name) as bf:
+            return Metadata(fileobj=io.TextIOWrapper(bf, encoding="utf-8"))
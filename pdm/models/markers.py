@@ -1,6 +1,7 @@
-import copy
 import operator
-from functools import reduce
+import threading
+import weakref
+from functools import lru_cache, reduce
 from typing import Any, Iterable, Optional, Tuple, Union
 
 from pip._vendor.packaging.markers import Marker as PackageMarker
@@ -9,76 +10,222 @@ from pdm.models.specifiers import PySpecSet
 from pdm.utils import join_list_with
 
 
+class _Expr:
+    """An interned node of a normalized marker expression.
+
+    ``op`` is one of "atom", "and" and "or". An atom holds the parsed
+    ``(lhs, op, rhs)`` tuple of packaging, the others hold their operands, which
+    are never of the same op. Nodes are interned by their ordered structure, so
+    identity comparison is enough to tell if two expressions are the same.
+    """
+
+    __slots__ = ("op", "args", "_str", "__weakref__")
+
+    _pool = weakref.WeakValueDictionary()
+    _lock = threading.Lock()
+
+    def __new__(cls, op: str, args: tuple) -> "_Expr":
+        if op == "atom":
+            key = (op, tuple(node.serialize() for node in args))
+        else:
+            # Operands are interned and kept alive by the node, ids are safe.
+            key = (op, tuple(id(arg) for arg in args))
+        with cls._lock:
+            inst = cls._pool.get(key)
+            if inst is None:
+                inst = super().__new__(cls)
+                inst.op = op
+                inst.args = args
+                inst._str = None
+                cls._pool[key] = inst
+        return inst
+
+    def __reduce__(self):
+        return _Expr, (self.op, self.args)
+
+    def __copy__(self) -> "_Expr":
+        return self
+
+    def __deepcopy__(self, memo) -> "_Expr":
+        return self
+
+    def __str__(self) -> str:
+        if self._str is None:
+            if self.op == "atom":
+                self._str = " ".join(node.serialize() for node in self.args)
+            elif self.op == "and":
+                self._str = " and ".join(
+                    f"({arg})" if arg.op == "or" else str(arg) for arg in self.args
+                )
+            else:
+                self._str = " or ".join(str(arg) for arg in self.args)
+        return self._str
+
+    def to_markers(self) -> list:
+        """Convert to the nested list structure used by packaging's Marker."""
+        if self.op == "atom":
+            return [self.args]
+        result = []
+        for arg in self.args:
+            if result:
+                result.append(self.op)
+            if arg.op == "or" and self.op == "and":
+                result.append(arg.to_markers())
+            else:
+                result.extend(arg.to_markers())
+        return result
+
+
+def _operands(expr: _Expr, op: str) -> set:
+    return set(expr.args) if expr.op == op else {expr}
+
+
+def _combine(op: str, left: _Expr, right: _Expr) -> _Expr:
+    inner = "or" if op == "and" else "and"
+    args = []
+    for expr in (left, right):
+        for arg in expr.args if expr.op == op else (expr,):
+            if arg not in args:
+                args.append(arg)
+    # Absorption: `a and (a or b)` is `a`, and `a or (a and b)` is `a`.
+    kept = []
+    for i, arg in enumerate(args):
+        if arg.op == inner:
+            own = set(arg.args)
+            if any(
+                j != i and _operands(other, inner) <= own
+                # Keep the first one of operands with the same terms.
+                and (j < i or _operands(other, inner) != own)
+                for j, other in enumerate(args)
+            ):
+                continue
+        kept.append(arg)
+    if len(kept) == 1:
+        return kept[0]
+    return _Expr(op, tuple(kept))
+
+
+@lru_cache(maxsize=4096)
+def _conjoin(left: _Expr, right: _Expr) -> _Expr:
+    if left is right:
+        return left
+    return _combine("and", left, right)
+
+
+@lru_cache(maxsize=4096)
+def _disjoin(left: _Expr, right: _Expr) -> _Expr:
+    if left is right:
+        return left
+    return _combine("or", left, right)
+
+
+def _parse_markers(markers: list) -> _Expr:
+    groups = [[]]
+    for marker in markers:
+        if marker == "or":
+            groups.append([])
+        elif isinstance(marker, list):
+            groups[-1].append(_parse_markers(marker))
+        elif marker != "and":
+            groups[-1].append(_Expr("atom", marker))
+    return reduce(_disjoin, (reduce(_conjoin, group) for group in groups))
+
+
+@lru_cache(maxsize=1024)
+def _parse_marker(text: str) -> _Expr:
+    return _parse_markers(PackageMarker(text)._markers)
+
+
+def _as_expr(marker: PackageMarker) -> _Expr:
+    if isinstance(marker, Marker):
+        return marker._expr
+    return _parse_markers(marker._markers)
+
+
 class Marker(PackageMarker):
-    """A subclass of Marker that supports union and intersection merging."""
+    """A subclass of Marker that supports union and intersection merging.
 
-    def copy(self) -> "Marker":
-        inst = self.__class__('os_name == "nt"')
-        inst._markers = copy.deepcopy(self._markers)
+    The marker is held as an interned and normalized expression, so merging and
+    comparing markers don't need to format and parse marker strings.
+    """
+
+    def __init__(self, marker: str) -> None:
+        self._expr = _parse_marker(marker)
+        self._marker_list = None  # type: Optional[list]
+
+    @classmethod
+    def _from_expr(cls, expr: _Expr) -> "Marker":
+        inst = cls.__new__(cls)
+        inst._expr = expr
+        inst._marker_list = None
         return inst
 
+    @property
+    def _markers(self) -> list:
+        if self._marker_list is None:
+            self._marker_list = self._expr.to_markers()
+        return self._marker_list
+
+    @_markers.setter
+    def _markers(self, value: list) -> None:
+        self._marker_list = value
+        self._expr = _parse_markers(value)
+
+    def __str__(self) -> str:
+        return str(self._expr)
+
+    def copy(self) -> "Marker":
+        return self._from_expr(self._expr)
+
+    def _merged(self, expr: _Expr) -> "Marker":
+        return self if expr is self._expr else self._from_expr(expr)
+
     def __and__(self, other: Optional[PackageMarker]) -> "Marker":
         """Intersect the two markers."""
-        if other is None or self == other:
+        if other is None:
             return self
-        lhs = f"({self})" if "or" in self._markers else str(self)
-        rhs = f"({other})" if "or" in other._markers else str(other)
-        marker_str = f"{lhs} and {rhs}"
-        return type(self)(marker_str)
+        return self._merged(_conjoin(self._expr, _as_expr(other)))
 
     def __rand__(self, other: Optional[PackageMarker]) -> "Marker":
-        if other is None or self == other:
+        if other is None:
             return self
-        rhs = f"({self})" if "or" in self._markers else str(self)
-        lhs = f"({other})" if "or" in other._markers else str(other)
-        marker_str = f"{lhs} and {rhs}"
-        return type(self)(marker_str)
+        return self._merged(_conjoin(_as_expr(other), self._expr))
 
     def __or__(self, other: Optional[PackageMarker]) -> "Marker":
         """Union the two markers."""
-        if None in (self, other):
+        if other is None:
             return None
-        if self == other:
-            return self
-        marker_str = f"{self} or {other}"
-        return type(self)(marker_str)
+        return self._merged(_disjoin(self._expr, _as_expr(other)))
 
     def __ror__(self, other: Optional[PackageMarker]) -> "Marker":
-        if None in (self, other):
+        if other is None:
             return None
-        if self == other:
-            return self
-        marker_str = f"{other} or {self}"
-        return type(self)(marker_str)
+        return self._merged(_disjoin(_as_expr(other), self._expr))
 
     def __eq__(self, other: Any) -> bool:
         if not isinstance(other, PackageMarker):
             return False
-        return str(self) == str(other)
+        return self._expr is _as_expr(other)
+
+    def __hash__(self) -> int:
+        return hash(self._expr)
 
     def split_pyspec(self) -> Tuple[Optional["Marker"], PySpecSet]:
         """Split `python_version` and `python_full_version` from marker string"""
-        if _only_contains_python_keys(self._markers):
+        if _only_contains_python_keys(self._expr):
             return None, _build_pyspec_from_marker(self._markers)
-        if "or" in self._markers:
+        if self._expr.op == "or":
             return self.copy(), PySpecSet()
-        py_markers = [
-            marker
-            for marker in self._markers
-            if marker != "and" and _only_contains_python_keys(marker)
-        ]
-        rest = [
-            marker
-            for marker in self._markers
-            if marker != "and" and marker not in py_markers
-        ]
-        new_markers = join_list_with(rest, "and")
-        if not new_markers:
-            marker = None
-        else:
-            marker = self.copy()
-            marker._markers = new_markers
-        return marker, _build_pyspec_from_marker(join_list_with(py_markers, "and"))
+        operands = self._expr.args if self._expr.op == "and" else (self._expr,)
+        py_markers = [e for e in operands if _only_contains_python_keys(e)]
+        rest = [e for e in operands if e not in py_markers]
+        if not py_markers:
+            return self.copy(), PySpecSet()
+        marker = self._from_expr(reduce(_conjoin, rest))
+        return (
+            marker,
+            _build_pyspec_from_marker(reduce(_conjoin, py_markers).to_markers()),
+        )
 
 
 def get_marker(marker: Union[PackageMarker, Marker, None]) -> Optional[Marker]:
@@ -116,16 +263,10 @@ def split_marker_element(
     return result, marker
 
 
-def _only_contains_python_keys(markers):
-    if isinstance(markers, tuple):
-        return markers[0].value in ("python_version", "python_full_version")
-
-    for marker in markers:
-        if marker in ("and", "or"):
-            continue
-        if not _only_contains_python_keys(marker):
-            return False
-    return True
+def _only_contains_python_keys(expr: _Expr) -> bool:
+    if expr.op == "atom":
+        return expr.args[0].value in ("python_version", "python_full_version")
+    return all(_only_contains_python_keys(arg) for arg in expr.args)
 
 
 def _build_pyspec_from_marker(markers):
@@ -1,40 +1,175 @@
 from __future__ import annotations
 
+import collections
+import inspect
+import posixpath
 import sys
+import threading
+import urllib.parse as parse
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import ExitStack
 from functools import wraps
-from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Tuple
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
+
+from pip._internal.index.collector import (
+    HTMLPage,
+    _get_encoding_from_headers,
+    parse_links,
+)
+from pip._internal.index.package_finder import _extract_version_from_fragment
+from pip._internal.utils.misc import splitext
+from pip._internal.utils.unpacking import SUPPORTED_EXTENSIONS
+from pip._vendor import requests
+from pip._vendor.packaging.utils import canonicalize_name
+from pip._vendor.packaging.version import parse as parse_version
 
+from distlib.util import DistlibException
 from pdm._types import CandidateInfo, Source
 from pdm.context import context
 from pdm.exceptions import CandidateInfoNotFound, CorruptedCacheError
-from pdm.models.candidates import Candidate
+from pdm.models.candidates import Candidate, normalize_requires_python
 from pdm.models.requirements import (
     Requirement,
     filter_requirements_with_extras,
     parse_requirement,
 )
 from pdm.models.specifiers import PySpecSet, SpecifierSet
-from pdm.utils import allow_all_wheels, get_pypi_source
+from pdm.utils import get_pypi_source, parse_name_version_from_wheel
 
 if TYPE_CHECKING:
+    from pip_shims import shims
+
     from pdm.models.environment import Environment
 
 
+# Content types of the simple repository API, see PEP 691.
+SIMPLE_JSON_TYPE = "application/vnd.pypi.simple.v1+json"
+SIMPLE_HTML_TYPE = "application/vnd.pypi.simple.v1+html"
+SIMPLE_ACCEPT = f"{SIMPLE_JSON_TYPE}, {SIMPLE_HTML_TYPE}; q=0.1, text/html; q=0.01"
+
+
+# Pip caches the links parsed from a page since 20.1, unless this is False. A page
+# is only parsed once before its links are cached here.
+HTML_PAGE_OPTIONS = (
+    {"cache_link_parsing": False}
+    if "cache_link_parsing" in inspect.signature(HTMLPage).parameters
+    else {}
+)
+
+# Fields of the JSON API release info used to get the candidate info.
+JSON_INFO_FIELDS = ("requires_python", "summary", "requires_dist", "requires")
+
+
+def parse_json_page(data: Dict[str, Any], page_url: str) -> List[Dict[str, Any]]:
+    """Parse a PEP 691 JSON project page into file records with keys ``url``,
+    ``filename``, ``requires_python``, ``yanked_reason`` and ``hashes``.
+    """
+    records = []
+    for file in data.get("files", []):
+        url = parse.urljoin(page_url, file["url"])
+        hashes = file.get("hashes") or {}
+        if hashes and "#" not in url:
+            # Put a hash in the fragment, like the HTML page does.
+            name = "sha256" if "sha256" in hashes else next(iter(hashes))
+            url = f"{url}#{name}={hashes[name]}"
+        yanked = file.get("yanked", False)
+        records.append(
+            {
+                "url": url,
+                "filename": file["filename"],
+                "requires_python": file.get("requires-python") or None,
+                "yanked_reason": (
+                    yanked if isinstance(yanked, str) else ("" if yanked else None)
+                ),
+                "hashes": hashes,
+            }
+        )
+    return records
+
+
+def get_link_record(link: shims.Link) -> Dict[str, Any]:
+    """Get the file record of a link parsed by pip."""
+    return {
+        "url": link.url,
+        "filename": link.filename,
+        "requires_python": link.requires_python,
+        "yanked_reason": link.yanked_reason,
+    }
+
+
+def get_local_records(
+    finder: shims.PackageFinder, project_name: str
+) -> List[Dict[str, Any]]:
+    """Collect the file records of a project from the local indexes and find-links
+    of the finder.
+    """
+    collector = finder._link_collector
+    collected = collector.collect_links(project_name)
+    links = list(collected.files) + list(collected.find_links)
+    for project_url in collected.project_urls:
+        page = collector.fetch_page(project_url)
+        if page is not None:
+            links.extend(parse_links(page))
+    return [get_link_record(link) for link in links]
+
+
+def get_file_version(filename: str, canonical_name: str) -> Optional[str]:
+    """Get the version of a wheel or sdist from its filename, or None if it isn't
+    a distribution file of the given project.
+    """
+    if filename.endswith(".whl"):
+        try:
+            name, version = parse_name_version_from_wheel(filename)
+        except DistlibException:
+            return None
+        return version if canonicalize_name(name) == canonical_name else None
+    stem, ext = splitext(filename)
+    if ext not in SUPPORTED_EXTENSIONS:
+        return None
+    return _extract_version_from_fragment(stem, canonical_name)
+
+
 def cache_result(
     func: Callable[["BaseRepository", Candidate], CandidateInfo]
 ) -> Callable[["BaseRepository", Candidate], CandidateInfo]:
+    """Save the unfiltered candidate info returned by ``func`` to the cache, and
+    return it filtered with the extras of the candidate.
+    """
+
     @wraps(func)
     def wrapper(self, candidate: Candidate) -> CandidateInfo:
         result = func(self, candidate)
-        self._candidate_info_cache.set(candidate, result)
-        return result
+        self._candidate_info_cache.set(
+            candidate, self._get_cache_source(candidate), result
+        )
+        return filter_candidate_info(candidate, result)
 
     return wrapper
 
 
+def filter_candidate_info(candidate: Candidate, info: CandidateInfo) -> CandidateInfo:
+    requirement_lines, requires_python, summary = info
+    requirements = filter_requirements_with_extras(
+        requirement_lines, candidate.req.extras or ()
+    )
+    return requirements, requires_python, summary
+
+
 class BaseRepository:
     """A Repository acts as the source of packages and metadata."""
 
+    #: Max number of threads to download files whose hashes are unknown.
+    hash_workers = 4
+
     def __init__(self, sources: List[Source], environment: Environment) -> None:
         """
         :param sources: a list of sources to download packages from.
@@ -52,31 +187,50 @@ class BaseRepository:
         return [source for source in self.sources if source["name"] == req.index]
 
     def get_dependencies(
-        self, candidate: Candidate
+        self, candidate: Candidate, allow_build: bool = True
     ) -> Tuple[List[Requirement], PySpecSet, str]:
-        """Get (dependencies, python_specifier, summary) of the candidate."""
+        """Get (dependencies, python_specifier, summary) of the candidate.
+
+        :param candidate: the candidate to get dependencies of.
+        :param allow_build: whether to fall back to building the candidate for
+            metadata. If False, this is safe to be called from a worker thread.
+        """
+        with context.profiler.phase("get_dependencies", candidate.req.key):
+            requirements, requires_python, summary = self._get_candidate_info(
+                candidate, allow_build
+            )
+        requirements = [parse_requirement(line) for line in requirements]
+        if candidate.req.extras:
+            # HACK: If this candidate has extras, add the original candidate
+            # (same pinned version, no extras) as its dependency. This ensures
+            # the same package with different extras (treated as distinct by
+            # the resolver) have the same version.
+            self_req = candidate.req.copy()
+            self_req.extras = None
+            requirements.append(self_req)
+        return requirements, PySpecSet(requires_python), summary
+
+    def _get_candidate_info(
+        self, candidate: Candidate, allow_build: bool
+    ) -> CandidateInfo:
         requirements, requires_python, summary = [], "", ""
         last_ext_info = None
         for getter in self.dependency_generators():
+            if not allow_build and getter == self._get_dependencies_from_metadata:
+                continue
+            getter_name = getattr(getter, "__name__", repr(getter))
             try:
                 requirements, requires_python, summary = getter(candidate)
             except CandidateInfoNotFound:
+                context.profiler.record_generator(getter_name, False)
                 last_ext_info = sys.exc_info()
                 continue
+            context.profiler.record_generator(getter_name, True)
             break
         else:
             if last_ext_info is not None:
                 raise last_ext_info[1].with_traceback(last_ext_info[2])
-        requirements = [parse_requirement(line) for line in requirements]
-        if candidate.req.extras:
-            # HACK: If this candidate has extras, add the original candidate
-            # (same pinned version, no extras) as its dependency. This ensures
-            # the same package with different extras (treated as distinct by
-            # the resolver) have the same version.
-            self_req = candidate.req.copy()
-            self_req.extras = None
-            requirements.append(self_req)
-        return requirements, PySpecSet(requires_python), summary
+        return requirements, requires_python, summary
 
     def find_matches(
         self,
@@ -94,15 +248,16 @@ class BaseRepository:
         :param allow_all: whether allow all wheels.
         :returns: a list of candidates.
         """
-        if requirement.is_named:
-            return self._find_named_matches(
-                requirement, requires_python, allow_prereleases
-            )
-        else:
-            # Fetch metadata so that resolver can know the candidate's name.
-            can = Candidate(requirement, self.environment)
-            can.get_metadata()
-            return [can]
+        with context.profiler.phase("find_matches", requirement.key):
+            if requirement.is_named:
+                return self._find_named_matches(
+                    requirement, requires_python, allow_prereleases, allow_all
+                )
+            else:
+                # Fetch metadata so that resolver can know the candidate's name.
+                can = Candidate(requirement, self.environment)
+                can.get_metadata()
+                return [can]
 
     def _find_named_matches(
         self,
@@ -116,22 +271,54 @@ class BaseRepository:
         """
         raise NotImplementedError
 
+    def prefetch_matches(self, requirements: Iterable[Requirement]) -> None:
+        """Start discovering the candidates of many requirements at once, so that
+        the following :meth:`find_matches` calls don't wait for each of them.
+        Do nothing by default, let it to be implemented in subclasses.
+        """
+
+    def close(self) -> None:
+        """Cancel the pending discoveries started by :meth:`prefetch_matches`
+        and commit the cached candidate info.
+        """
+        self._candidate_info_cache.flush()
+
+    def _get_cache_source(self, candidate: Candidate) -> str:
+        """Get where the candidate comes from, to tell apart the same name and
+        version served by different indexes in the candidate info cache.
+        """
+        if not candidate.req.is_named:
+            return candidate.req.url
+        return " ".join(
+            source["url"] for source in self.get_filtered_sources(candidate.req)
+        )
+
     def _get_dependencies_from_cache(self, candidate: Candidate) -> CandidateInfo:
         try:
-            result = self._candidate_info_cache.get(candidate)
+            result = self._candidate_info_cache.get(
+                candidate, self._get_cache_source(candidate)
+            )
         except CorruptedCacheError:
             self._candidate_info_cache.clear()
             raise CandidateInfoNotFound(candidate)
         except KeyError:
             raise CandidateInfoNotFound(candidate)
-        return result
+        return filter_candidate_info(candidate, result)
 
-    @cache_result
     def _get_dependencies_from_metadata(self, candidate: Candidate) -> CandidateInfo:
-        deps = candidate.get_dependencies_from_metadata()
-        requires_python = candidate.requires_python
-        summary = candidate.metadata.summary
-        return deps, requires_python, summary
+        if candidate.req.editable:
+            # Dependencies of editable candidates are read from the egg info,
+            # with extras applied. They are not cached.
+            deps = candidate.get_dependencies_from_metadata()
+            return deps, candidate.requires_python, candidate.metadata.summary
+        return self._get_raw_dependencies_from_metadata(candidate)
+
+    @cache_result
+    def _get_raw_dependencies_from_metadata(
+        self, candidate: Candidate
+    ) -> CandidateInfo:
+        metadata = candidate.get_metadata(allow_lazy=True)
+        return metadata.run_requires, candidate.requires_python, metadata.summary
 
     def get_hashes(self, candidate: Candidate) -> Optional[Dict[str, str]]:
         """Get hashes of all possible installable candidates of a given package version.
@@ -144,16 +331,67 @@ class BaseRepository:
             return
         if candidate.hashes:
             return candidate.hashes
-        req = candidate.req.copy()
-        req.specifier = SpecifierSet(f"=={candidate.version}")
-        with allow_all_wheels():
+        with context.profiler.phase("get_hashes", candidate.req.key):
+            req = candidate.req.copy()
+            req.specifier = SpecifierSet(f"=={candidate.version}")
             matching_candidates = self.find_matches(req, allow_all=True)
-        with self.environment.get_finder(self.sources) as finder:
-            self._hash_cache.session = finder.session
-            return {
-                c.link.filename: self._hash_cache.get_hash(c.link)
-                for c in matching_candidates
-            }
+            links = [link for c in matching_candidates for link in c.iter_links()]
+            hashes = {}
+            for link in links:
+                hash_value = self._hash_cache.get_known_hash(link)
+                if hash_value:
+                    hashes[link.filename] = hash_value
+            context.profiler.count("hashes_from_index", len(hashes))
+            missing = [link for link in links if link.filename not in hashes]
+            if missing:
+                digests = self._get_hashes_from_index(candidate)
+                for link in missing:
+                    if link.filename in digests:
+                        hashes[link.filename] = self._hash_cache.set_hash(
+                            link, digests[link.filename]
+                        )
+                        context.profiler.count("hashes_from_json")
+                missing = [link for link in missing if link.filename not in hashes]
+            local_links = [link for link in missing if link.is_file]
+            if local_links:
+                local_hashes = context.artifact_hasher.hash_files(
+                    link.file_path for link in local_links
+                )
+                hashes.update(
+                    (link.filename, local_hashes[link.file_path])
+                    for link in local_links
+                )
+                missing = [link for link in missing if not link.is_file]
+            if missing:
+                # The last resort, download the files to hash them.
+                with self.environment.get_finder(self.sources) as finder:
+                    self._hash_cache.session = finder.session
+                    with ThreadPoolExecutor(
+                        min(self.hash_workers, len(missing))
+                    ) as executor:
+                        hashes.update(
+                            zip(
+                                (link.filename for link in missing),
+                                executor.map(self._download_hash, missing),
+                            )
+                        )
+            return {link.filename: hashes[link.filename] for link in links}
+
+    def _get_hashes_from_index(self, candidate: Candidate) -> Dict[str, str]:
+        """Get the hashes of the files of the candidate version from the index
+        metadata, as a dict of filename: hash. Let it to be implemented in subclasses.
+        """
+        return {}
+
+    def _download_hash(self, link: shims.Link) -> str:
+        context.io.echo(
+            f"  Downloading {context.io.cyan(link.filename)} to get the hash",
+            verbosity=context.io.DETAIL,
+        )
+        with context.profiler.phase("hash_download", link.filename):
+            hash_value = self._hash_cache.get_hash(link)
+        context.profiler.count("hashes_downloaded")
+        return hash_value
 
     def _get_dependencies_from_lockfile(self, candidate: Candidate) -> CandidateInfo:
         if candidate.dependencies is None:
@@ -174,11 +412,185 @@ class BaseRepository:
 class PyPIRepository(BaseRepository):
     """Get package and metadata from PyPI source."""
 
-    @cache_result
-    def _get_dependencies_from_json(self, candidate: Candidate) -> CandidateInfo:
-        if not candidate.name or not candidate.version:
-            # Only look for json api for named requirements.
-            raise CandidateInfoNotFound(candidate)
+    #: Max number of threads to fetch index pages in background, 0 to disable.
+    index_workers = 8
+    #: Max number of concurrent requests to the same index host.
+    max_requests_per_host = 4
+
+    def __init__(self, sources: List[Source], environment: Environment) -> None:
+        super().__init__(sources, environment)
+        self._executor = None  # type: Optional[ThreadPoolExecutor]
+        # (source urls, project key) -> Future of the (version, file record) pairs
+        self._index_pages = {}  # type: Dict[Tuple[Tuple[str, ...], str], Future]
+        self._host_semaphores = collections.defaultdict(
+            lambda: threading.BoundedSemaphore(self.max_requests_per_host)
+        )  # type: Dict[str, threading.BoundedSemaphore]
+        self._index_page_cache = context.make_index_page_cache()
+        # (project key, version) -> release data from the JSON API
+        self._json_releases = {}  # type: Dict[Tuple[str, str], Optional[Dict]]
+
+    def _get_index_key(
+        self, sources: List[Source], requirement: Requirement
+    ) -> Tuple[Tuple[str, ...], str]:
+        return tuple(source.get("url", "") for source in sources), requirement.key
+
+    def _fetch_index_page(
+        self,
+        sources: List[Source],
+        project_name: str,
+        semaphores: List[threading.BoundedSemaphore],
+    ) -> List[Tuple[Any, Dict[str, Any]]]:
+        """Fetch and parse the simple pages of a project from all given sources.
+        Return the distribution files of the project as (version, record) pairs,
+        wheels of all platforms included. This is safe to be called from a worker
+        thread.
+        """
+        canonical_name = canonicalize_name(project_name)
+        with ExitStack() as stack:
+            for semaphore in semaphores:
+                stack.enter_context(semaphore)
+            with self.environment.get_finder(sources) as finder:
+                result = []
+                seen = set()
+                for source in sources:
+                    if not source["url"].startswith(("http://", "https://")):
+                        # Local indexes are cheap, they are not cached.
+                        with self.environment.get_finder([source]) as local_finder:
+                            records = get_local_records(local_finder, project_name)
+                    else:
+                        records = self._get_page_records(
+                            finder.session, source["url"], project_name
+                        )
+                    for record in records:
+                        version = get_file_version(record["filename"], canonical_name)
+                        if version is None or record["url"] in seen:
+                            continue
+                        seen.add(record["url"])
+                        result.append((parse_version(version), record))
+                return result
+
+    def _get_page_records(
+        self, session: requests.Session, index_url: str, project_name: str
+    ) -> List[Dict[str, Any]]:
+        """Get the file records on the simple page of a project. Parsed records are
+        cached and revalidated with a conditional request, so an unchanged page is
+        not downloaded nor parsed again.
+        """
+        url = posixpath.join(index_url, parse.quote(canonicalize_name(project_name)))
+        if not url.endswith("/"):
+            url += "/"
+        entry = self._index_page_cache.get(url)
+        # Don't let pip's HTTP cache keep another copy of the page.
+        headers = {"Accept": SIMPLE_ACCEPT, "Cache-Control": "max-age=0, no-store"}
+        if entry is not None:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+        try:
+            resp = session.get(url, headers=headers)
+            if resp.status_code == 304 and entry is not None:
+                context.profiler.count("index_pages_not_modified")
+                return entry["links"]
+            if resp.status_code == 404:
+                # The project isn't on this index.
+                return []
+            resp.raise_for_status()
+        except requests.RequestException as e:
+            if entry is None:
+                raise
+            context.io.echo(
+                f"Failed to fetch {url}: {e}, using the cached page",
+                err=True,
+                verbosity=context.io.DETAIL,
+            )
+            return entry["links"]
+        content_type = resp.headers.get("Content-Type", "").lower()
+        if content_type.startswith(SIMPLE_JSON_TYPE):
+            context.profiler.count("index_pages_json")
+            records = parse_json_page(resp.json(), resp.url)
+        elif content_type.startswith(("text/html", SIMPLE_HTML_TYPE)):
+            page = HTMLPage(
+                resp.content,
+                _get_encoding_from_headers(resp.headers),
+                resp.url,
+                **HTML_PAGE_OPTIONS,
+            )
+            records = [get_link_record(link) for link in parse_links(page)]
+        else:
+            return []
+        entry = self._index_page_cache.set(
+            url, records, resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+        )
+        return entry["links"]
+
+    def _get_host_semaphores(
+        self, sources: List[Source]
+    ) -> List[threading.BoundedSemaphore]:
+        # Sorted to always acquire them in the same order.
+        hosts = sorted({parse.urlparse(s.get("url", "")).netloc for s in sources})
+        return [self._host_semaphores[host] for host in hosts]
+
+    def prefetch_matches(self, requirements: Iterable[Requirement]) -> None:
+        if self.index_workers <= 0:
+            return
+        for requirement in requirements:
+            if not requirement.is_named:
+                continue
+            sources = self.get_filtered_sources(requirement)
+            key = self._get_index_key(sources, requirement)
+            if key in self._index_pages:
+                continue
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.index_workers)
+            context.profiler.count("prefetched_index_pages")
+            self._index_pages[key] = self._executor.submit(
+                self._fetch_index_page,
+                sources,
+                requirement.project_name,
+                self._get_host_semaphores(sources),
+            )
+
+    def close(self) -> None:
+        super().close()
+        if self._executor is None:
+            return
+        # Drop the cancelled ones so that they are fetched again if needed.
+        self._index_pages = {
+            key: future
+            for key, future in self._index_pages.items()
+            if not future.cancel()
+        }
+        self._executor.shutdown(wait=False)
+        self._executor = None
+
+    def _get_index_files(
+        self, requirement: Requirement
+    ) -> List[Tuple[Any, Dict[str, Any]]]:
+        sources = self.get_filtered_sources(requirement)
+        key = self._get_index_key(sources, requirement)
+        future = self._index_pages.get(key)
+        if future is not None and not future.cancelled():
+            try:
+                return future.result()
+            except Exception:
+                # Fetch again in the main thread so that errors are raised there.
+                pass
+        result = self._fetch_index_page(
+            sources, requirement.project_name, self._get_host_semaphores(sources)
+        )
+        future = Future()
+        future.set_result(result)
+        self._index_pages[key] = future
+        return result
+
+    def _get_json_release(self, candidate: Candidate) -> Optional[Dict[str, Any]]:
+        """Get the release data of the candidate from the JSON API of the sources,
+        or None if it isn't available.
+        """
+        key = (candidate.req.key, str(candidate.version))
+        if key in self._json_releases:
+            return self._json_releases[key]
         sources = self.get_filtered_sources(candidate.req)
         url_prefixes = [
             proc_url[:-7]  # Strip "/simple".
@@ -188,27 +600,55 @@ class PyPIRepository(BaseRepository):
             )
             if proc_url.endswith("/simple")
         ]
+        release = None
         with self.environment.get_finder(sources) as finder:
             session = finder.session
             for prefix in url_prefixes:
                 json_url = f"{prefix}/pypi/{candidate.name}/{candidate.version}/json"
                 resp = session.get(json_url)
-                if not resp.ok:
-                    continue
+                if resp.ok:
+                    data = resp.json()
+                    # Only keep what is used, leave out the long description.
+                    release = {
+                        "info": {
+                            k: v
+                            for k, v in data["info"].items()
+                            if k in JSON_INFO_FIELDS
+                        },
+                        "urls": data.get("urls") or [],
+                    }
+                    break
+        self._json_releases[key] = release
+        return release
 
-                info = resp.json()["info"]
+    @cache_result
+    def _get_dependencies_from_json(self, candidate: Candidate) -> CandidateInfo:
+        if not candidate.name or not candidate.version:
+            # Only look for json api for named requirements.
+            raise CandidateInfoNotFound(candidate)
+        release = self._get_json_release(candidate)
+        if release is None:
+            raise CandidateInfoNotFound(candidate)
+        info = release["info"]
 
-                requires_python = info["requires_python"] or ""
-                summary = info["summary"] or ""
-                try:
-                    requirement_lines = info["requires_dist"] or []
-                except KeyError:
-                    requirement_lines = info["requires"] or []
-                requirements = filter_requirements_with_extras(
-                    requirement_lines, candidate.req.extras or ()
-                )
-                return requirements, requires_python, summary
-        raise CandidateInfoNotFound(candidate)
+        requires_python = info["requires_python"] or ""
+        summary = info["summary"] or ""
+        try:
+            requirement_lines = info["requires_dist"] or []
+        except KeyError:
+            requirement_lines = info["requires"] or []
+        return requirement_lines, requires_python, summary
+
+    def _get_hashes_from_index(self, candidate: Candidate) -> Dict[str, str]:
+        if not candidate.req.is_named:
+            return {}
+        release = self._get_json_release(candidate)
+        result = {}
+        for file in (release or {}).get("urls") or []:
+            digests = file.get("digests") or {}
+            if "sha256" in digests:
+                result[file["filename"]] = f"sha256:{digests['sha256']}"
+        return result
 
     def dependency_generators(self) -> Iterable[Callable[[Candidate], CandidateInfo]]:
         return (
@@ -225,35 +665,39 @@ class PyPIRepository(BaseRepository):
         allow_prereleases: Optional[bool] = None,
         allow_all: bool = False,
     ) -> List[Candidate]:
-        sources = self.get_filtered_sources(requirement)
         # `allow_prereleases` is None means leave it to specifier to decide whether to
         # include prereleases
         if allow_prereleases is None:
             allow_prereleases = requirement.allow_prereleases
 
-        with self.environment.get_finder(sources) as finder, allow_all_wheels():
-            cans = [
-                Candidate.from_installation_candidate(c, requirement, self.environment)
-                for c in finder.find_all_candidates(requirement.project_name)
-            ]
-        sorted_cans = sorted(
-            (
-                c
-                for c in cans
-                if requirement.specifier.contains(c.version, allow_prereleases)
-            ),
-            key=lambda c: (c.version, c.ireq.is_wheel),
+        # One candidate per version, carrying all files of the version. Files are
+        # filtered by their own requires-python before the link is chosen, and
+        # only the matching versions are turned into candidates.
+        files_by_version = {}  # type: Dict[Any, List[Dict[str, Any]]]
+        python_matches = {}  # type: Dict[str, bool]
+        for version, record in self._get_index_files(requirement):
+            if not allow_all:
+                spec = record.get("requires_python") or ""
+                if spec not in python_matches:
+                    python_matches[spec] = requires_python.is_subset(
+                        normalize_requires_python(spec)
+                    )
+                if not python_matches[spec]:
+                    continue
+            files_by_version.setdefault(version, []).append(record)
+        versions = sorted(
+            v
+            for v in files_by_version
+            if requirement.specifier.contains(v, allow_prereleases)
         )
-        if not allow_all:
-            sorted_cans = [
-                can
-                for can in sorted_cans
-                if requires_python.is_subset(can.requires_python)
-            ]
-        if not sorted_cans and allow_prereleases is None:
+        if not versions and allow_prereleases is None:
             # No non-pre-releases is found, force pre-releases now
-            sorted_cans = sorted(
-                (c for c in cans if requirement.specifier.contains(c.version, True)),
-                key=lambda c: c.version,
+            versions = sorted(
+                v for v in files_by_version if requirement.specifier.contains(v, True)
+            )
+        return [
+            Candidate.from_file_records(
+                files_by_version[v], v, requirement, self.environment
             )
-        return sorted_cans
+            for v in versions
+        ]
@@ -1,6 +1,7 @@
+import heapq
 import re
 from functools import lru_cache
-from typing import List, Optional, Set, Tuple, Union
+from typing import Any, Optional, Tuple, Union
 
 from pip._vendor.packaging.specifiers import SpecifierSet
 
@@ -42,30 +43,108 @@ def _complete_version(
     return version + (3 - len(version)) * (complete_with,)
 
 
-def _version_part_match(
-    valid_version: Tuple[int, ...], target_version: Tuple[int, ...]
-) -> bool:
-    return target_version[: len(valid_version)] == valid_version
-
-
 def _convert_to_version(version_tuple: Tuple[Union[int, str], ...]) -> str:
     return ".".join(str(i) for i in version_tuple)
 
 
-def _restrict_versions_to_range(versions, lower, upper):
-    for version in versions:
-        try:
-            if version < lower:
-                continue
-            elif version >= upper:
-                break
-            else:  # lower <= version < upper
-                yield version
-        except TypeError:  # a wildcard match, count the version in.
-            yield version
+VersionTuple = Tuple[int, int, int]
+# A normalized python version range: sorted, disjoint and non-adjacent half-open
+# intervals of [lower, upper).
+Intervals = Tuple[Tuple[VersionTuple, VersionTuple], ...]
+
+MIN_VERSION = (-1, -1, -1)
+MAX_VERSION = (99, 99, 99)
+
+
+def _spec_to_intervals(op: str, version_str: str) -> Intervals:
+    version = parse_version_tuple(version_str)
+    if version[-1] == "*":
+        prefix = version[:-1]
+        lower, upper = _complete_version(prefix), bump_version(prefix)
+        if op == "==":
+            return ((lower, upper),)
+        elif op == "!=":
+            return ((MIN_VERSION, lower), (upper, MAX_VERSION))
+    elif op == "~=":
+        return ((_complete_version(version), bump_version(version, -2)),)
+    else:
+        version = _complete_version(version)
+        if op in ("==", "==="):
+            return ((version, bump_version(version)),)
+        elif op == "!=":
+            return ((MIN_VERSION, version), (bump_version(version), MAX_VERSION))
+        elif op == ">=":
+            return ((version, MAX_VERSION),)
+        elif op == ">":
+            return ((bump_version(version), MAX_VERSION),)
+        elif op == "<=":
+            return ((MIN_VERSION, bump_version(version)),)
+        elif op == "<":
+            return ((MIN_VERSION, version),)
+    raise InvalidPyVersion(f"Unsupported version specifier: {op}{version_str}")
+
+
+# The caches below are keyed on the normalized intervals, so they neither keep
+# PySpecSet instances alive nor depend on how a specifier is spelled.
+
+
+@lru_cache(maxsize=1024)
+def _parse_intervals(version_str: str) -> Intervals:
+    # XXX: Prerelease or postrelease specifiers will fail here, but I guess we can
+    # just ignore them for now.
+    intervals = ((MIN_VERSION, MAX_VERSION),)
+    for spec in get_specifier(version_str):
+        intervals = _intersect_intervals(
+            intervals, _spec_to_intervals(spec.operator, spec.version)
+        )
+    return intervals
+
+
+@lru_cache(maxsize=1024)
+def _intersect_intervals(left: Intervals, right: Intervals) -> Intervals:
+    result = []
+    i = j = 0
+    while i < len(left) and j < len(right):
+        lower = max(left[i][0], right[j][0])
+        upper = min(left[i][1], right[j][1])
+        if lower < upper:
+            result.append((lower, upper))
+        if left[i][1] < right[j][1]:
+            i += 1
+        else:
+            j += 1
+    return tuple(result)
+
+
+@lru_cache(maxsize=1024)
+def _union_intervals(left: Intervals, right: Intervals) -> Intervals:
+    result = []
+    for lower, upper in heapq.merge(left, right):
+        if result and lower <= result[-1][1]:
+            if upper > result[-1][1]:
+                result[-1] = (result[-1][0], upper)
+        else:
+            result.append((lower, upper))
+    return tuple(result)
+
+
+@lru_cache(maxsize=1024)
+def _is_subset_intervals(left: Intervals, right: Intervals) -> bool:
+    j = 0
+    for lower, upper in left:
+        # The only interval that can cover it is the first one that ends after it.
+        while j < len(right) and right[j][1] < upper:
+            j += 1
+        if j == len(right) or right[j][0] > lower:
+            return False
+    return True
 
 
 class PySpecSet(SpecifierSet):
+    """A specifier set of python versions, held as normalized intervals of
+    ``(major, minor, patch)`` tuples. Instances are immutable.
+    """
+
     # TODO: fetch from python.org and cache
     MAX_PY_VERSIONS = {
         (2,): 7,
@@ -86,286 +165,128 @@ class PySpecSet(SpecifierSet):
         (3, 6): 10,
         (3, 7): 6,
     }
-    MIN_VERSION = (-1, -1, -1)
-    MAX_VERSION = (99, 99, 99)
+    MIN_VERSION = MIN_VERSION
+    MAX_VERSION = MAX_VERSION
+
+    def __init__(self, version_str: str = "") -> None:
+        self._intervals = _parse_intervals(version_str)  # type: Intervals
+        self._prereleases = None
+        self._parsed_specs = None  # type: Optional[frozenset]
+
+    @classmethod
+    def _from_intervals(cls, intervals: Intervals) -> "PySpecSet":
+        inst = object.__new__(PySpecSet if intervals else ImpossiblePySpecSet)
+        inst._intervals = intervals
+        inst._prereleases = None
+        inst._parsed_specs = None
+        return inst
 
-    def __init__(self, version_str: str = "", analyze: bool = True) -> None:
-        super().__init__(version_str)
-        self._lower_bound = self.MIN_VERSION  # type: Tuple[int, int, int]
-        self._upper_bound = self.MAX_VERSION  # type: Tuple[int, int, int]
-        self._excludes = []  # type: List[Tuple[Union[int, str], ...]]
-        if version_str and analyze:
-            self._analyze_specifiers()
-
-    def _analyze_specifiers(self) -> None:
-        # XXX: Prerelease or postrelease specifiers will fail here, but I guess we can
-        # just ignore them for now.
-        lower_bound, upper_bound = self.MIN_VERSION, self.MAX_VERSION
-        excludes = set()  # type: Set[Tuple[Union[int, str], ...]]
-        for spec in self:
-            op, version = spec.operator, spec.version
-            version = parse_version_tuple(version)
-            if version[-1] == "*":
-                if op == "==":
-                    op = "~="
-                    version = version[:-1] + (0,)
-                elif op == "!=":
-                    excludes.add(version)
-                    continue
-            if op != "~=":
-                version = _complete_version(version)
-            if op in ("==", "==="):
-                lower_bound = version
-                upper_bound = bump_version(version)
-                break
-            if op == "!=":
-                excludes.add(version)
-            elif op[0] == ">":
-                if op == ">=":
-                    new_lower = version
-                else:
-                    new_lower = bump_version(version)
-                if new_lower > lower_bound:
-                    lower_bound = new_lower
-            elif op[0] == "<":
-                if op == "<=":
-                    new_upper = bump_version(version)
-                else:
-                    new_upper = version
-                if new_upper < upper_bound:
-                    upper_bound = new_upper
-            elif op == "~=":
-                new_lower = _complete_version(version)
-                new_upper = bump_version(version, -2)
-                if new_upper < upper_bound:
-                    upper_bound = new_upper
-                if new_lower > lower_bound:
-                    lower_bound = new_lower
-            else:
-                raise InvalidPyVersion(
-                    f"Unsupported version specifier: {spec.op}{spec.version}"
-                )
-        self._merge_bounds_and_excludes(lower_bound, upper_bound, excludes)
-
-    def _merge_bounds_and_excludes(
-        self,
-        lower: Tuple[int, int, int],
-        upper: Tuple[int, int, int],
-        excludes: Set[Tuple[Union[int, str], ...]],
-    ) -> None:
-        def comp_key(item):
-            # .* constraints are always considered before concrete constraints.
-            return tuple(e if isinstance(e, int) else -1 for e in item)
-
-        sorted_excludes = sorted(excludes, key=comp_key)
-        if lower == self.MIN_VERSION and upper == self.MAX_VERSION:
-            # Nothing we can do here, it is a non-constraint.
-            self._lower_bound, self._upper_bound = lower, upper
-            self._excludes = sorted_excludes
-            return
-        wildcard_excludes = set()
-        for version in list(sorted_excludes):
-            if any(_version_part_match(wv, version) for wv in wildcard_excludes):
-                sorted_excludes.remove(version)
-                continue
-            if version[-1] == "*":
-                valid_length = len(version) - 1
-                valid_version = version[:valid_length]
-                wildcard_excludes.add(valid_version)
-                if (
-                    valid_version < lower[:valid_length]
-                    or valid_version > upper[:valid_length]
-                ):
-                    # Useless excludes
-                    sorted_excludes.remove(version)
-                elif _version_part_match(valid_version, lower):
-                    # The lower bound is excluded
-                    lower = bump_version(version, -2)
-                    sorted_excludes.remove(version)
-                elif _version_part_match(valid_version, upper):
-                    upper = _complete_version(valid_version)
-                    sorted_excludes.remove(version)
-            else:
-                if version < lower or version >= upper:
-                    sorted_excludes.remove(version)
-                elif version == lower:
-                    lower = bump_version(version)
-                    sorted_excludes.remove(version)
-        self._lower_bound = lower
-        self._upper_bound = upper
-        self._excludes = sorted_excludes
-        # Regenerate specifiers with merged bounds and excludes.
-        if not self.is_impossible:
-            super().__init__(str(self))
+    @property
+    def _specs(self) -> frozenset:
+        # Only needed by the SpecifierSet methods, build them lazily.
+        if self._parsed_specs is None:
+            self._parsed_specs = (
+                frozenset() if self.is_impossible else get_specifier(str(self))._specs
+            )
+        return self._parsed_specs
+
+    @property
+    def _lower_bound(self) -> VersionTuple:
+        return self._intervals[0][0] if self._intervals else self.MAX_VERSION
+
+    @property
+    def _upper_bound(self) -> VersionTuple:
+        return self._intervals[-1][1] if self._intervals else self.MIN_VERSION
 
     @property
     def is_impossible(self) -> bool:
-        if (
-            self._lower_bound is self.MIN_VERSION
-            or self._upper_bound is self.MAX_VERSION
-        ):
-            return False
-        return self._lower_bound >= self._upper_bound
+        return not self._intervals
 
     @property
     def is_allow_all(self) -> bool:
-        if self.is_impossible:
-            return False
-        return (
-            self._lower_bound == self.MIN_VERSION
-            and self._upper_bound == self.MAX_VERSION
-            and not self._excludes
-        )
+        return self._intervals == ((self.MIN_VERSION, self.MAX_VERSION),)
 
     def __bool__(self) -> bool:
         return not self.is_allow_all
 
     def __str__(self) -> str:
-        if self.is_impossible:
-            return "impossible"
-        if self.is_allow_all:
-            return ""
-        lower = self._lower_bound
-        upper = self._upper_bound
-        if lower[-1] == 0:
-            lower = lower[:-1]
-        if upper[-1] == 0:
-            upper = upper[:-1]
-        lower = "" if lower == self.MIN_VERSION else f">={_convert_to_version(lower)}"
-        upper = "" if upper == self.MAX_VERSION else f"<{_convert_to_version(upper)}"
-        excludes = ",".join(
-            f"!={_convert_to_version(version)}" for version in self._excludes
-        )
-
-        return ",".join(filter(None, [lower, upper, excludes]))
+        return _format_intervals(self._intervals)
 
     def __repr__(self) -> str:
         return f"<PySpecSet {self}>"
 
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, PySpecSet):
+            return self._intervals == other._intervals
+        return super().__eq__(other)
+
+    def __ne__(self, other: Any) -> bool:
+        if isinstance(other, PySpecSet):
+            return self._intervals != other._intervals
+        return super().__ne__(other)
+
+    def __hash__(self) -> int:
+        return hash(self._intervals)
+
     def copy(self) -> "PySpecSet":
-        if self.is_impossible:
-            return ImpossiblePySpecSet()
-        instance = self.__class__(str(self), False)
-        instance._lower_bound = self._lower_bound
-        instance._upper_bound = self._upper_bound
-        instance._excludes = self._excludes[:]
-        return instance
-
-    @lru_cache()
+        return self._from_intervals(self._intervals)
+
     def __and__(self, other: "PySpecSet") -> "PySpecSet":
-        if any(s.is_impossible for s in (self, other)):
-            return ImpossiblePySpecSet()
-        if self.is_allow_all:
-            return other.copy()
-        elif other.is_allow_all:
-            return self.copy()
-        rv = self.copy()
-        excludes = set(rv._excludes) | set(other._excludes)
-        lower = max(rv._lower_bound, other._lower_bound)
-        upper = min(rv._upper_bound, other._upper_bound)
-        rv._merge_bounds_and_excludes(lower, upper, excludes)
-        return rv
-
-    @lru_cache()
-    def __or__(self, other: "PySpecSet") -> "PySpecSet":
-        if self.is_impossible:
-            return other.copy()
-        elif other.is_impossible:
-            return self.copy()
-        if self.is_allow_all:
-            return self.copy()
-        elif other.is_allow_all:
-            return other.copy()
-        rv = self.copy()
-        left, right = sorted([rv, other], key=lambda x: x._lower_bound)
-        excludes = set(left._excludes) & set(right._excludes)
-        lower = left._lower_bound
-        upper = max(left._upper_bound, right._upper_bound)
-        if right._lower_bound > left._upper_bound:  # two ranges has no overlap
-            excludes.update(
-                self._populate_version_range(left._upper_bound, right._lower_bound)
-            )
-        rv._merge_bounds_and_excludes(lower, upper, excludes)
-        return rv
+        return self._from_intervals(
+            _intersect_intervals(self._intervals, other._intervals)
+        )
 
-    def _populate_version_range(self, lower, upper):
+    def __or__(self, other: "PySpecSet") -> "PySpecSet":
+        return self._from_intervals(_union_intervals(self._intervals, other._intervals))
+
+    @classmethod
+    def _is_beyond_minor_versions(cls, version: VersionTuple) -> bool:
+        # Only the last minor of a finished major series is known.
+        last_minor = cls.MAX_PY_VERSIONS.get((version[0],))
+        return last_minor is not None and version[1] > last_minor
+
+    @classmethod
+    def _populate_version_range(cls, lower, upper):
+        """Yield the versions to exclude to cover the range ``[lower, upper)``.
+
+        Patch versions are unbounded, so the remaining patches of a minor series
+        are excluded with the wildcard of the whole series. ``None`` is yielded
+        last if the range crosses a major series whose minors are unbounded.
+        """
         assert lower and upper and lower < upper
         prev = lower
         while prev < upper:
-            if prev[-2:] == (0, 0):
-                cur = bump_version(prev, 0)
-                if cur <= upper:  # X.0.0 -> X+1.0.0
-                    yield (prev[0], "*")
-                    prev = cur
-                    continue
-            if prev[-1] == 0:
-                cur = bump_version(prev, 1)
-                if cur <= upper:  # X.Y.0 -> X.Y+1.0
-                    yield (*prev[:2], "*")
-                    prev = (
-                        bump_version(prev, 0)
-                        if cur[0] < 3 and cur[1] > self.MAX_PY_VERSIONS[(cur[0],)]
-                        else cur
-                    )
-                    continue
-                while prev < upper:  # X.Y.0 -> X.Y.Z
-                    yield prev
-                    prev = bump_version(prev)
-                break
-            # no wildcard is available
-            cur = bump_version(prev, 1)
-            if cur <= upper:  # X.Y.Z -> X.Y+1.0
-                current_max = self.MAX_PY_VERSIONS[(*prev[:2],)]
-                for z in range(prev[2], current_max + 1):
+            if prev[-1] == 0 and cls._is_beyond_minor_versions(prev):
+                prev = bump_version(prev, 0)
+                continue
+            if prev[:2] == upper[:2]:  # X.Y.Z -> X.Y.W
+                for z in range(prev[2], upper[2]):
                     yield (*prev[:2], z)
-                prev = (
-                    bump_version(prev, 0)
-                    if cur[0] < 3 and cur[1] > self.MAX_PY_VERSIONS[(cur[0],)]
-                    else cur
-                )
-            else:  # X.Y.Z -> X.Y.W
-                while prev < upper:
-                    yield prev
-                    prev = bump_version(prev)
+                break
+            if prev[-1] != 0:  # X.Y.Z -> X.Y+1.0, exclude the whole X.Y
+                yield (*prev[:2], "*")
+                prev = bump_version(prev, 1)
+            elif prev[0] == upper[0]:  # X.Y.0 -> X.W.0
+                yield (*prev[:2], "*")
+                prev = bump_version(prev, 1)
+            elif prev[1] == 0:  # X.0.0 -> X+1.0.0
+                yield (prev[0], "*")
+                prev = bump_version(prev, 0)
+            else:  # X.Y.0 -> X+1.0.0
+                yield None
                 break
 
-    @lru_cache()
     def is_superset(self, other: Union[str, SpecifierSet]) -> bool:
         if self.is_impossible:
             return False
         if self.is_allow_all:
             return True
-        other = type(self)(str(other))
-        if (
-            self._lower_bound > other._lower_bound
-            or self._upper_bound < other._upper_bound
-        ):
-            return False
-        valid_excludes = set(
-            _restrict_versions_to_range(
-                self._excludes, other._lower_bound, other._upper_bound
-            )
-        )
-        return valid_excludes <= set(other._excludes)
+        return _is_subset_intervals(_as_intervals(other), self._intervals)
 
-    @lru_cache()
     def is_subset(self, other: Union[str, SpecifierSet]) -> bool:
         if self.is_impossible:
             return False
-        other = type(self)(str(other))
-        if other.is_allow_all:
-            return True
-        if (
-            self._lower_bound < other._lower_bound
-            or self._upper_bound > other._upper_bound
-        ):
-            return False
-        valid_excludes = set(
-            _restrict_versions_to_range(
-                other._excludes, self._lower_bound, self._upper_bound
-            )
-        )
-        return valid_excludes <= set(self._excludes)
+        return _is_subset_intervals(self._intervals, _as_intervals(other))
 
     def as_marker_string(self) -> str:
         if self.is_allow_all:
@@ -414,6 +335,50 @@ class PySpecSet(SpecifierSet):
 
 
 class ImpossiblePySpecSet(PySpecSet):
+    def __init__(self, version_str: str = "") -> None:
+        super().__init__(version_str)
+        self._intervals = ()
+
     @property
     def is_impossible(self):
         return True
+
+
+def _as_intervals(spec: Union[str, SpecifierSet]) -> Intervals:
+    if isinstance(spec, PySpecSet):
+        return spec._intervals
+    return _parse_intervals(str(spec))
+
+
+@lru_cache(maxsize=1024)
+def _format_intervals(intervals: Intervals) -> str:
+    if not intervals:
+        return "impossible"
+    if intervals == ((MIN_VERSION, MAX_VERSION),):
+        return ""
+    # Gaps between the intervals are expressed as excluded versions. When that
+    # is impossible, the intervals from the gap on are dropped, so that the
+    # result never allows a version out of the intervals.
+    excludes = []
+    for index, ((_, gap_lower), (gap_upper, _)) in enumerate(
+        zip(intervals, intervals[1:])
+    ):
+        versions = list(PySpecSet._populate_version_range(gap_lower, gap_upper))
+        if None in versions:
+            intervals = intervals[: index + 1]
+            break
+        excludes.extend(versions)
+    wildcards = {version[:-1] for version in excludes if version[-1] == "*"}
+    excludes = ",".join(
+        f"!={_convert_to_version(version)}"
+        for version in excludes
+        if version[-1] == "*" or version[:2] not in wildcards
+    )
+    lower, upper = intervals[0][0], intervals[-1][1]
+    if lower[-1] == 0:
+        lower = lower[:-1]
+    if upper[-1] == 0:
+        upper = upper[:-1]
+    lower = "" if lower == MIN_VERSION else f">={_convert_to_version(lower)}"
+    upper = "" if upper == MAX_VERSION else f"<{_convert_to_version(upper)}"
+    return ",".join(filter(None, [lower, upper, excludes]))
@@ -0,0 +1,156 @@
+"""Collect timings and counters of the locking process.
+
+The profiler is disabled by default, in which case all hooks cost almost nothing.
+When enabled, it records:
+
+* wall time and call counts of each phase, e.g. ``find_matches`` or ``build``.
+* plain counters, e.g. resolution rounds and backtracks.
+* hits and misses of each dependency generator of the repository.
+* time spent on each package, to find out the slowest ones.
+
+Hooks may be called from worker threads, all records are guarded by a lock.
+"""
+import collections
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+# A finished phase, times are in seconds from the start of the profiler.
+Event = collections.namedtuple("Event", "name package start duration thread")
+
+
+class Profiler:
+    """Record phases, counters and dependency generator results."""
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self) -> None:
+        """Drop all records and restart the clock."""
+        with self._lock:
+            self.started_at = time.perf_counter()
+            self.phases = {}  # type: Dict[str, list]
+            self.counters = collections.Counter()  # type: Dict[str, int]
+            self.generators = {}  # type: Dict[str, list]
+            self.packages = collections.Counter()  # type: Dict[str, float]
+            self.events = []  # type: list
+
+    def enable(self) -> None:
+        self.reset()
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    @contextmanager
+    def phase(self, name: str, package: Optional[str] = None) -> Iterator[None]:
+        """Time the code inside the context as a phase.
+
+        :param name: the name of the phase.
+        :param package: the package the phase works on, if any.
+        """
+        if not self.enabled:
+            yield
+            return
+        # Time spent in nested phases is subtracted from the self time, so that
+        # a build inside get_dependencies isn't counted twice for the package.
+        stack = self._local.__dict__.setdefault("stack", [])
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            self_time = duration - stack.pop()
+            if stack:
+                stack[-1] += duration
+            with self._lock:
+                calls, total, own = self.phases.get(name, (0, 0.0, 0.0))
+                self.phases[name] = [calls + 1, total + duration, own + self_time]
+                if package:
+                    self.packages[package] += self_time
+                self.events.append(
+                    Event(
+                        name,
+                        package,
+                        start - self.started_at,
+                        duration,
+                        threading.get_ident(),
+                    )
+                )
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Increase the counter of the given name."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] += value
+
+    def record_generator(self, name: str, hit: bool) -> None:
+        """Record whether a dependency generator gives the result."""
+        if not self.enabled:
+            return
+        with self._lock:
+            record = self.generators.setdefault(name, [0, 0])
+            record[0 if hit else 1] += 1
+
+    def report(self, slowest: int = 10) -> Dict[str, Any]:
+        """Summarize the records as a JSON serializable dictionary.
+
+        :param slowest: the number of slowest packages to include.
+        """
+        with self._lock:
+            phases = {
+                name: {"calls": calls, "total": total, "self": own}
+                for name, (calls, total, own) in sorted(self.phases.items())
+            }
+            generators = {
+                name: {
+                    "hits": hits,
+                    "misses": misses,
+                    "hit_rate": hits / (hits + misses),
+                }
+                for name, (hits, misses) in sorted(self.generators.items())
+            }
+            return {
+                "total_time": time.perf_counter() - self.started_at,
+                "phases": phases,
+                "counters": dict(sorted(self.counters.items())),
+                "dependency_generators": generators,
+                "slowest_packages": [
+                    {"name": name, "time": seconds}
+                    for name, seconds in self.packages.most_common(slowest)
+                ],
+            }
+
+    def write_report(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+
+    def write_chrome_trace(self, path: str) -> None:
+        """Write the phases in the Trace Event Format, which can be loaded by
+        chrome://tracing or Perfetto.
+        """
+        pid = os.getpid()
+        with self._lock:
+            events = [
+                {
+                    "name": event.name,
+                    "cat": "pdm",
+                    "ph": "X",
+                    "ts": event.start * 1e6,
+                    "dur": event.duration * 1e6,
+                    "pid": pid,
+                    "tid": event.thread,
+                    "args": {"package": event.package} if event.package else {},
+                }
+                for event in self.events
+            ]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
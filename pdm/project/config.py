@@ -10,8 +10,19 @@ from pdm.exceptions import NoConfigError
 class Config(MutableMapping):
     DEFAULT_CONFIG = {
         "cache_dir": appdirs.user_cache_dir("pdm"),
+        # Size limit of the cache directory, like "2GB". No limit if not set.
+        "cache_max_size": None,
         "python": None,
         "packages_path": None,
+        # Sizes of the HTTP connection pools shared by the whole invocation.
+        "pool_connections": 10,
+        "pool_maxsize": 10,
+        # Max number of wheels installed at the same time, 1 to install one by one.
+        "install_workers": 4,
+        # Install wheels by linking the files unpacked once in a store shared by all
+        # projects, with "hardlink", "reflink", "symlink" or "copy".
+        "install_cache": False,
+        "install_cache_method": "hardlink",
     }
 
     def __init__(self, project_root: Path):
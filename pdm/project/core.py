@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import hashlib
+import json
 import re
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Union
@@ -155,7 +156,10 @@ class Project:
         return data
 
     def write_lockfile(self, toml_data: Container, show_message: bool = True) -> None:
-        toml_data.update({"root": self.get_project_metadata()})
+        # Keep other keys of the root table, such as the resolution fingerprint.
+        root = dict(toml_data.get("root", {}))
+        root.update(self.get_project_metadata())
+        toml_data.update({"root": root})
 
         with atomic_open_for_write(self.lockfile_file) as fp:
             fp.write(tomlkit.dumps(toml_data))
@@ -220,6 +224,41 @@ class Project:
         hasher.update(pyproject_content.encode("utf-8"))
         return hasher.hexdigest()
 
+    def get_resolution_fingerprint(
+        self,
+        requirements: Optional[Dict[str, Dict[str, Requirement]]] = None,
+        engine: str = "rounds",
+    ) -> str:
+        """Get a hash of everything that affects the resolution result.
+
+        The update strategy is not included, updates always resolve again and
+        any strategy gives the locked result back if nothing else changes.
+
+        :param requirements: the requirements to resolve, grouped by sections,
+            read from pyproject if not given.
+        :param engine: the resolver engine.
+        :returns: the fingerprint in the form of ``sha256:<hexdigest>``.
+        """
+        requirements = requirements or self.all_dependencies
+        dump_data = {
+            "requirements": {
+                section: sorted(r.as_line() for r in reqs.values())
+                for section, reqs in requirements.items()
+            },
+            "sources": self.sources or [],
+            "python_requires": str(self.python_requires),
+            "allow_prereleases": self.allow_prereleases,
+            "engine": engine,
+        }
+        content = json.dumps(dump_data, sort_keys=True, default=str)
+        return "sha256:" + hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def is_lockfile_fingerprint_match(self, fingerprint: str) -> bool:
+        if not self.lockfile_file.exists():
+            return False
+        root = self.lockfile.get("root", {})
+        return str(root.get("resolution_fingerprint", "")) == fingerprint
+
     def is_lockfile_hash_match(self) -> bool:
         if not self.lockfile_file.exists():
             return False
@@ -1,71 +1,79 @@
-import copy
+import collections
+import functools
+import operator
 
+from pdm.context import context
+from pdm.exceptions import ResolutionImpossible
 from pdm.models.markers import PySpecSet, join_metaset
 from pdm.models.requirements import strip_extras
 from pdm.resolver.providers import (  # noqa
     BaseProvider,
     EagerUpdateProvider,
+    IncrementalProvider,
     ReusePinProvider,
 )
 from pdm.resolver.reporters import SimpleReporter  # noqa
-from pdm.resolver.resolvers import Resolver
+from pdm.resolver.resolvers import BacktrackingResolver, Resolver
 
+# Available resolver engines, selectable by name.
+RESOLVER_ENGINES = {"rounds": Resolver, "backtracking": BacktrackingResolver}
 
-def _trace_visit_vertex(graph, current, target, visited, path, paths):
-    if current == target:
-        paths.append(path)
-        return
-    for v in graph.iter_children(current):
-        if v == current or v in visited:
-            continue
-        next_path = path + [current]
-        next_visited = visited | {current}
-        _trace_visit_vertex(graph, v, target, next_visited, next_path, paths)
-
-
-def trace_graph(graph, roots):
-    """Build a collection of "traces" for each package.
 
-    A trace is a list of names that eventually leads to the package. For
-    example, if A and B are root dependencies, A depends on C and D, B
-    depends on C, and C depends on D, the return value would be like::
+def _iter_components(graph, nodes):
+    """Iterate over the strongly connected components of the subgraph made of
+    ``nodes``, in topological order. Each component is a sorted list of names.
 
-        {
-            None: [],
-            "A": [None],
-            "B": [None],
-            "C": [[None, "A"], [None, "B"]],
-            "D": [[None, "B", "C"], [None, "A"]],
-        }
+    This is an iterative Tarjan's algorithm so that deep graphs don't hit the
+    recursion limit.
     """
-    result = {}
-    for vertex in graph:
-        result[vertex] = []
-        for root in roots:
-            paths = []
-            _trace_visit_vertex(graph, root, vertex, set(), [], paths)
-            result[vertex].extend(paths)
-    for root in roots:
-        result.pop(root, None)
-    return result
 
+    def children(key):
+        return iter(sorted(c for c in graph.iter_children(key) if c in nodes))
 
-def _build_marker_and_pyspec(dependencies, pythons, key, trace, all_metasets):
-    all_parent_metasets = {}
-    for route in trace:
-        parent = route[-1]
-        if parent in all_parent_metasets:
+    index = {}
+    lowlink = {}
+    stack = []
+    on_stack = set()
+    components = []
+    for start in sorted(nodes):
+        if start in index:
             continue
-        try:
-            parent_metaset = all_metasets[parent]
-        except KeyError:  # Parent not calculated yet. Wait for it.
-            if not parent.startswith("__"):
-                return
-            parent_metaset = None, PySpecSet()
-        all_parent_metasets[parent] = parent_metaset
+        index[start] = lowlink[start] = len(index)
+        stack.append(start)
+        on_stack.add(start)
+        work = [(start, children(start))]
+        while work:
+            key, it = work[-1]
+            for child in it:
+                if child not in index:
+                    index[child] = lowlink[child] = len(index)
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, children(child)))
+                    break
+                if child in on_stack:
+                    lowlink[key] = min(lowlink[key], index[child])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[key])
+                if lowlink[key] == index[key]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == key:
+                            break
+                    components.append(sorted(component))
+    # Tarjan's algorithm finds the components in reverse topological order.
+    return reversed(components)
+
 
+def _build_marker_and_pyspec(dependencies, pythons, key, parent_metasets):
     metasets = None
-    for parent, parent_metaset in all_parent_metasets.items():
+    for parent, parent_metaset in parent_metasets:
         r = dependencies[parent][key]
         python = pythons[strip_extras(key)[0]]
         marker, pyspec = r.marker_no_python, r.requires_python
@@ -84,51 +92,177 @@ def _build_marker_and_pyspec(dependencies, pythons, key, trace, all_metasets):
     return metasets or (None, PySpecSet())
 
 
-def _calculate_markers_and_pyspecs(traces, dependencies, pythons):
-    all_metasets = {}
-    traces = copy.deepcopy(traces)
+def _add_term(terms, term):
+    """Add a conjunction of markers to the disjunction ``terms``, keeping only the
+    minimal ones. Return whether the disjunction is widened.
+    """
+    term_set = set(term)
+    if any(set(other) <= term_set for other in terms):
+        return False
+    terms[:] = [other for other in terms if not term_set <= set(other)]
+    terms.append(term)
+    return True
+
+
+def _build_cycle_metasets(graph, component, scope, dependencies, pythons):
+    """Calculate the metasets of the members of a dependency cycle together,
+    iterating over them until none changes.
 
-    while traces:
-        new_metasets = {}
-        for key, trace in traces.items():
-            assert key not in all_metasets, key  # Sanity check for debug.
-            metasets = _build_marker_and_pyspec(
-                dependencies, pythons, key, trace, all_metasets
+    Within the cycle a marker is kept as a disjunction of minimal conjunctions of
+    the markers met along the way. Going round the cycle only adds longer
+    conjunctions, which are dropped, so the iteration reaches a fixed point after
+    a few rounds, each visiting every edge once.
+    """
+    terms = {key: [] for key in component}
+    pyspecs = {}
+    changed = True
+    while changed:
+        changed = False
+        for key in component:
+            python = pythons[strip_extras(key)[0]]
+            for parent in sorted(graph.iter_parents(key)):
+                if parent in terms:
+                    if parent == key or parent not in pyspecs:
+                        continue
+                    parent_terms, parent_pyspec = terms[parent], pyspecs[parent]
+                elif parent in scope:
+                    parent_marker, parent_pyspec = scope[parent]
+                    parent_terms = [(parent_marker,) if parent_marker else ()]
+                else:
+                    continue
+                r = dependencies[parent][key]
+                marker = r.marker_no_python
+                for term in parent_terms:
+                    if marker and marker not in term:
+                        term += (marker,)
+                    changed = _add_term(terms[key], term) or changed
+                pyspec = parent_pyspec & python & r.requires_python
+                if key in pyspecs:
+                    pyspec = pyspecs[key] | pyspec
+                if pyspecs.get(key) != pyspec:
+                    pyspecs[key] = pyspec
+                    changed = True
+    result = {}
+    for key in component:
+        marker = None
+        if () not in terms[key]:
+            for term in terms[key]:
+                term_marker = functools.reduce(operator.and_, term)
+                marker = term_marker if marker is None else marker | term_marker
+        result[key] = marker, pyspecs[key]
+    return result
+
+
+def _propagate_metasets(graph, nodes, known, dependencies, pythons):
+    """Calculate the metasets of ``nodes`` from the ``known`` metasets of the nodes
+    outside, visiting them in topological order. The members of a dependency
+    cycle are calculated together by :func:`_build_cycle_metasets`.
+    """
+    result = {}
+    scope = collections.ChainMap(result, known)
+    for component in _iter_components(graph, nodes):
+        if len(component) > 1:
+            result.update(
+                _build_cycle_metasets(graph, component, scope, dependencies, pythons)
             )
-            if metasets is None:
-                continue
-            new_metasets[key] = metasets
-        if not new_metasets:
-            break  # No progress? Deadlocked. Give up.
-        all_metasets.update(new_metasets)
-        for key in new_metasets:
-            del traces[key]
+            continue
+        key = component[0]
+        parents = sorted(p for p in graph.iter_parents(key) if p != key and p in scope)
+        result[key] = _build_marker_and_pyspec(
+            dependencies, pythons, key, [(p, scope[p]) for p in parents]
+        )
+    return result
+
 
+def _calculate_markers_and_pyspecs(graph, roots, dependencies, pythons):
+    reachable = set()
+    queue = collections.deque(roots)
+    while queue:
+        key = queue.popleft()
+        for child in graph.iter_children(key):
+            if child not in reachable:
+                reachable.add(child)
+                queue.append(child)
+    known = {root: (None, PySpecSet()) for root in roots}
+    all_metasets = _propagate_metasets(
+        graph, reachable - set(roots), known, dependencies, pythons
+    )
+    for key in graph:
+        if key not in roots and key not in all_metasets:
+            # Not required by any top requirement.
+            all_metasets[key] = None, PySpecSet()
     return all_metasets
 
 
-def _get_sections_from_top_requirements(traces):
-    all_sections = {}
-    for key, trace in traces.items():
-        all_sections[key] = set(item[0][2:-2] for item in trace)
+def _get_sections_from_top_requirements(graph, roots):
+    all_sections = {key: set() for key in graph if key not in roots}
+    for root in roots:
+        visited = {root}
+        queue = collections.deque([root])
+        while queue:
+            for child in graph.iter_children(queue.popleft()):
+                if child not in visited:
+                    visited.add(child)
+                    all_sections[child].add(root[2:-2])
+                    queue.append(child)
     return all_sections
 
 
-def resolve(provider, reporter, requirements, requires_python):
-    resolver = Resolver(provider, reporter)
-    state = resolver.resolve({k: reqs.values() for k, reqs in requirements.items()})
+def resolve(provider, reporter, requirements, requires_python, engine="rounds"):
+    resolver = RESOLVER_ENGINES[engine](provider, reporter)
+    # Discover all root requirements at once, the dependencies are seeded by the
+    # provider as soon as they are known.
+    provider.prefetch_matches(
+        r for reqs in requirements.values() for r in reqs.values()
+    )
+    try:
+        with context.profiler.phase("resolve"):
+            state = resolver.resolve(
+                {k: reqs.values() for k, reqs in requirements.items()}
+            )
+    finally:
+        provider.close()
+    with context.profiler.phase("extract_metadata"):
+        _extract_metadata(state, provider, reporter, requirements, requires_python)
+    return state.mapping, provider.fetched_dependencies, provider.summary_collection
+
+
+def resolve_incremental(
+    provider, reporter, requirements, requires_python, engine="rounds"
+):
+    """Resolve with an :class:`IncrementalProvider`. The pins that conflict with
+    the result are released and the resolution runs again, until the result
+    doesn't touch any reused pin in conflict.
+    """
+    while True:
+        try:
+            result = resolve(provider, reporter, requirements, requires_python, engine)
+        except ResolutionImpossible as e:
+            if not provider.release_conflicts(e.requirements):
+                raise
+        else:
+            if not provider.release_conflicts():
+                return result
+        context.profiler.count("incremental_retries")
+
+
+def _extract_metadata(state, provider, reporter, requirements, requires_python):
+    """Fill in markers, sections and hashes of the resolved candidates."""
     for key, reqs in requirements.items():
         # For tarball source distributions, the requirement will be updated after
         # resolution, need to fetch again.
         provider.fetched_dependencies[f"__{key}__"] = {
             provider.identify(r): r for r in reqs.values()
         }
-    traces = trace_graph(state.graph, [f"__{key}__" for key in requirements])
+    roots = [f"__{key}__" for key in requirements]
     reporter.extract_metadata()
     all_metasets = _calculate_markers_and_pyspecs(
-        traces, provider.fetched_dependencies, provider.requires_python_collection
+        state.graph,
+        roots,
+        provider.fetched_dependencies,
+        provider.requires_python_collection,
     )
-    all_sections = _get_sections_from_top_requirements(traces)
+    all_sections = _get_sections_from_top_requirements(state.graph, roots)
 
     for key, metaset in all_metasets.items():
         if key is None:
@@ -144,4 +278,3 @@ def resolve(provider, reporter, requirements, requires_python):
             candidate.marker = join_metaset(metaset)
             candidate.sections = list(all_sections[key])
             candidate.hashes = provider.get_hashes(candidate)
-    return state.mapping, provider.fetched_dependencies, provider.summary_collection
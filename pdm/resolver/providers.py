@@ -1,4 +1,5 @@
-from typing import Dict, Iterable, List, Optional, Union
+from concurrent import futures
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
 
 from pdm.models.candidates import Candidate, identify
 from pdm.models.repositories import BaseRepository
@@ -13,6 +14,7 @@ class BaseProvider:
         repository: BaseRepository,
         requires_python: PySpecSet,
         allow_prereleases: Optional[bool] = None,
+        prefetch_workers: int = 4,
     ) -> None:
         self.repository = repository
         self.requires_python = requires_python  # Root python_requires value
@@ -20,6 +22,12 @@ class BaseProvider:
         self.requires_python_collection = {}  # type: Dict[Optional[str], PySpecSet]
         self.summary_collection = {}  # type: Dict[str, str]
         self.fetched_dependencies = {}  # type: Dict[str, Dict[str, List[Requirement]]]
+        # Max number of threads to fetch dependencies in background, 0 to disable.
+        self.prefetch_workers = prefetch_workers
+        self._executor = None  # type: Optional[futures.ThreadPoolExecutor]
+        self._prefetched = {}  # type: Dict[Tuple[str, str], futures.Future]
+        # (dependencies, requires_python, summary) of the named candidates fetched.
+        self._fetched = {}  # type: Dict[Tuple[str, str], tuple]
 
     def identify(self, req: Union[Requirement, Candidate]) -> Optional[str]:
         return identify(req)
@@ -44,8 +52,77 @@ class BaseProvider:
             candidate.version
         ) and self.requires_python.is_subset(candidate.requires_python)
 
+    def _get_prefetch_key(self, candidate: Candidate) -> Optional[Tuple[str, str]]:
+        # Only named candidates without dependencies from lockfile are worth it.
+        if (
+            not candidate.req.is_named
+            or not candidate.version
+            or candidate.dependencies is not None
+        ):
+            return None
+        return self.identify(candidate), candidate.version
+
+    def prefetch_dependencies(self, candidates: Iterable[Candidate]) -> None:
+        """Start fetching dependencies of the given candidates in background threads.
+
+        Candidates are never built in the workers. Those whose dependencies can't
+        be got without a build will be handled by :meth:`get_dependencies` later.
+        """
+        if self.prefetch_workers <= 0:
+            return
+        for candidate in candidates:
+            key = self._get_prefetch_key(candidate)
+            if key is None or key in self._prefetched:
+                continue
+            if self._executor is None:
+                self._executor = futures.ThreadPoolExecutor(self.prefetch_workers)
+            self._prefetched[key] = self._executor.submit(
+                self.repository.get_dependencies, candidate, False
+            )
+
+    def prefetch_matches(self, requirements: Iterable[Requirement]) -> None:
+        """Start discovering the candidates of the given requirements in the
+        repository all at once.
+        """
+        self.repository.prefetch_matches(requirements)
+
+    def _fetch_dependencies(
+        self, candidate: Candidate
+    ) -> Tuple[List[Requirement], PySpecSet, str]:
+        key = self._get_prefetch_key(candidate)
+        if key in self._fetched:
+            return self._fetched[key]
+        result = None
+        future = self._prefetched.get(key) if key else None
+        if future is not None:
+            try:
+                result = future.result()
+            except Exception:
+                # Not available without a build, or the fetching failed.
+                # Try again in the main thread so that errors are raised there.
+                pass
+        if result is None:
+            result = self.repository.get_dependencies(candidate)
+        if key is not None:
+            self._fetched[key] = result
+        return result
+
+    def close(self) -> None:
+        """Cancel pending prefetches and shut down the worker threads."""
+        self.repository.close()
+        if self._executor is None:
+            return
+        # Drop the cancelled ones so that they are fetched again if needed.
+        self._prefetched = {
+            key: future
+            for key, future in self._prefetched.items()
+            if not future.cancel()
+        }
+        self._executor.shutdown()
+        self._executor = None
+
     def get_dependencies(self, candidate: Candidate) -> List[Requirement]:
-        deps, requires_python, summary = self.repository.get_dependencies(candidate)
+        deps, requires_python, summary = self._fetch_dependencies(candidate)
 
         # Filter out incompatible dependencies(e.g. functools32) early so that
         # we don't get errors when building wheels.
@@ -61,6 +138,7 @@ class BaseProvider:
         self.fetched_dependencies[candidate_key] = {
             self.identify(r): r for r in valid_deps
         }
+        self.prefetch_matches(valid_deps)
         self.summary_collection[candidate.req.key] = summary
         self.requires_python_collection[candidate.req.key] = requires_python
         return valid_deps
@@ -77,9 +155,13 @@ class ReusePinProvider(BaseProvider):
     """
 
     def __init__(
-        self, preferred_pins: Dict[str, Candidate], tracked_names: Iterable[str], *args
+        self,
+        preferred_pins: Dict[str, Candidate],
+        tracked_names: Iterable[str],
+        *args,
+        **kwargs,
     ):
-        super().__init__(*args)
+        super().__init__(*args, **kwargs)
         self.preferred_pins = preferred_pins
         self.tracked_names = set(tracked_names)
 
@@ -100,6 +182,66 @@ class ReusePinProvider(BaseProvider):
         return result
 
 
+class IncrementalProvider(ReusePinProvider):
+    """A provider that keeps the preferred pins verbatim unless they conflict.
+
+    Unlike :class:`ReusePinProvider`, the index is not queried for a package
+    whose pin satisfies the requirement, and the dependencies of the pin are read
+    from the lockfile. So only the closure of the tracked packages is resolved
+    against the index. A pin rejected by a requirement is recorded as conflicting,
+    the caller should release it and resolve again, see :func:`resolve_incremental`.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.conflicting_names = set()  # type: Set[str]
+
+    def _get_pin(self, requirement: Requirement) -> Optional[Candidate]:
+        ident = self.identify(requirement)
+        if not requirement.is_named or ident in self.tracked_names:
+            return None
+        pin = self.preferred_pins.get(ident)
+        if pin is None or not pin.version:
+            return None
+        return pin
+
+    def prefetch_matches(self, requirements: Iterable[Requirement]) -> None:
+        # The reused pins are never looked up in the index.
+        super().prefetch_matches(
+            r
+            for r in requirements
+            if self._get_pin(r) is None
+            or not r.specifier.contains(self._get_pin(r).version)
+        )
+
+    def find_matches(self, requirement: Requirement) -> List[Candidate]:
+        pin = self._get_pin(requirement)
+        if pin is not None and requirement.specifier.contains(pin.version):
+            pin._preferred = True
+            return [pin]
+        if pin is not None:
+            self.conflicting_names.add(self.identify(requirement))
+        return BaseProvider.find_matches(self, requirement)
+
+    def is_satisfied_by(self, requirement, candidate):
+        if getattr(candidate, "_preferred", False) and requirement.is_named:
+            if requirement.specifier.contains(candidate.version):
+                return True
+            self.conflicting_names.add(self.identify(candidate))
+            return False
+        return BaseProvider.is_satisfied_by(self, requirement, candidate)
+
+    def release_conflicts(self, requirements: Iterable[Requirement] = ()) -> Set[str]:
+        """Stop reusing the pins conflicting so far, together with the pins of the
+        given requirements, and return the names of the newly released ones.
+        """
+        names = self.conflicting_names.union(self.identify(r) for r in requirements)
+        released = (names - self.tracked_names) & self.preferred_pins.keys()
+        self.tracked_names.update(released)
+        self.conflicting_names.clear()
+        return released
+
+
 class EagerUpdateProvider(ReusePinProvider):
     """A specialized provider to handle an "eager" upgrade strategy.
 
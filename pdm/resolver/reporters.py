@@ -76,6 +76,9 @@ class SimpleReporter:
     def pin_candidate(self, name, criterion, candidate, child_names):
         pass
 
+    def backtracking(self, name, candidate):
+        pass
+
     def extract_metadata(self):
         pass
 
@@ -111,5 +114,8 @@ class SpinnerReporter(SimpleReporter):
     def pin_candidate(self, name, criterion, candidate, child_names):
         self.spinner.text = f"Resolved: {candidate.format()}"
 
+    def backtracking(self, name, candidate):
+        self.spinner.text = f"Backtracking: {candidate.format()}"
+
     def extract_metadata(self):
         self.spinner.start("Extracting package metadata")
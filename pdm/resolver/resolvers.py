@@ -3,13 +3,14 @@ from __future__ import annotations
 import collections
 from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Set, Tuple, Union
 
+from pdm.context import context
 from pdm.exceptions import (
     NoVersionsAvailable,
     RequirementsConflicted,
     ResolutionImpossible,
     ResolutionTooDeep,
 )
-from pdm.resolver.structs import DirectedGraph
+from pdm.resolver.structs import CriteriaStore, DirectedGraph
 
 if TYPE_CHECKING:
     from pdm.models.candidates import Candidate
@@ -72,6 +73,9 @@ class Criterion(object):
         ]
         if not candidates:
             raise RequirementsConflicted([info.requirement for info in infos])
+        if len(candidates) == len(self.candidates):
+            # Nothing is filtered out, share the list as it is never mutated.
+            candidates = self.candidates
         return type(self)(candidates, infos)
 
 
@@ -90,7 +94,7 @@ class Resolution(object):
         self._p = provider
         self._r = reporter
         self._roots = []  # type: List[str]
-        self._criteria = {}  # type: Dict[str, Criterion]
+        self._criteria = CriteriaStore()  # type: CriteriaStore
         self._states = []  # type: List[State]
 
     @property
@@ -150,7 +154,7 @@ class Resolution(object):
     def _check_pinnability(
         self, candidate: Candidate, dependencies: List[Requirement]
     ) -> Optional[Set[str]]:
-        backup = self._criteria.copy()
+        self._criteria.checkpoint()
         contributed = set()
         try:
             for subdep in dependencies:
@@ -158,8 +162,10 @@ class Resolution(object):
                 self._contribute_to_criteria(key, subdep, parent=candidate)
                 contributed.add(key)
         except RequirementsConflicted:
-            self._criteria = backup
+            self._criteria.rollback()
+            context.profiler.count("conflicts")
             return None
+        self._criteria.release()
         return contributed
 
     def _pin_candidate(
@@ -175,10 +181,16 @@ class Resolution(object):
             pass
         self.state.mapping[name] = candidate
         self.state.graph.add(name)
+        context.profiler.count("pins")
         for parent in criterion.iter_parent():
-            parent_name = (
-                parent if isinstance(parent, str) else self._p.identify(parent)
-            )
+            if isinstance(parent, str):
+                parent_name = parent
+            else:
+                parent_name = self._p.identify(parent)
+                if self.state.mapping.get(parent_name, parent) is not parent:
+                    # The parent has been re-pinned to another candidate, which
+                    # may not depend on this one any more.
+                    continue
             try:
                 self.state.graph.connect(parent_name, name)
             except KeyError:
@@ -200,6 +212,13 @@ class Resolution(object):
                 self._criteria.items(), key=self._get_criterion_item_preference
             )
         ]
+        # Start fetching dependencies of the most likely candidates in background,
+        # so that the fetching latency of this round overlaps.
+        self._p.prefetch_dependencies(
+            criterion.candidates[-1]
+            for name, criterion in self._criteria.items()
+            if not self._is_current_pin_satisfying(name, criterion)
+        )
         for name in criterion_names:
             # Any pin may modify any criterion during the loop. Criteria are
             # replaced, not updated in-place, so we need to read this value
@@ -223,11 +242,9 @@ class Resolution(object):
             else:  # All candidates tried, nothing works. Give up. (?)
                 raise ResolutionImpossible(list(criterion.iter_requirement()))
 
-    def resolve(
-        self, requirements: Dict[str, Iterable[Requirement]], max_rounds: int
+    def _contribute_root_requirements(
+        self, requirements: Dict[str, Iterable[Requirement]]
     ) -> None:
-        if self._states:
-            raise RuntimeError("already resolved")
         self._roots = []
         for key, reqs in requirements.items():
             self._roots.append(f"__{key}__")
@@ -239,11 +256,19 @@ class Resolution(object):
                     # If initial requirements conflict, nothing would ever work.
                     raise ResolutionImpossible(e.requirements + [requirement])
 
+    def resolve(
+        self, requirements: Dict[str, Iterable[Requirement]], max_rounds: int
+    ) -> None:
+        if self._states:
+            raise RuntimeError("already resolved")
+        self._contribute_root_requirements(requirements)
+
         last = None
         self._r.starting()
 
         for round_index in range(max_rounds):
             self._r.starting_round(round_index)
+            context.profiler.count("rounds")
 
             self._push_new_state()
             self._pin_criteria()
@@ -261,6 +286,217 @@ class Resolution(object):
         raise ResolutionTooDeep(max_rounds)
 
 
+# A pin made by the backtracking resolution, together with the level of the
+# criteria checkpoint pushed right before the pin, so that it can be undone.
+Decision = collections.namedtuple("Decision", "name candidate checkpoint")
+# An exclusion is valid as long as the first `depth` decisions are kept.
+Exclusion = collections.namedtuple("Exclusion", "depth candidates causes conflicts")
+
+
+class BacktrackingResolution(Resolution):
+    """Stateful resolution object that pins one criterion at a time.
+
+    Instead of re-checking every criterion in rounds, the criterion with the
+    highest preference is pinned at each step and the decision is pushed onto
+    a stack. When no candidate of a criterion can be pinned, the resolution
+    jumps back to the latest decision that contributed to the conflict, marks
+    that candidate as excluded and continues from there.
+    """
+
+    def __init__(self, provider: BaseProvider, reporter: SimpleReporter):
+        super().__init__(provider, reporter)
+        self._decisions = []  # type: List[Decision]
+        self._exclusions = {}  # type: Dict[str, Exclusion]
+        # Requirements conflicting in the latest attempt to pin a criterion,
+        # including the ones that excluded its candidates.
+        self._conflicts = []  # type: List[Requirement]
+        # Names of the criteria not pinned yet, kept in sync with the decisions.
+        # It is a dict to break ties of preference in a stable order.
+        self._unpinned = {}  # type: Dict[str, None]
+        # Matches of the requirements, criteria are built again after a backjump.
+        self._matches = {}  # type: Dict[Tuple[str, str], List[Candidate]]
+
+    def _contribute_to_criteria(
+        self, name: str, requirement: Requirement, parent: Union[str, Candidate]
+    ) -> None:
+        if name is not None and name in self._criteria:
+            return super()._contribute_to_criteria(name, requirement, parent)
+        name = self._p.identify(requirement)
+        key = (name, requirement.as_line())
+        if key not in self._matches:
+            self._matches[key] = self._p.find_matches(requirement)
+        if not self._matches[key]:
+            raise NoVersionsAvailable(requirement, parent)
+        self._criteria[name] = Criterion(
+            self._matches[key], [RequirementInformation(requirement, parent)]
+        )
+
+    def _add_unpinned(self, names: Iterable[str]) -> None:
+        """Mark the criteria as unpinned and prefetch the dependencies of their
+        most likely candidates.
+        """
+        new_names = [
+            name
+            for name in names
+            if name not in self._unpinned and name not in self.state.mapping
+        ]
+        self._unpinned.update(dict.fromkeys(new_names))
+        self._p.prefetch_dependencies(
+            self._criteria[name].candidates[-1] for name in new_names
+        )
+
+    def _get_parent_names(self, criterion: Criterion) -> Set[str]:
+        return {
+            self._p.identify(parent)
+            for parent in criterion.iter_parent()
+            if not isinstance(parent, str)
+        }
+
+    def _contribute_dependencies(
+        self, candidate: Candidate, dependencies: List[Requirement]
+    ) -> Set[str]:
+        """Contribute the dependencies of the candidate to the criteria.
+
+        :returns: the names of the contributed criteria.
+        :raises RequirementsConflicted: if a dependency conflicts with existing
+            criteria or pins. ``conflicts`` attribute of the error is set to the
+            names of decisions that cause the conflict.
+        """
+        contributed = set()
+        for subdep in dependencies:
+            key = self._p.identify(subdep)
+            try:
+                self._contribute_to_criteria(key, subdep, parent=candidate)
+            except RequirementsConflicted as e:
+                e.conflicts = self._get_parent_names(self._criteria[key])
+                raise
+            key = self._p.identify(subdep)
+            pinned = self.state.mapping.get(key)
+            if pinned is not None and not self._p.is_satisfied_by(subdep, pinned):
+                e = RequirementsConflicted(list(self._criteria[key].iter_requirement()))
+                e.conflicts = {key} | self._get_parent_names(self._criteria[key])
+                raise e
+            contributed.add(key)
+        return contributed
+
+    def _pin_next(self, name: str, criterion: Criterion) -> Optional[Set[str]]:
+        """Try to pin a candidate of the given criterion.
+
+        :returns: ``None`` if succeeded, otherwise the names of decisions that
+            make all candidates unavailable.
+        """
+        _, excluded, causes, conflicts = self._exclusions.get(
+            name, Exclusion(0, [], set(), [])
+        )
+        causes = causes | self._get_parent_names(criterion)
+        self._conflicts = list(conflicts)
+        for candidate in reversed(criterion.candidates):
+            if candidate in excluded:
+                continue
+            dependencies = self._p.get_dependencies(candidate)
+            checkpoint = self._criteria.checkpoint()
+            try:
+                child_names = self._contribute_dependencies(candidate, dependencies)
+            except RequirementsConflicted as e:
+                self._criteria.rollback()
+                causes.update(e.conflicts)
+                self._conflicts.extend(e.requirements)
+                context.profiler.count("conflicts")
+                continue
+            # Keep the checkpoint open so that the pin can be undone later.
+            self._decisions.append(Decision(name, candidate, checkpoint))
+            self.state.mapping[name] = candidate
+            del self._unpinned[name]
+            self._add_unpinned(self._p.identify(dep) for dep in dependencies)
+            context.profiler.count("pins")
+            self._r.pin_candidate(name, criterion, candidate, child_names)
+            return None
+        causes.discard(name)
+        return causes
+
+    def _backjump(self, causes: Set[str]) -> bool:
+        """Undo decisions up to the latest one in causes and exclude its candidate.
+
+        :returns: whether there is a decision to jump back to.
+        """
+        for depth in range(len(self._decisions) - 1, -1, -1):
+            decision = self._decisions[depth]
+            if decision.name in causes:
+                break
+        else:
+            return False
+        for undone in self._decisions[depth:]:
+            del self.state.mapping[undone.name]
+            self._unpinned[undone.name] = None
+        del self._decisions[depth:]
+        self._criteria.rollback_to(decision.checkpoint)
+        # Criteria contributed by the undone decisions are gone.
+        self._unpinned = {
+            name: None for name in self._unpinned if name in self._criteria
+        }
+        self._exclusions = {
+            k: v for k, v in self._exclusions.items() if v.depth <= depth
+        }
+        excluded, old_causes, conflicts = self._exclusions.get(
+            decision.name, Exclusion(0, [], set(), [])
+        )[1:]
+        self._exclusions[decision.name] = Exclusion(
+            depth,
+            excluded + [decision.candidate],
+            (old_causes | causes) - {decision.name},
+            conflicts + [r for r in self._conflicts if r not in conflicts],
+        )
+        self._r.backtracking(decision.name, decision.candidate)
+        context.profiler.count("backtracks")
+        return True
+
+    def _build_graph(self) -> None:
+        graph = self.state.graph
+        for name in self.state.mapping:
+            graph.add(name)
+        for name in self.state.mapping:
+            for parent in self._criteria[name].iter_parent():
+                parent_name = (
+                    parent if isinstance(parent, str) else self._p.identify(parent)
+                )
+                if parent_name in graph:
+                    graph.connect(parent_name, name)
+
+    def resolve(
+        self, requirements: Dict[str, Iterable[Requirement]], max_rounds: int
+    ) -> None:
+        if self._states:
+            raise RuntimeError("already resolved")
+        self._contribute_root_requirements(requirements)
+        self._push_new_state()
+        self._add_unpinned(list(self._criteria))
+        self._r.starting()
+
+        for round_index in range(max_rounds):
+            self._r.starting_round(round_index)
+            context.profiler.count("rounds")
+            if not self._unpinned:
+                # All criteria are pinned. Done!
+                self._build_graph()
+                self._r.ending(self.state)
+                return
+            name, criterion = min(
+                ((name, self._criteria[name]) for name in self._unpinned),
+                key=self._get_criterion_item_preference,
+            )
+            self._r.resolve_criteria(name)
+            causes = self._pin_next(name, criterion)
+            if causes is not None and not self._backjump(causes):
+                # No decision to blame, the conflict comes from root requirements
+                # and the dependencies rejected in the last attempt.
+                requirements = list(criterion.iter_requirement())
+                requirements.extend(r for r in self._conflicts if r not in requirements)
+                raise ResolutionImpossible(requirements)
+            self._r.ending_round(round_index, self.state)
+
+        raise ResolutionTooDeep(max_rounds)
+
+
 class Resolver(object):
     """The thing that performs the actual resolution work.
     """
@@ -297,3 +533,21 @@ class Resolver(object):
         resolution = Resolution(self.provider, self.reporter)
         resolution.resolve(requirements, max_rounds=max_rounds)
         return resolution.state
+
+
+class BacktrackingResolver(Resolver):
+    """A resolver that pins one criterion at a time and backjumps on conflicts.
+    """
+
+    def resolve(
+        self, requirements: Dict[str, List[Requirement]], max_rounds: int = 10000
+    ) -> State:
+        """Take a collection of constraints, spit out the resolution result.
+
+        The return value and exceptions are the same as `Resolver.resolve`,
+        except that each round pins exactly one criterion, so the `max_rounds`
+        argument is much larger by default.
+        """
+        resolution = BacktrackingResolution(self.provider, self.reporter)
+        resolution.resolve(requirements, max_rounds=max_rounds)
+        return resolution.state
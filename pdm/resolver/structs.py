@@ -66,3 +66,73 @@ class DirectedGraph(object):
 
     def iter_parents(self, key):
         return iter(self._backwards[key])
+
+
+class CriteriaStore(object):
+    """A dict-like store of criteria which keeps an undo log of changes.
+
+    Push a checkpoint before a series of changes, then either roll them back or
+    release the checkpoint to keep them. Only changed keys are recorded, so
+    trying and rejecting a candidate costs only the criteria it touched. Nothing
+    is recorded when there is no open checkpoint.
+    """
+
+    _MISSING = object()
+
+    def __init__(self):
+        self._data = {}
+        self._log = []  # List[Tuple[<key>, <previous value>]]
+        self._checkpoints = []  # List[int], positions in the undo log
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __setitem__(self, key, value):
+        if self._checkpoints:
+            self._log.append((key, self._data.get(key, self._MISSING)))
+        self._data[key] = value
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        return self._data.get(key, default)
+
+    def items(self):
+        return self._data.items()
+
+    def checkpoint(self):
+        """Push a new checkpoint and return the number of open checkpoints.
+        """
+        self._checkpoints.append(len(self._log))
+        return len(self._checkpoints)
+
+    def rollback(self):
+        """Undo all changes made after the last checkpoint and pop it.
+        """
+        position = self._checkpoints.pop()
+        while len(self._log) > position:
+            key, value = self._log.pop()
+            if value is self._MISSING:
+                del self._data[key]
+            else:
+                self._data[key] = value
+
+    def rollback_to(self, level):
+        """Roll back until there are less than `level` open checkpoints.
+        """
+        while len(self._checkpoints) >= level:
+            self.rollback()
+
+    def release(self):
+        """Pop the last checkpoint and keep the changes made after it.
+        """
+        self._checkpoints.pop()
+        if not self._checkpoints:
+            self._log.clear()
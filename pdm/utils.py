@@ -3,19 +3,22 @@ Compatibility code
 """
 import atexit
 import functools
+import hashlib
 import importlib
 import inspect
 import json
+import mmap
 import os
 import shutil
 import subprocess
 import sys
 import tempfile
+import threading
 import urllib.parse as parse
-from contextlib import contextmanager
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
 
+from pip._vendor.requests.adapters import HTTPAdapter
 from pip_shims.shims import InstallCommand, PackageFinder, TargetPython
 
 from distlib.wheel import Wheel
@@ -241,6 +244,47 @@ def get_finder(
     return finder
 
 
+class FinderPool:
+    """A per-process pool of package finders, so that the HTTP sessions and their
+    keep-alive connections are shared by all calls with the same key, instead of
+    being set up again for each of them. The sessions are closed by :meth:`close`.
+    """
+
+    def __init__(self) -> None:
+        self._finders = {}  # type: Dict[Tuple[Any, ...], PackageFinder]
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        key: Tuple[Any, ...],
+        factory: Callable[[], PackageFinder],
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+    ) -> PackageFinder:
+        """Return the finder of the given key, creating it with the factory on the
+        first call.
+
+        :param key: a hashable key of everything the finder depends on.
+        :param factory: a function to create the finder.
+        :param pool_connections: the number of hosts to keep connection pools for.
+        :param pool_maxsize: the max number of connections kept for each host.
+        """
+        with self._lock:
+            finder = self._finders.get(key)
+            if finder is None:
+                finder = self._finders[key] = factory()
+                for adapter in finder.session.adapters.values():
+                    if isinstance(adapter, HTTPAdapter):
+                        adapter.init_poolmanager(pool_connections, pool_maxsize)
+            return finder
+
+    def close(self) -> None:
+        with self._lock:
+            for finder in self._finders.values():
+                finder.session.close()
+            self._finders.clear()
+
+
 def create_tracked_tempdir(
     suffix: Optional[str] = None, prefix: Optional[str] = "", dir: Optional[str] = None
 ) -> str:
@@ -278,33 +322,47 @@ def join_list_with(items: List[Any], sep: Any) -> List[Any]:
 
 def _wheel_supported(self, tags=None):
     # Ignore current platform. Support everything.
-    return True
+    if isinstance(tags, AllWheelTags):
+        return True
+    return _original_wheel_methods[0](self, tags)
 
 
 def _wheel_support_index_min(self, tags=None):
     # All wheels are equal priority for sorting.
-    return 0
+    if isinstance(tags, AllWheelTags):
+        return 0
+    return _original_wheel_methods[1](self, tags)
+
 
+class AllWheelTags(list):
+    """The supported tags of a finder that allows all wheels."""
 
-@contextmanager
-def allow_all_wheels():
-    """Monkey patch pip.Wheel to allow all wheels
+
+_wheel_methods_lock = threading.Lock()
+_original_wheel_methods = None
+
+
+def allow_all_wheels(finder: PackageFinder) -> PackageFinder:
+    """Make the finder allow all wheels
 
     The usual checks against platforms and Python versions are ignored to allow
-    fetching all available entries in PyPI. This also saves the candidate cache
-    and set a new one, or else the results from the previous non-patched calls
-    will interfere.
+    fetching all available entries in PyPI. Only this finder is affected: its
+    supported tags are marked, and pip.Wheel is patched once to accept any wheel
+    checked against the marked tags. Other finders, in any thread, still check the
+    wheel tags as usual.
     """
     from pip._internal.models.wheel import Wheel as PipWheel
 
-    original_wheel_supported = PipWheel.supported
-    original_support_index_min = PipWheel.support_index_min
+    global _original_wheel_methods
 
-    PipWheel.supported = _wheel_supported
-    PipWheel.support_index_min = _wheel_support_index_min
-    yield
-    PipWheel.supported = original_wheel_supported
-    PipWheel.support_index_min = original_support_index_min
+    with _wheel_methods_lock:
+        if _original_wheel_methods is None:
+            _original_wheel_methods = (PipWheel.supported, PipWheel.support_index_min)
+            PipWheel.supported = _wheel_supported
+            PipWheel.support_index_min = _wheel_support_index_min
+    target_python = finder._target_python
+    target_python._valid_tags = AllWheelTags(target_python.get_tags())
+    return finder
 
 
 def find_project_root(cwd: str = ".", max_depth: int = 5) -> Optional[str]:
@@ -338,6 +396,50 @@ def get_python_version(executable, as_string=False):
     return ".".join(map(str, result))
 
 
+# Print what the ABI tag is made of, falling back like wheel.pep425tags.get_flag.
+ABI_INFO_SCRIPT = """
+import json, platform, sys, sysconfig
+impl = platform.python_implementation()
+def flag(name, fallback):
+    value = sysconfig.get_config_var(name)
+    return fallback if value is None else value
+print(json.dumps({
+    "soabi": sysconfig.get_config_var("SOABI"),
+    "impl": impl,
+    "version": sys.version_info[:2],
+    "debug": flag("Py_DEBUG", hasattr(sys, "gettotalrefcount")),
+    "pymalloc": flag("WITH_PYMALLOC", impl == "CPython"),
+    "ucs4": flag("Py_UNICODE_SIZE", 4 if sys.maxunicode == 0x10FFFF else 2) == 4,
+}))
+"""
+
+
+def get_interpreter_abi_tag(executable: str) -> Optional[str]:
+    """Return the ABI tag of the given Python interpreter. It is the same as
+    :func:`get_abi_tag`, but the config vars are read from that interpreter rather
+    than the one running pdm.
+    """
+    info = json.loads(subprocess.check_output([executable, "-c", ABI_INFO_SCRIPT]))
+    soabi = info["soabi"]
+    impl = {"CPython": "cp", "PyPy": "pp"}.get(info["impl"])
+    python_version = tuple(info["version"])
+    if not soabi and impl in {"cp", "pp"}:
+        return "".join(
+            [
+                impl,
+                "".join(map(str, python_version)),
+                "d" if info["debug"] else "",
+                "m" if python_version < (3, 8) and info["pymalloc"] else "",
+                "u" if python_version < (3, 3) and info["ucs4"] else "",
+            ]
+        )
+    elif soabi and soabi.startswith("cpython-"):
+        return "cp" + soabi.split("-")[1]
+    elif soabi:
+        return soabi.replace(".", "_").replace("-", "_")
+    return None
+
+
 def get_pep508_environment(executable: str) -> Dict[str, Any]:
     script = importlib.import_module("pdm.pep508").__file__.rstrip("co")
     args = [executable, script]
@@ -380,3 +482,102 @@ def get_user_email_from_git() -> Tuple[str, str]:
     except subprocess.CalledProcessError:
         email = ""
     return username, email
+
+
+# Size of the blocks passed to hashlib when hashing files.
+HASH_BLOCK_SIZE = 8 * 1024 * 1024
+
+# Ways to put a file of the package store into a project, see link_file().
+LINK_METHODS = ("hardlink", "reflink", "symlink", "copy")
+# The ioctl request to clone a file on Linux, asm-generic/ioctl.h.
+FICLONE = 0x40049409
+
+_SIZE_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+
+
+def parse_size(value: Any) -> int:
+    """Parse a size like ``500M``, ``2GB`` or ``1.5GiB`` into bytes.
+    Plain integers are bytes.
+    """
+    if isinstance(value, (int, float)):
+        return int(value)
+    text = str(value).strip().upper()
+    for suffix in ("IB", "B"):
+        if text.endswith(suffix):
+            text = text[: -len(suffix)]
+            break
+    unit = text[-1:] if text[-1:] in _SIZE_UNITS else ""
+    try:
+        number = float(text[: len(text) - len(unit)])
+    except ValueError:
+        raise ValueError(f"Invalid size: {value!r}")
+    return int(number * _SIZE_UNITS[unit])
+
+
+def format_size(size: int) -> str:
+    """Format a size in bytes for humans."""
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if size < 1024:
+            break
+        size /= 1024
+    else:
+        unit = "TiB"
+    return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+
+
+def get_file_hash(path: str, hash_name: str = "sha256") -> str:
+    """Return the hex digest of the file content.
+
+    The file is memory-mapped and hashed in big blocks, during which hashlib
+    releases the GIL, so many files can be hashed in parallel threads.
+    """
+    h = hashlib.new(hash_name)
+    with open(path, "rb") as fp:
+        size = os.fstat(fp.fileno()).st_size
+        if size:
+            with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                view = memoryview(mapped)
+                try:
+                    for start in range(0, size, HASH_BLOCK_SIZE):
+                        end = start + HASH_BLOCK_SIZE
+                        h.update(view[start:end])
+                finally:
+                    view.release()
+    return h.hexdigest()
+
+
+def _reflink(src: str, dst: str) -> None:
+    try:
+        import fcntl
+    except ImportError:
+        raise OSError("Reflinks are not supported on this platform") from None
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+    shutil.copymode(src, dst)
+
+
+def link_file(src: str, dst: str, method: str = "hardlink") -> str:
+    """Put the file at ``dst`` with one of :data:`LINK_METHODS`, replacing the
+    existing one. It falls back to copying if the method doesn't work here, e.g.
+    across devices or on a file system without reflinks.
+
+    :returns: the method actually used.
+    """
+    if method not in LINK_METHODS:
+        raise ValueError(f"Unknown link method: {method}")
+    if os.path.lexists(dst):
+        os.unlink(dst)
+    if method != "copy":
+        try:
+            if method == "hardlink":
+                os.link(src, dst)
+            elif method == "reflink":
+                _reflink(src, dst)
+            else:
+                os.symlink(src, dst)
+            return method
+        except OSError:
+            if os.path.lexists(dst):
+                os.unlink(dst)
+    shutil.copy2(src, dst)
+    return "copy"
@@ -1,9 +1,11 @@
+import json
 from collections import namedtuple
 
 import click
 import pytest
 from distlib.wheel import Wheel
 from pdm.cli import actions
+from pdm.context import context
 from pdm.exceptions import PdmException
 from pdm.models.requirements import parse_requirement
 from pdm.project import Project
@@ -243,6 +245,33 @@ def test_update_specified_packages_eager_mode(project, repository, working_set):
     assert locked_candidates["pytz"].version == "2019.3"
 
 
+def test_add_package_incremental_keeps_untouched_pins(project, repository, mocker):
+    actions.do_add(project, sync=False, packages=["requests"])
+    repository.add_candidate("requests", "2.20.0")
+    repository.add_candidate("chardet", "3.0.5")
+    spy = mocker.spy(repository, "find_matches")
+    actions.do_add(project, sync=False, packages=["pytz"])
+
+    assert {call[0][0].key for call in spy.call_args_list} == {"pytz"}
+    locked_candidates = project.get_locked_candidates()
+    assert locked_candidates["requests"].version == "2.19.1"
+    assert locked_candidates["chardet"].version == "3.0.4"
+    assert locked_candidates["pytz"].version == "2019.3"
+
+
+def test_add_package_incremental_releases_conflicting_pins(project, repository):
+    actions.do_add(project, sync=False, packages=["chardet"])
+    assert project.get_locked_candidates()["chardet"].version == "3.0.4"
+    repository.add_candidate("chardet", "3.0.5")
+    repository.add_candidate("foo", "0.1.0")
+    repository.add_dependencies("foo", "0.1.0", ["chardet>=3.0.5"])
+    actions.do_add(project, sync=False, save="wildcard", packages=["foo"])
+
+    locked_candidates = project.get_locked_candidates()
+    assert locked_candidates["foo"].version == "0.1.0"
+    assert locked_candidates["chardet"].version == "3.0.5"
+
+
 def test_remove_package(project, repository, working_set, is_dev):
     actions.do_add(project, dev=is_dev, packages=["requests", "pytz"])
     actions.do_remove(project, dev=is_dev, packages=["pytz"])
@@ -317,6 +346,83 @@ def test_lock_dependencies(project, repository):
         assert package in locked
 
 
+def test_lock_skipped_if_fingerprint_matches(project, repository, mocker):
+    project.add_dependencies({"requests": parse_requirement("requests")})
+    actions.do_lock(project)
+    spy = mocker.spy(actions, "resolve")
+    locked = actions.do_lock(project)
+    spy.assert_not_called()
+    assert locked["requests"].version == "2.19.1"
+
+    project.tool_settings["allow_prereleases"] = True
+    actions.do_lock(project)
+    spy.assert_called_once()
+
+
+def test_lock_skipped_updates_content_hash(project, repository, mocker):
+    project.add_dependencies({"requests": parse_requirement("requests")})
+    actions.do_lock(project)
+    project.lockfile_file.write_text(
+        project.lockfile_file.read_text().replace(
+            project.lockfile["root"]["content_hash"], "md5:outdated"
+        )
+    )
+    project._lockfile = None
+    assert not project.is_lockfile_hash_match()
+    spy = mocker.spy(actions, "resolve")
+    actions.do_lock(project)
+    spy.assert_not_called()
+    assert project.is_lockfile_hash_match()
+
+
+def test_lock_not_skipped_with_vcs_requirements(project, mocker):
+    req = parse_requirement("git+https://github.com/test-root/demo.git#egg=demo")
+    project.add_dependencies({"demo": req})
+    mocker.patch.object(project, "is_lockfile_fingerprint_match", return_value=True)
+    do_lock = mocker.patch.object(actions, "_do_lock")
+    actions.do_lock(project)
+    do_lock.assert_called_once()
+
+
+def test_lock_force_ignores_fingerprint(project, repository, mocker):
+    project.add_dependencies({"requests": parse_requirement("requests")})
+    actions.do_lock(project)
+    fingerprint = project.lockfile["root"]["resolution_fingerprint"]
+    assert fingerprint.startswith("sha256:")
+    spy = mocker.spy(actions, "resolve")
+    actions.do_lock(project, force=True)
+    spy.assert_called_once()
+    assert project.lockfile["root"]["resolution_fingerprint"] == fingerprint
+
+
+def test_fingerprint_matches_after_saving_specifiers(project, repository, working_set):
+    actions.do_add(project, packages=["pytz"], sync=False)
+    assert project.tool_settings["dependencies"]["pytz"] == "<2020.0.0,>=2019.3"
+    assert project.is_lockfile_fingerprint_match(project.get_resolution_fingerprint())
+
+    repository.add_candidate("pytz", "2020.2")
+    actions.do_update(project, unconstrained=True, packages=("pytz",))
+    assert project.tool_settings["dependencies"]["pytz"] == "<2021.0.0,>=2020.2"
+    assert project.is_lockfile_fingerprint_match(project.get_resolution_fingerprint())
+
+
+def test_lock_dependencies_with_profile(project, repository, tmp_path):
+    project.add_dependencies({"requests": parse_requirement("requests")})
+    profile = tmp_path / "profile.json"
+    trace = tmp_path / "trace.json"
+    actions.do_lock(project, profile=profile.as_posix(), chrome_trace=trace.as_posix())
+    report = json.loads(profile.read_text())
+    assert report["phases"]["get_dependencies"]["calls"] >= 5
+    assert report["phases"]["format_lockfile"]["calls"] == 1
+    assert report["counters"]["pins"] >= 5
+    generator = report["dependency_generators"]["_get_dependencies_from_fixture"]
+    assert generator["hits"] >= 5
+    assert "requests" in [p["name"] for p in report["slowest_packages"]]
+    events = json.loads(trace.read_text())["traceEvents"]
+    assert {"resolve", "find_matches"} <= {e["name"] for e in events}
+    assert not context.profiler.enabled
+
+
 def test_build_distributions(tmp_path):
     project = Project()
     actions.do_build(project, dest=tmp_path.as_posix())
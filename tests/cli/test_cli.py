@@ -23,7 +23,9 @@ def test_help_option(invoke):
 def test_lock_command(project, invoke, mocker):
     m = mocker.patch.object(actions, "do_lock")
     invoke(["lock"], obj=project)
-    m.assert_called_with(project)
+    m.assert_called_with(project, profile=None, chrome_trace=None, force=False)
+    invoke(["lock", "--force"], obj=project)
+    m.assert_called_with(project, profile=None, chrome_trace=None, force=True)
 
 
 def test_install_command(project, invoke, mocker):
@@ -138,3 +140,29 @@ def test_install_with_lockfile(project, invoke, working_set, repository):
     assert "Lock file hash doesn't match" in result.output
     assert "pytz" in project.get_locked_candidates()
     assert project.is_lockfile_hash_match()
+
+    project.tool_settings["allow_prereleases"] = True
+    result = invoke(["install"], obj=project)
+    assert "Lock file resolution fingerprint doesn't match" in result.output
+
+
+def test_cache_commands(project, invoke):
+    cache_dir = Path(project.config["cache_dir"])
+    wheel = cache_dir / "wheels" / "demo-0.0.1-py3-none-any.whl"
+    wheel.parent.mkdir(parents=True)
+    wheel.write_bytes(b"x" * 2048)
+
+    result = invoke(["cache", "info"], obj=project)
+    assert result.exit_code == 0
+    assert "wheels" in result.output and "2.0 KiB" in result.output
+
+    result = invoke(["cache", "prune"], obj=project)
+    assert result.exit_code != 0
+    result = invoke(["cache", "prune", "--max-size", "1K"], obj=project)
+    assert result.exit_code == 0
+    assert not wheel.exists()
+
+    wheel.write_bytes(b"x" * 2048)
+    result = invoke(["cache", "clear", "wheels"], obj=project)
+    assert result.exit_code == 0
+    assert not wheel.exists()
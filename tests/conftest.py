@@ -204,6 +204,8 @@ def working_set(mocker):
     installer.install.side_effect = install
     installer.uninstall.side_effect = uninstall
     mocker.patch("pdm.installers.Installer", return_value=installer)
+    # Nothing is really installed, so there is nothing to download.
+    mocker.patch("pdm.installers.Synchronizer.download_candidates")
 
     yield rv
 
@@ -0,0 +1,208 @@
+import hashlib
+import os
+from pathlib import Path
+
+import pytest
+
+from pdm.exceptions import CorruptedCacheError
+from pdm.models import caches
+from pdm.models.caches import (
+    ArtifactHasher,
+    BuiltWheelCache,
+    CacheManager,
+    CandidateInfoCache,
+    PackageStore,
+)
+from pdm.models.candidates import Candidate
+from pdm.models.requirements import parse_requirement
+from tests.test_installers import make_wheel
+
+SOURCE = "https://pypi.org/simple"
+
+
+def make_candidate(line, editable=False):
+    req = parse_requirement(line, editable)
+    return Candidate(req, None, name=req.project_name or "demo", version="1.0")
+
+
+def test_candidate_info_cache_commits_in_batches(tmp_path):
+    cache_file = tmp_path / "package_meta.db"
+    cache = CandidateInfoCache(cache_file, batch_size=2)
+    reader = CandidateInfoCache(cache_file)
+    foo, bar = make_candidate("foo"), make_candidate("bar")
+
+    cache.set(foo, SOURCE, (["bar"], ">=3.6", "Foo"))
+    assert cache.get(foo, SOURCE) == [["bar"], ">=3.6", "Foo"]
+    with pytest.raises(KeyError):
+        reader.get(foo, SOURCE)
+
+    cache.set(bar, SOURCE, (["baz"], "", ""))
+    assert reader.get(foo, SOURCE) == [["bar"], ">=3.6", "Foo"]
+    assert reader.get(bar, SOURCE) == [["baz"], "", ""]
+
+    cache.delete(foo, SOURCE)
+    cache.flush()
+    with pytest.raises(KeyError):
+        reader.get(foo, SOURCE)
+
+
+def test_candidate_info_cache_key(tmp_path):
+    cache = CandidateInfoCache(tmp_path / "package_meta.db")
+    cache.set(make_candidate("Foo_Bar"), SOURCE, (["baz"], "", ""))
+
+    assert cache.get(make_candidate("foo-bar[extra]"), SOURCE) == [["baz"], "", ""]
+    with pytest.raises(KeyError):
+        cache.get(make_candidate("foo-bar"), "https://my.pypi.org/simple")
+
+    tmp_path.joinpath("setup.py").touch()
+    local = make_candidate(tmp_path.as_posix(), True)
+    cache.set(local, "", (["baz"], "", ""))
+    with pytest.raises(KeyError):
+        cache.get(local, "")
+
+
+def test_corrupted_candidate_info_cache_is_cleared(tmp_path):
+    cache_file = tmp_path / "package_meta.db"
+    cache_file.write_bytes(b"not a database" * 100)
+    cache = CandidateInfoCache(cache_file)
+    with pytest.raises(CorruptedCacheError):
+        cache.get(make_candidate("foo"), SOURCE)
+
+    cache.clear()
+    assert not cache_file.exists()
+    cache.set(make_candidate("foo"), SOURCE, ([], "", ""))
+    cache.flush()
+    reader = CandidateInfoCache(cache_file)
+    assert reader.get(make_candidate("foo"), SOURCE) == [[], "", ""]
+
+
+def make_cache_file(cache_dir, name, size, mtime):
+    path = cache_dir / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_cache_manager_tracks_hits_and_sizes(tmp_path):
+    manager = CacheManager(tmp_path)
+    cached = make_cache_file(tmp_path, "pkgs/demo-0.0.1.tar.gz", 100, 1000)
+    make_cache_file(tmp_path, "hashes/a/b/c", 20, 1000)
+    manager.record("pkgs", True, cached)
+    manager.record("pkgs", False)
+    manager.record("hashes", False)
+    manager.close()
+    assert cached.stat().st_atime > 1000
+    assert cached.stat().st_mtime == 1000
+
+    info = {bucket["name"]: bucket for bucket in manager.get_info()}
+    assert info["pkgs"] == {
+        "name": "pkgs",
+        "size": 100,
+        "files": 1,
+        "hits": 1,
+        "misses": 1,
+    }
+    assert info["hashes"]["size"] == 20
+    assert info["hashes"]["misses"] == 1
+    assert info["wheels"]["files"] == 0
+
+
+def test_cache_manager_prunes_least_recently_used(tmp_path):
+    manager = CacheManager(tmp_path, max_size=250)
+    old = make_cache_file(tmp_path, "wheels/old.whl", 100, 1000)
+    used = make_cache_file(tmp_path, "wheels/used.whl", 100, 2000)
+    new = make_cache_file(tmp_path, "pkgs/new.tar.gz", 100, 3000)
+    manager.record("wheels", True, old)
+
+    assert manager.prune() == (1, 100)
+    assert old.exists() and new.exists()
+    assert not used.exists()
+
+
+def test_cache_manager_clear_buckets(tmp_path):
+    manager = CacheManager(tmp_path)
+    make_cache_file(tmp_path, "wheels/demo.whl", 100, 1000)
+    kept = make_cache_file(tmp_path, "pkgs/demo.tar.gz", 100, 1000)
+    make_cache_file(tmp_path, "package_meta.db", 10, 1000)
+
+    assert manager.clear(["wheels", "package_meta"]) == 110
+    assert not (tmp_path / "wheels").exists()
+    assert not (tmp_path / "package_meta.db").exists()
+    assert kept.exists()
+
+
+def test_cache_manager_keeps_package_store(tmp_path):
+    manager = CacheManager(tmp_path, max_size=100)
+    stored = make_cache_file(tmp_path, "packages/ab/cdef/demo/__init__.py", 200, 1000)
+    make_cache_file(tmp_path, "wheels/demo.whl", 50, 1000)
+
+    assert manager.prune() == (0, 0)
+    assert stored.exists()
+    assert manager.clear(["packages"]) == 200
+    assert not (tmp_path / "packages").exists()
+
+
+def test_package_store_unpacks_wheel_once(tmp_path, mocker):
+    wheel = make_wheel(tmp_path, "demo", {"demo/__init__.py": "VERSION = 1\n"})
+    wheel_path = Path(wheel.dirname, wheel.filename)
+    manager = CacheManager(tmp_path)
+    store = PackageStore(tmp_path / "packages", manager)
+    unpack = mocker.spy(store, "_unpack")
+
+    entry = store.get(wheel_path)
+    assert (entry / "demo/__init__.py").read_text() == "VERSION = 1\n"
+    assert (entry / "demo-0.1.0.dist-info/RECORD").is_file()
+    assert entry.parent.parent == tmp_path / "packages"
+    assert not list(entry.parent.glob("*.tmp"))
+    assert store.get(wheel_path) == entry
+    assert unpack.call_count == 1
+    assert manager._counts["packages"] == {"hits": 1, "misses": 1}
+
+
+def test_built_wheel_cache(tmp_path):
+    cache = BuiltWheelCache(tmp_path / "built_wheels")
+    tag = "cp38-cp38-linux_x86_64"
+    assert cache.get("abcdef", tag) is None
+
+    wheel = tmp_path / "demo-0.0.1-py3-none-any.whl"
+    wheel.write_bytes(b"wheel")
+    cached = cache.set("abcdef", tag, wheel)
+    assert cached != wheel and cached.name == wheel.name
+    assert cache.get("abcdef", tag) == cached
+    assert cached.read_bytes() == b"wheel"
+    assert cache.get("abcdef", "cp39-cp39-linux_x86_64") is None
+    assert cache.get("123456", tag) is None
+
+
+def test_artifact_hasher_memoizes_unchanged_files(tmp_path, mocker):
+    files = []
+    for i in range(3):
+        path = tmp_path / f"demo-0.0.{i}.tar.gz"
+        path.write_bytes(b"content %d" % i)
+        files.append(path.as_posix())
+    get_file_hash = mocker.patch(
+        "pdm.models.caches.get_file_hash", wraps=caches.get_file_hash
+    )
+    hasher = ArtifactHasher(tmp_path / "file_hashes")
+
+    hashes = hasher.hash_files(files + files[:1])
+    assert hashes == {
+        path: "sha256:" + hashlib.sha256(b"content %d" % i).hexdigest()
+        for i, path in enumerate(files)
+    }
+    assert get_file_hash.call_count == 3
+    # Memoized in another process too
+    assert ArtifactHasher(tmp_path / "file_hashes").hash_files(files) == hashes
+    assert get_file_hash.call_count == 3
+    # A cache hit doesn't invalidate the memoized hash.
+    CacheManager(tmp_path).record("pkgs", True, Path(files[0]))
+    assert hasher.hash_file(files[0]) == hashes[files[0]]
+    assert get_file_hash.call_count == 3
+
+    Path(files[0]).write_bytes(b"changed content")
+    os.utime(files[0], ns=(0, 0))
+    assert hasher.hash_file(files[0]) == (
+        "sha256:" + hashlib.sha256(b"changed content").hexdigest()
+    )
+    assert get_file_hash.call_count == 4
@@ -1,4 +1,6 @@
 import pytest
+from pip._vendor import requests
+
 from pdm.exceptions import ExtrasError
 from pdm.models.candidates import Candidate
 from pdm.models.requirements import parse_requirement
@@ -70,6 +72,20 @@ def test_parse_remote_link_metadata(project):
     assert candidate.version == "0.0.1"
 
 
+def test_lazy_metadata_falls_back_on_http_errors(project, mocker):
+    req = parse_requirement(
+        "http://fixtures.test/artifacts/demo-0.0.1-py2.py3-none-any.whl"
+    )
+    candidate = Candidate(req, project.environment)
+    mocker.patch("pdm.models.environment.get_finder")
+    for error in (requests.HTTPError("500 Server Error"), requests.ConnectionError()):
+        mocker.patch(
+            "pdm.models.candidates.get_wheel_metadata_from_url", side_effect=error
+        )
+        # None tells get_metadata() to download the whole wheel.
+        assert candidate._get_lazy_metadata() is None
+
+
 def test_extras_warning(project, recwarn):
     req = parse_requirement(
         f"demo[foo] @ http://fixtures.test/artifacts/demo-0.0.1-py2.py3-none-any.whl"
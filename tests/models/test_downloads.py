@@ -0,0 +1,65 @@
+import hashlib
+
+import pytest
+from pip._internal.models.link import Link
+from pip._vendor import requests
+
+from pdm.exceptions import HashMismatchError
+from pdm.models.downloads import Downloader
+from tests.models.test_lazy_wheel import RangeFileAdapter
+
+CONTENT = bytes(range(256)) * 1024
+URL = "https://files.test/demo-0.0.1.tar.gz"
+HASHES = {"demo-0.0.1.tar.gz": "sha256:" + hashlib.sha256(CONTENT).hexdigest()}
+
+
+@pytest.fixture()
+def adapter():
+    return RangeFileAdapter(CONTENT)
+
+
+@pytest.fixture()
+def downloader(adapter):
+    session = requests.Session()
+    session.mount("https://", adapter)
+    return Downloader(session)
+
+
+def test_download_verifies_hash(downloader, adapter, tmp_path):
+    path = downloader.download(Link(URL), tmp_path, HASHES)
+    assert path == tmp_path / "demo-0.0.1.tar.gz"
+    assert path.read_bytes() == CONTENT
+    assert not tmp_path.joinpath("demo-0.0.1.tar.gz.part").exists()
+
+    assert downloader.download(Link(URL), tmp_path, HASHES) == path
+    assert adapter.requested_ranges == [None]
+
+
+def test_download_resumes_partial_file(downloader, adapter, tmp_path):
+    tmp_path.joinpath("demo-0.0.1.tar.gz.part").write_bytes(CONTENT[:1000])
+    path = downloader.download(Link(URL), tmp_path, HASHES)
+    assert path.read_bytes() == CONTENT
+    assert adapter.requested_ranges == ["bytes=1000-"]
+    assert downloader.downloaded_bytes == len(CONTENT) - 1000
+
+
+def test_download_restarts_if_range_is_unsupported(downloader, adapter, tmp_path):
+    adapter.support_range = False
+    tmp_path.joinpath("demo-0.0.1.tar.gz.part").write_bytes(b"garbage")
+    path = downloader.download(Link(URL), tmp_path, HASHES)
+    assert path.read_bytes() == CONTENT
+
+
+def test_download_hash_mismatch(downloader, tmp_path):
+    link = Link(URL + "#sha256=1234")
+    with pytest.raises(HashMismatchError):
+        downloader.download(link, tmp_path)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_download_all(downloader, tmp_path):
+    links = [Link(f"https://files.test/demo-0.0.{i}.tar.gz") for i in range(5)]
+    paths = downloader.download_all((link, tmp_path, None) for link in links)
+    assert [path.name for path in paths] == [link.filename for link in links]
+    assert downloader.downloaded_files == 5
+    assert downloader.downloaded_bytes == 5 * len(CONTENT)
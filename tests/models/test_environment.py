@@ -0,0 +1,88 @@
+import hashlib
+import sys
+
+import pytest
+from pip._internal.models.link import Link
+from pip._internal.models.target_python import TargetPython
+from pip._vendor.requests import Session
+
+from pdm.models.environment import Environment
+from pdm.utils import (
+    allow_all_wheels,
+    get_abi_tag,
+    get_finder,
+    get_interpreter_abi_tag,
+)
+
+
+class FakeFinder:
+    def __init__(self, *args):
+        self.session = Session()
+        self._target_python = TargetPython()
+
+
+@pytest.fixture()
+def fake_finder(mocker):
+    return mocker.patch("pdm.models.environment.get_finder", side_effect=FakeFinder)
+
+
+def test_finders_are_pooled_by_sources(project, fake_finder):
+    environment = project.environment
+    source = {"url": "https://test.pypi.org/simple", "verify_ssl": True, "name": "t"}
+    with environment.get_finder() as finder:
+        pass
+    with environment.get_finder([]) as other:
+        assert other is finder
+    with environment.get_finder([source]) as other:
+        assert other is not finder
+    with environment.get_finder(allow_all=True) as all_finder:
+        assert all_finder is not finder
+    with environment.get_finder(allow_all=True) as other:
+        assert other is all_finder
+    assert fake_finder.call_count == 3
+
+
+def test_allow_all_wheels_only_affects_the_finder():
+    finder = get_finder([])
+    all_finder = allow_all_wheels(get_finder([]))
+    link = Link("https://files.example.org/demo-0.0.1-cp27-cp27m-win32.whl")
+
+    evaluator = all_finder.make_link_evaluator("demo")
+    assert evaluator.evaluate_link(link) == (True, "0.0.1")
+    evaluator = finder.make_link_evaluator("demo")
+    assert not evaluator.evaluate_link(link)[0]
+
+
+def test_finder_pool_sizes_from_config(project, fake_finder):
+    project.config["pool_maxsize"] = 3
+    with project.environment.get_finder() as finder:
+        adapter = finder.session.get_adapter("https://pypi.org/simple")
+        assert adapter.poolmanager.connection_pool_kw["maxsize"] == 3
+
+
+def test_get_sdist_hash_without_downloading(tmp_path):
+    get_sdist_hash = Environment._get_sdist_hash
+    link = Link("https://files.example.org/demo-0.0.1.tar.gz#sha256=abc")
+    assert get_sdist_hash(link, None, tmp_path.as_posix()) == "abc"
+
+    link = Link("https://files.example.org/demo-0.0.1.tar.gz")
+    hashes = {"demo-0.0.1.tar.gz": "sha256:def"}
+    assert get_sdist_hash(link, hashes, tmp_path.as_posix()) == "def"
+    assert get_sdist_hash(link, None, tmp_path.as_posix()) is None
+
+    tmp_path.joinpath("demo-0.0.1.tar.gz").write_bytes(b"sdist")
+    assert (
+        get_sdist_hash(link, None, tmp_path.as_posix())
+        == hashlib.sha256(b"sdist").hexdigest()
+    )
+
+
+def test_interpreter_tag_of_the_target_python(project, mocker):
+    assert get_interpreter_abi_tag(sys.executable) == get_abi_tag(sys.version_info[:2])
+
+    get_abi = mocker.patch(
+        "pdm.models.environment.get_interpreter_abi_tag", return_value="cp27mu"
+    )
+    environment = project.environment
+    assert environment.interpreter_tag.split("-")[1] == "cp27mu"
+    get_abi.assert_called_once_with(environment.python_executable)
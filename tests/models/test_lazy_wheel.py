@@ -0,0 +1,98 @@
+import re
+import zipfile
+from io import BytesIO
+
+import pytest
+from pip._vendor import requests
+
+from pdm.exceptions import HTTPRangeRequestUnsupported
+from pdm.models.lazy_wheel import get_wheel_metadata_from_url
+
+METADATA = """\
+Metadata-Version: 2.1
+Name: demo
+Version: 0.0.1
+Summary: A demo package
+Requires-Python: >=3.6
+Requires-Dist: idna
+Requires-Dist: chardet; os_name=="nt"
+"""
+
+
+class RangeFileAdapter(requests.adapters.BaseAdapter):
+    """Serve a file like a static file server, honoring the Range header if
+    ``support_range`` is True.
+    """
+
+    def __init__(self, content, support_range=True):
+        super().__init__()
+        self.content = content
+        self.support_range = support_range
+        self.requested_ranges = []
+
+    def send(self, request, **kwargs):
+        response = requests.models.Response()
+        response.request = request
+        response.url = request.url
+        byte_range = request.headers.get("Range")
+        self.requested_ranges.append(byte_range)
+        total = len(self.content)
+        match = re.match(r"bytes=(\d*)-(\d*)$", byte_range or "")
+        if not self.support_range or not match:
+            response.status_code = 200
+            response.raw = BytesIO(self.content)
+            return response
+        start, end = match.groups()
+        if not start:
+            start, end = max(total - int(end), 0), total - 1
+        else:
+            start, end = int(start), min(int(end or total - 1), total - 1)
+        response.status_code = 206
+        response.headers["Content-Range"] = f"bytes {start}-{end}/{total}"
+        stop = end + 1
+        response.raw = BytesIO(self.content[start:stop])
+        return response
+
+    def close(self):
+        pass
+
+
+@pytest.fixture(params=[False, True])
+def wheel_content(request):
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        if request.param:
+            zf.writestr("demo-0.0.1.dist-info/METADATA", METADATA)
+        zf.writestr("demo/__init__.py", "")
+        # Big incompressible payload that should never be fetched.
+        zf.writestr("demo/data.bin", bytes(range(256)) * 4096 * 4)
+        if not request.param:
+            zf.writestr("demo-0.0.1.dist-info/METADATA", METADATA)
+        zf.writestr("demo-0.0.1.dist-info/WHEEL", "Wheel-Version: 1.0\n")
+    return buffer.getvalue()
+
+
+def make_session(adapter):
+    session = requests.Session()
+    session.mount("https://", adapter)
+    return session
+
+
+def test_read_metadata_with_range_requests(wheel_content):
+    adapter = RangeFileAdapter(wheel_content)
+    url = "https://files.test/demo-0.0.1-py3-none-any.whl"
+    metadata = get_wheel_metadata_from_url(url, make_session(adapter))
+
+    assert metadata.name == "demo"
+    assert metadata.version == "0.0.1"
+    assert metadata.run_requires == ["idna", 'chardet; os_name=="nt"']
+    assert all(r and r.startswith("bytes=") for r in adapter.requested_ranges)
+    assert len(wheel_content) > 4 * 1024 * 1024
+    assert len(adapter.requested_ranges) <= 3
+
+
+def test_range_requests_unsupported(wheel_content):
+    adapter = RangeFileAdapter(wheel_content, support_range=False)
+    url = "https://files.test/demo-0.0.1-py3-none-any.whl"
+    with pytest.raises(HTTPRangeRequestUnsupported):
+        get_wheel_metadata_from_url(url, make_session(adapter))
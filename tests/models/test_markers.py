@@ -1,5 +1,6 @@
 import pytest
 from pdm.models.markers import Marker
+from pip._vendor.packaging.markers import Marker as PackageMarker
 
 
 @pytest.mark.parametrize(
@@ -37,7 +38,51 @@ from pdm.models.markers import Marker
             | Marker('python_version~="2.7"'),
             'os_name == "nt" or sys_platform == "win32" or python_version ~= "2.7"',
         ),
+        (
+            Marker('os_name == "nt"')
+            | Marker('os_name == "nt" and python_version ~= "2.7"'),
+            'os_name == "nt"',
+        ),
+        (
+            Marker('os_name == "nt" or sys_platform == "win32"')
+            & Marker('os_name == "nt"'),
+            'os_name == "nt"',
+        ),
+        (
+            Marker('os_name == "nt" and sys_platform == "win32"')
+            & Marker('sys_platform == "win32"'),
+            'os_name == "nt" and sys_platform == "win32"',
+        ),
+        (
+            Marker('(os_name == "nt" and sys_platform == "win32") and os_name == "nt"'),
+            'os_name == "nt" and sys_platform == "win32"',
+        ),
     ],
 )
 def test_marker_op(expression, expected):
     assert str(expression) == expected
+
+
+def test_marker_equality():
+    assert Marker("os_name=='nt'") == Marker('os_name == "nt"')
+    assert Marker("os_name=='nt'") != Marker('os_name == "posix"')
+    assert Marker("os_name=='nt'") == PackageMarker('os_name == "nt"')
+    assert Marker('os_name == "nt"') & Marker('sys_platform == "win32"') == Marker(
+        'os_name == "nt" and sys_platform == "win32"'
+    )
+    assert hash(Marker("os_name=='nt'")) == hash(Marker('os_name == "nt"'))
+
+
+def test_merged_marker_roundtrip():
+    marker = (
+        Marker('os_name == "nt" or sys_platform == "win32"')
+        & Marker('python_version >= "3.6"')
+    ) | Marker('os_name == "posix"')
+    assert Marker(str(marker)) == marker
+    assert PackageMarker(str(marker)).evaluate(
+        {"os_name": "posix", "python_version": "2.7"}
+    )
+    assert marker.evaluate({"os_name": "nt", "python_version": "3.7"})
+    assert not marker.evaluate(
+        {"os_name": "nt", "sys_platform": "linux", "python_version": "2.7"}
+    )
@@ -0,0 +1,333 @@
+import functools
+import json
+
+import pytest
+from pip._vendor import requests
+from pip._vendor.packaging.version import parse as parse_version
+
+from pdm.models.candidates import Candidate
+from pdm.models.repositories import PyPIRepository
+from pdm.models.requirements import parse_requirement
+from pdm.models.specifiers import PySpecSet
+from tests import FIXTURES
+
+
+@pytest.fixture()
+def pypi_repository(project):
+    repository = PyPIRepository([], project.environment)
+    yield repository
+    repository.close()
+
+
+def test_prefetch_matches_fetches_each_project_once(pypi_repository, mocker):
+    fetch = mocker.patch.object(pypi_repository, "_fetch_index_page", return_value=[])
+    pypi_repository.prefetch_matches(
+        [
+            parse_requirement("requests"),
+            parse_requirement("Requests>=2.0"),
+            parse_requirement("pytz"),
+            parse_requirement("git+https://github.com/test-root/demo.git#egg=demo"),
+        ]
+    )
+    assert pypi_repository.find_matches(parse_requirement("requests")) == []
+    assert pypi_repository.find_matches(parse_requirement("pytz<2020")) == []
+    fetched = sorted(call[0][1] for call in fetch.call_args_list)
+    assert fetched == ["pytz", "requests"]
+
+
+def test_failed_prefetch_is_fetched_again(pypi_repository, mocker):
+    fetch = mocker.patch.object(
+        pypi_repository, "_fetch_index_page", side_effect=ConnectionError("boom")
+    )
+    pypi_repository.prefetch_matches([parse_requirement("requests")])
+    with pytest.raises(ConnectionError):
+        pypi_repository.find_matches(parse_requirement("requests"))
+    assert fetch.call_count == 2
+
+
+def make_file(filename, requires_python=None):
+    name = filename.split("#")[0]
+    version = name.split("-")[1].replace(".tar.gz", "")
+    return (
+        parse_version(version),
+        {
+            "url": f"https://files.example.org/{filename}",
+            "filename": name,
+            "requires_python": requires_python,
+            "yanked_reason": None,
+        },
+    )
+
+
+def make_response(url, status_code, content=b"", headers=None):
+    resp = requests.models.Response()
+    resp.url = url
+    resp.status_code = status_code
+    resp._content = content
+    resp.headers.update(headers or {})
+    return resp
+
+
+def test_index_page_is_revalidated_from_cache(pypi_repository, mocker):
+    url = "https://pypi.example.org/simple/demo/"
+    page = (
+        b'<html><body><a href="../../files/demo-0.0.1.tar.gz#sha256=abc" '
+        b'data-requires-python="&gt;=3.6">demo-0.0.1.tar.gz</a></body></html>'
+    )
+    session = mocker.Mock()
+    session.get.side_effect = [
+        make_response(url, 200, page, {"Content-Type": "text/html", "ETag": '"v1"'}),
+        make_response(url, 304),
+    ]
+    first = pypi_repository._get_page_records(
+        session, "https://pypi.example.org/simple", "Demo"
+    )
+    second = pypi_repository._get_page_records(
+        session, "https://pypi.example.org/simple", "Demo"
+    )
+
+    assert session.get.call_args_list[0][0][0] == url
+    assert "If-None-Match" not in session.get.call_args_list[0][1]["headers"]
+    assert session.get.call_args_list[1][1]["headers"]["If-None-Match"] == '"v1"'
+    assert first == [
+        {
+            "url": "https://pypi.example.org/files/demo-0.0.1.tar.gz#sha256=abc",
+            "filename": "demo-0.0.1.tar.gz",
+            "requires_python": ">=3.6",
+            "yanked_reason": None,
+        }
+    ]
+    assert second == first
+
+
+def test_index_page_falls_back_to_cache_on_errors(pypi_repository, mocker):
+    url = "https://pypi.example.org/simple/demo/"
+    page = (
+        b'<html><body><a href="demo-0.0.1.tar.gz">demo-0.0.1.tar.gz</a></body></html>'
+    )
+    session = mocker.Mock()
+    session.get.side_effect = [
+        requests.ConnectionError("boom"),
+        make_response(url, 404),
+        make_response(url, 200, page, {"Content-Type": "text/html"}),
+        requests.ConnectionError("boom"),
+        make_response(url, 503),
+    ]
+    get_records = functools.partial(
+        pypi_repository._get_page_records,
+        session,
+        "https://pypi.example.org/simple",
+        "demo",
+    )
+    with pytest.raises(requests.ConnectionError):
+        get_records()
+    assert get_records() == []
+    first = get_records()
+    assert [record["filename"] for record in first] == ["demo-0.0.1.tar.gz"]
+    assert get_records() == first
+    assert get_records() == first
+
+
+def test_index_page_in_json_format(pypi_repository, mocker):
+    url = "https://pypi.example.org/simple/demo/"
+    data = {
+        "meta": {"api-version": "1.0"},
+        "name": "demo",
+        "files": [
+            {
+                "filename": "demo-0.0.1.tar.gz",
+                "url": "../../files/demo-0.0.1.tar.gz",
+                "hashes": {"sha256": "abc"},
+                "requires-python": ">=3.6",
+            },
+            {
+                "filename": "demo-0.0.2-py3-none-any.whl",
+                "url": "https://files.example.org/demo-0.0.2-py3-none-any.whl",
+                "hashes": {},
+                "yanked": "Broken",
+            },
+        ],
+    }
+    session = mocker.Mock()
+    session.get.return_value = make_response(
+        url,
+        200,
+        json.dumps(data).encode(),
+        {"Content-Type": "application/vnd.pypi.simple.v1+json"},
+    )
+    records = pypi_repository._get_page_records(
+        session, "https://pypi.example.org/simple", "demo"
+    )
+
+    accept = session.get.call_args[1]["headers"]["Accept"]
+    assert accept.startswith("application/vnd.pypi.simple.v1+json")
+    assert (
+        records[0]["url"]
+        == "https://pypi.example.org/files/demo-0.0.1.tar.gz#sha256=abc"
+    )
+    assert records[0]["requires_python"] == ">=3.6"
+    assert records[0]["yanked_reason"] is None
+    assert records[1]["filename"] == "demo-0.0.2-py3-none-any.whl"
+    assert records[1]["yanked_reason"] == "Broken"
+
+
+def test_fetch_local_index_page(pypi_repository, tmp_path):
+    artifacts = FIXTURES / "artifacts"
+    page = tmp_path / "simple" / "demo" / "index.html"
+    page.parent.mkdir(parents=True)
+    page.write_text(
+        "<html><body>"
+        + "".join(
+            f'<a href="{path.as_uri()}">{path.name}</a>'
+            for path in sorted(artifacts.glob("demo-*"))
+        )
+        + '<a href="https://example.org/other-0.1.tar.gz">other-0.1.tar.gz</a>'
+        "</body></html>"
+    )
+    source = {"url": (tmp_path / "simple").as_uri(), "name": "local"}
+    files = pypi_repository._fetch_index_page([source], "demo", [])
+
+    assert [(str(version), record["filename"]) for version, record in files] == [
+        ("0.0.1", "demo-0.0.1-py2.py3-none-any.whl"),
+        ("0.0.1", "demo-0.0.1.tar.gz"),
+    ]
+
+
+def test_find_matches_one_candidate_per_version(pypi_repository, mocker):
+    files = [
+        "demo-0.0.1.tar.gz",
+        "demo-0.0.1-cp27-cp27m-macosx_10_6_intel.whl",
+        "demo-0.0.1-py3-none-any.whl",
+        "demo-0.0.2.tar.gz",
+    ]
+    mocker.patch.object(
+        pypi_repository,
+        "_get_index_files",
+        return_value=[
+            make_file(f"{filename}#sha256={i}") for i, filename in enumerate(files)
+        ],
+    )
+    matches = pypi_repository.find_matches(
+        parse_requirement("demo"), allow_prereleases=False, allow_all=True
+    )
+    assert [str(c.version) for c in matches] == ["0.0.1", "0.0.2"]
+    assert matches[0].link.filename == "demo-0.0.1-py3-none-any.whl"
+    assert [link.filename for link in matches[0].iter_links()] == files[:3]
+
+    mocker.patch.object(pypi_repository, "find_matches", return_value=matches[:1])
+    mocker.patch("pdm.models.environment.get_finder")
+    hashes = pypi_repository.get_hashes(matches[0])
+    assert hashes == {filename: f"sha256:{i}" for i, filename in enumerate(files[:3])}
+
+
+def test_find_matches_filters_files_by_requires_python(pypi_repository, mocker):
+    files = [
+        ("demo-0.0.1.tar.gz", ""),
+        ("demo-0.0.1-py3-none-any.whl", ">=3.8"),
+        ("demo-0.0.1-cp27-cp27m-macosx_10_6_intel.whl", ""),
+        ("demo-0.0.2-py3-none-any.whl", ">=3.8"),
+    ]
+    mocker.patch.object(
+        pypi_repository,
+        "_get_index_files",
+        return_value=[make_file(filename, spec) for filename, spec in files],
+    )
+    matches = pypi_repository.find_matches(
+        parse_requirement("demo"), PySpecSet(">=3.6")
+    )
+    assert [str(c.version) for c in matches] == ["0.0.1"]
+    # The sdist is preferred over the wheel that doesn't support the platform.
+    assert matches[0].link.filename == "demo-0.0.1.tar.gz"
+    assert matches[0].requires_python == ""
+    assert len(list(matches[0].iter_links())) == 2
+
+
+def test_get_hashes_of_files_requiring_python(pypi_repository, mocker):
+    files = [
+        ("demo-0.0.1.tar.gz#sha256=0", ">=3.6"),
+        ("demo-0.0.1-py3-none-any.whl#sha256=1", ">=3.8"),
+    ]
+    mocker.patch.object(
+        pypi_repository,
+        "_get_index_files",
+        return_value=[make_file(filename, spec) for filename, spec in files],
+    )
+    candidate = Candidate(
+        parse_requirement("demo"), pypi_repository.environment, version="0.0.1"
+    )
+
+    assert pypi_repository.get_hashes(candidate) == {
+        "demo-0.0.1.tar.gz": "sha256:0",
+        "demo-0.0.1-py3-none-any.whl": "sha256:1",
+    }
+
+
+def test_candidate_info_cache_is_shared_across_extras(pypi_repository, mocker):
+    info = {
+        "requires_python": ">=3.6",
+        "summary": "A demo package",
+        "requires_dist": ["idna", "chardet; extra == 'encoding'"],
+    }
+    finder = mocker.patch("pdm.models.environment.get_finder").return_value
+    finder.session.get.return_value = make_response(
+        "https://pypi.org/pypi/demo/0.0.1/json",
+        200,
+        json.dumps({"info": info}).encode(),
+    )
+
+    def make_candidate(line):
+        return Candidate(
+            parse_requirement(line),
+            pypi_repository.environment,
+            name="demo",
+            version="0.0.1",
+        )
+
+    deps, requires_python, _ = pypi_repository.get_dependencies(make_candidate("demo"))
+    assert [dep.as_line() for dep in deps] == ["idna"]
+    assert str(requires_python) == ">=3.6"
+
+    deps, _, _ = pypi_repository.get_dependencies(make_candidate("demo[encoding]"))
+    assert sorted(dep.as_line() for dep in deps) == ["chardet", "demo", "idna"]
+    assert finder.session.get.call_count == 1
+
+
+def test_get_hashes_downloads_only_as_last_resort(pypi_repository, mocker):
+    files = [
+        "demo-0.0.1.tar.gz#sha256=0",
+        "demo-0.0.1-py3-none-any.whl",
+        "demo-0.0.1-cp38-cp38-win_amd64.whl",
+    ]
+    mocker.patch.object(
+        pypi_repository,
+        "_get_index_files",
+        return_value=[make_file(filename) for filename in files],
+    )
+    release = {
+        "info": {"requires_python": "", "summary": "", "requires_dist": None},
+        "urls": [
+            {"filename": "demo-0.0.1-py3-none-any.whl", "digests": {"sha256": "1"}}
+        ],
+    }
+    finder = mocker.patch("pdm.models.environment.get_finder").return_value
+    finder.session.get.return_value = make_response(
+        "https://pypi.org/pypi/demo/0.0.1/json", 200, json.dumps(release).encode()
+    )
+    download = mocker.patch.object(
+        pypi_repository._hash_cache, "_get_file_hash", return_value="sha256:2"
+    )
+    candidate = Candidate(
+        parse_requirement("demo"), pypi_repository.environment, version="0.0.1"
+    )
+
+    assert pypi_repository.get_hashes(candidate) == {
+        "demo-0.0.1.tar.gz": "sha256:0",
+        "demo-0.0.1-py3-none-any.whl": "sha256:1",
+        "demo-0.0.1-cp38-cp38-win_amd64.whl": "sha256:2",
+    }
+    assert [call[0][0].filename for call in download.call_args_list] == [
+        "demo-0.0.1-cp38-cp38-win_amd64.whl"
+    ]
+    # The JSON API is requested once for both metadata and hashes.
+    pypi_repository.get_dependencies(candidate)
+    assert finder.session.get.call_count == 1
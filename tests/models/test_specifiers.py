@@ -1,3 +1,6 @@
+import gc
+import weakref
+
 import pytest
 from pdm.models.specifiers import PySpecSet
 
@@ -46,13 +49,22 @@ def test_pyspec_and_op(left, right, result):
         (">=3.6", "<3.7", ""),
         (">=3.6,<3.8", ">=3.4,<3.7", ">=3.4,<3.8"),
         ("~=2.7", ">=3.6", ">=2.7,!=3.0.*,!=3.1.*,!=3.2.*,!=3.3.*,!=3.4.*,!=3.5.*"),
-        ("<3.6.5", ">=3.7", "!=3.6.5,!=3.6.6,!=3.6.7,!=3.6.8,!=3.6.9,!=3.6.10"),
+        ("<3.6.5", ">=3.7", "!=3.6.*"),
+        ("<3.6", ">=3.6.2", "!=3.6.0,!=3.6.1"),
+        (">=2.7,!=3.0.*", ">=3.6", ">=2.7,!=3.0.*"),
+        (">=2.7,!=3.0.*,!=3.1.*", ">=3.0,<3.1", ">=2.7,!=3.1.*"),
+        ("<3.6", ">=4.0", "<3.6"),
+        ("!=3.7.*", "==3.7.2", "!=3.7.*"),
+        ("!=3.8.*", "==3.8.2", "!=3.8.*"),
+        ("!=3.10.*", "==3.10.1", "!=3.10.*"),
     ],
 )
 def test_pyspec_or_op(left, right, result):
     left = PySpecSet(left)
     right = PySpecSet(right)
     assert str(left | right) == result
+    # The string form never allows a version out of the union.
+    assert PySpecSet(result).is_subset(left | right)
 
 
 def test_impossible_pyspec():
@@ -64,3 +76,39 @@ def test_impossible_pyspec():
     spec_copy = spec.copy()
     assert spec_copy.is_impossible
     assert str(spec_copy) == "impossible"
+
+
+@pytest.mark.parametrize(
+    "left,right,result",
+    [
+        (">=3.6", ">=3.0", True),
+        (">=3.0", ">=3.6", False),
+        (">=3.6,<3.8", "", True),
+        ("", ">=3.6", False),
+        (">=3.6", ">=2.7,!=3.0.*,!=3.1.*", True),
+        (">=3.0", ">=2.7,!=3.0.*,!=3.1.*", False),
+        (">=3.6,!=3.7.*", ">=3.6,!=3.7.1", True),
+    ],
+)
+def test_pyspec_is_subset_superset(left, right, result):
+    left = PySpecSet(left)
+    right = PySpecSet(right)
+    assert left.is_subset(right) is result
+    assert right.is_superset(left) is result
+    assert left.is_subset(str(right)) is result
+
+
+def test_pyspec_equality_ignores_spelling():
+    assert PySpecSet(">=3.6,!=3.4.*") == PySpecSet(">=3.6.0")
+    assert hash(PySpecSet("~=3.6")) == hash(PySpecSet(">=3.6,<4"))
+    assert PySpecSet(">=3.6") != PySpecSet(">=3.7")
+
+
+def test_pyspec_operations_do_not_keep_instances_alive():
+    left = PySpecSet(">=3.6")
+    right = PySpecSet("<3.8")
+    left & right, left | right, left.is_subset(right)
+    ref = weakref.ref(left)
+    del left
+    gc.collect()
+    assert ref() is None
@@ -1,7 +1,14 @@
 import itertools
+import threading
 
 import pytest
-from pdm.exceptions import NoVersionsAvailable, ResolutionImpossible
+from benchmarks.repository import SyntheticRepository
+from benchmarks.universe import generate_universe, pick_roots
+from pdm.exceptions import (
+    CandidateInfoNotFound,
+    NoVersionsAvailable,
+    ResolutionImpossible,
+)
 from pdm.models.candidates import identify
 from pdm.models.requirements import parse_requirement
 from pdm.models.specifiers import PySpecSet
@@ -10,8 +17,10 @@ from pdm.resolver import (
     EagerUpdateProvider,
     ReusePinProvider,
     SimpleReporter,
+    _calculate_markers_and_pyspecs,
     resolve,
 )
+from pdm.resolver.structs import DirectedGraph
 from tests import FIXTURES
 
 
@@ -23,6 +32,7 @@ def resolve_requirements(
     strategy="reuse",
     preferred_pins=None,
     tracked_names=None,
+    engine="rounds",
 ):
     requirements = {}
     if isinstance(lines, list):
@@ -49,12 +59,17 @@ def resolve_requirements(
         itertools.chain(*[deps.values() for _, deps in requirements.items()])
     )
     reporter = SimpleReporter(flat_reqs)
-    mapping, *_ = resolve(provider, reporter, requirements, requires_python)
+    mapping, *_ = resolve(provider, reporter, requirements, requires_python, engine)
     return mapping
 
 
-def test_resolve_named_requirement(project, repository):
-    result = resolve_requirements(repository, ["requests"])
+@pytest.fixture(params=["rounds", "backtracking"])
+def engine(request):
+    return request.param
+
+
+def test_resolve_named_requirement(project, repository, engine):
+    result = resolve_requirements(repository, ["requests"], engine=engine)
 
     assert result["requests"].version == "2.19.1"
     assert result["urllib3"].version == "1.22"
@@ -94,9 +109,9 @@ def test_resolve_allow_prereleases(project, repository):
         resolve_requirements(repository, ["bar"], allow_prereleases=False)
 
 
-def test_resolve_with_extras(project, repository):
+def test_resolve_with_extras(project, repository, engine):
 
-    result = resolve_requirements(repository, ["requests[socks]"])
+    result = resolve_requirements(repository, ["requests[socks]"], engine=engine)
     assert result["pysocks"].version == "1.5.6"
 
 
@@ -126,7 +141,7 @@ def test_resolve_vcs_and_local_requirements(
     assert result["idna"].version == "2.7"
 
 
-def test_resolving_auto_avoid_conflicts(project, repository):
+def test_resolving_auto_avoid_conflicts(project, repository, engine):
     repository.add_candidate("foo", "0.1.0")
     repository.add_candidate("foo", "0.2.0")
     repository.add_dependencies("foo", "0.1.0", ["hoho<2.0"])
@@ -136,13 +151,13 @@ def test_resolving_auto_avoid_conflicts(project, repository):
     repository.add_candidate("hoho", "2.1")
     repository.add_candidate("hoho", "1.5")
 
-    result = resolve_requirements(repository, ["foo", "bar"])
+    result = resolve_requirements(repository, ["foo", "bar"], engine=engine)
     assert result["foo"].version == "0.1.0"
     assert result["bar"].version == "0.1.0"
     assert result["hoho"].version == "1.5"
 
 
-def test_resolve_conflicting_dependencies(project, repository):
+def test_resolve_conflicting_dependencies(project, repository, engine):
     repository.add_candidate("foo", "0.1.0")
     repository.add_dependencies("foo", "0.1.0", ["hoho>=2.0"])
     repository.add_candidate("bar", "0.1.0")
@@ -150,7 +165,76 @@ def test_resolve_conflicting_dependencies(project, repository):
     repository.add_candidate("hoho", "2.1")
     repository.add_candidate("hoho", "1.5")
     with pytest.raises(ResolutionImpossible):
-        resolve_requirements(repository, ["foo", "bar"])
+        resolve_requirements(repository, ["foo", "bar"], engine=engine)
+
+
+def test_backtracking_jumps_to_conflicting_decision(project, repository):
+    repository.add_candidate("foo", "1.0")
+    repository.add_candidate("foo", "2.0")
+    repository.add_dependencies("foo", "1.0", ["hoho<2.0"])
+    repository.add_dependencies("foo", "2.0", ["hoho>=2.0"])
+    for version in ("1.0", "1.1", "1.2"):
+        repository.add_candidate("bar", version)
+        repository.add_dependencies("bar", version, ["hoho<2.0"])
+    repository.add_candidate("hoho", "1.5")
+    repository.add_candidate("hoho", "2.1")
+
+    result = resolve_requirements(repository, ["foo", "bar"], engine="backtracking")
+    assert result["foo"].version == "1.0"
+    assert result["bar"].version == "1.2"
+    assert result["hoho"].version == "1.5"
+
+
+def test_backtracking_conflict_explanation(project, repository):
+    repository.add_candidate("foo", "0.1.0")
+    repository.add_dependencies("foo", "0.1.0", ["hoho>=2.0"])
+    repository.add_candidate("bar", "0.1.0")
+    repository.add_dependencies("bar", "0.1.0", ["hoho~=1.1"])
+    repository.add_candidate("hoho", "2.1")
+    repository.add_candidate("hoho", "1.5")
+    with pytest.raises(ResolutionImpossible) as excinfo:
+        resolve_requirements(repository, ["foo", "bar"], engine="backtracking")
+    lines = {r.as_line() for r in excinfo.value.requirements}
+    assert {"hoho>=2.0", "hoho~=1.1"} <= lines
+
+
+def test_backtracking_explains_only_last_conflict(project, repository):
+    repository.add_candidate("foo", "1.0")
+    repository.add_candidate("foo", "2.0")
+    repository.add_dependencies("foo", "1.0", ["hoho<2.0"])
+    repository.add_dependencies("foo", "2.0", ["hoho>=2.0"])
+    repository.add_candidate("bar", "1.0")
+    repository.add_dependencies("bar", "1.0", ["hoho<2.0"])
+    repository.add_candidate("hoho", "1.5")
+    repository.add_candidate("hoho", "2.1")
+    repository.add_candidate("baz", "1.0")
+    repository.add_dependencies("baz", "1.0", ["qux>=2.0"])
+    repository.add_candidate("qux", "1.0")
+    repository.add_candidate("qux", "2.0")
+
+    with pytest.raises(ResolutionImpossible) as excinfo:
+        resolve_requirements(
+            repository, ["foo", "bar", "baz", "qux<2.0"], engine="backtracking"
+        )
+    lines = {r.as_line() for r in excinfo.value.requirements}
+    assert {"qux>=2.0", "qux<2.0"} <= lines
+    assert not any(line.startswith("hoho") for line in lines)
+
+
+def test_repinned_parent_drops_stale_dependency_edges(project, repository, engine):
+    repository.add_candidate("foo", "1.0")
+    repository.add_candidate("foo", "2.0")
+    repository.add_dependencies("foo", "2.0", ["bar"])
+    repository.add_candidate("bar", "1.0")
+    repository.add_candidate("bar", "2.0")
+    repository.add_candidate("baz", "1.0")
+    repository.add_dependencies("baz", "1.0", ["qux"])
+    repository.add_candidate("qux", "1.0")
+    repository.add_dependencies("qux", "1.0", ["foo<2", "bar<2"])
+
+    result = resolve_requirements(repository, ["foo", "baz"], engine=engine)
+    assert result["foo"].version == "1.0"
+    assert result["bar"].version == "1.0"
 
 
 def test_resolve_no_available_versions(project, repository):
@@ -191,3 +275,150 @@ def test_resolve_two_extras_from_the_same_package(project, repository):
     result = resolve_requirements(repository, [line])
     assert "pysocks" in result
     assert "pyopenssl" in result
+
+
+def test_prefetched_dependencies_are_reused(project, repository, mocker):
+    repository.add_candidate("foo", "0.1.0")
+    repository.add_dependencies("foo", "0.1.0", ["bar"])
+    provider = BaseProvider(repository, PySpecSet())
+    candidate = provider.find_matches(parse_requirement("foo"))[0]
+    provider.prefetch_dependencies([candidate])
+    spy = mocker.spy(repository, "get_dependencies")
+    dependencies = provider.get_dependencies(candidate)
+    provider.close()
+    assert [dep.as_line() for dep in dependencies] == ["bar"]
+    spy.assert_not_called()
+
+
+def test_prefetch_never_builds_candidates(project, repository, mocker):
+    repository.add_candidate("foo", "0.1.0")
+    provider = BaseProvider(repository, PySpecSet())
+    candidate = provider.find_matches(parse_requirement("foo"))[0]
+    mocker.patch.object(
+        repository,
+        "_get_dependencies_from_fixture",
+        side_effect=CandidateInfoNotFound(candidate),
+    )
+    build = mocker.patch.object(
+        repository, "_get_dependencies_from_metadata", return_value=(["bar"], "", "")
+    )
+    provider.prefetch_dependencies([candidate])
+    with pytest.raises(CandidateInfoNotFound):
+        provider._prefetched[("foo", "0.1.0")].result()
+    build.assert_not_called()
+    dependencies = provider.get_dependencies(candidate)
+    provider.close()
+    assert [dep.as_line() for dep in dependencies] == ["bar"]
+    build.assert_called_once_with(candidate)
+
+
+def test_close_drops_cancelled_prefetches(project, repository, mocker):
+    for name in ("foo", "bar"):
+        repository.add_candidate(name, "0.1.0")
+    started, release = threading.Event(), threading.Event()
+
+    def get_dependencies(candidate, allow_build=True):
+        started.set()
+        release.wait(5)
+        return [], PySpecSet(), ""
+
+    mocker.patch.object(repository, "get_dependencies", side_effect=get_dependencies)
+    provider = BaseProvider(repository, PySpecSet(), prefetch_workers=1)
+    candidates = [
+        provider.find_matches(parse_requirement(name))[0] for name in ("foo", "bar")
+    ]
+    provider.prefetch_dependencies(candidates)
+    started.wait(5)
+    threading.Timer(0.1, release.set).start()
+    provider.close()
+    assert list(provider._prefetched) == [("foo", "0.1.0")]
+
+
+def test_resolve_circular_dependencies(project, repository):
+    repository.add_candidate("foo", "0.1.0")
+    repository.add_dependencies("foo", "0.1.0", ["bar; os_name=='nt'"])
+    repository.add_candidate("bar", "0.1.0")
+    repository.add_dependencies("bar", "0.1.0", ["foo"])
+    result = resolve_requirements(repository, ["foo"])
+    assert result["foo"].marker is None
+    assert str(result["bar"].marker) == 'os_name == "nt"'
+    assert result["bar"].sections == ["default"]
+
+
+def test_resolve_circular_dependencies_from_multiple_parents(project, repository):
+    repository.add_candidate("foo", "0.1.0")
+    repository.add_dependencies("foo", "0.1.0", ["bar; os_name=='nt'"])
+    repository.add_candidate("bar", "0.1.0")
+    repository.add_dependencies("bar", "0.1.0", ["foo"])
+    result = resolve_requirements(repository, ["foo", "bar; sys_platform=='win32'"])
+    assert result["foo"].marker is None
+    assert str(result["bar"].marker) == 'sys_platform == "win32" or os_name == "nt"'
+    assert result["foo"].sections == result["bar"].sections == ["default"]
+
+
+def test_markers_of_diamond_dependencies():
+    # 2 ** 30 paths lead to the bottom, which must not be enumerated.
+    graph = DirectedGraph()
+    graph.add("__default__")
+    dependencies = {"__default__": {}}
+    parents = ["__default__"]
+    for layer in range(30):
+        names = [f"a{layer}", f"b{layer}"]
+        for name in names:
+            graph.add(name)
+            dependencies[name] = {}
+            for parent in parents:
+                graph.connect(parent, name)
+                dependencies[parent][name] = parse_requirement(
+                    f"{name}; os_name=='{name}'" if layer == 0 else name
+                )
+        parents = names
+    pythons = {name: PySpecSet() for name in dependencies}
+    result = _calculate_markers_and_pyspecs(
+        graph, ["__default__"], dependencies, pythons
+    )
+    assert str(result["a29"][0]) == 'os_name == "a0" or os_name == "b0"'
+
+
+def test_markers_of_a_large_dependency_cycle():
+    # Each member depends on all others, the simple paths can't be enumerated.
+    names = [f"c{i}" for i in range(12)]
+    graph = DirectedGraph()
+    graph.add("__default__")
+    dependencies = {"__default__": {}}
+    for name in names:
+        graph.add(name)
+        dependencies[name] = {}
+    for name, python in zip(names, ["3.8", "3.6"]):
+        graph.connect("__default__", name)
+        dependencies["__default__"][name] = parse_requirement(
+            f"{name}; os_name=='{name}' and python_version>='{python}'"
+        )
+    for parent, name in itertools.permutations(names, 2):
+        graph.connect(parent, name)
+        dependencies[parent][name] = parse_requirement(
+            f"{name}; sys_platform=='{parent}'" if parent == "c0" else name
+        )
+    pythons = {name: PySpecSet() for name in dependencies}
+    result = _calculate_markers_and_pyspecs(
+        graph, ["__default__"], dependencies, pythons
+    )
+    assert str(result["c0"][0]) == 'os_name == "c0" or os_name == "c1"'
+    assert (
+        str(result["c1"][0])
+        == 'os_name == "c1" or os_name == "c0" and sys_platform == "c0"'
+    )
+    assert (
+        str(result["c11"][0])
+        == 'os_name == "c0" and sys_platform == "c0" or os_name == "c1"'
+    )
+    assert all(str(result[name][1]) == ">=3.6" for name in names)
+
+
+def test_resolve_synthetic_universe(project, engine):
+    universe = generate_universe(packages=100, versions=5, depth=4, seed=1)
+    assert universe == generate_universe(packages=100, versions=5, depth=4, seed=1)
+    repository = SyntheticRepository(universe, project.environment)
+    roots = pick_roots(universe, 5, seed=1)
+    result = resolve_requirements(repository, roots, ">=3.7", engine=engine)
+    assert set(roots) <= set(result)
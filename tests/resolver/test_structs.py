@@ -0,0 +1,38 @@
+from pdm.resolver.structs import CriteriaStore
+
+
+def test_criteria_store_rollback_restores_changes():
+    store = CriteriaStore()
+    store["a"] = 1
+    store.checkpoint()
+    store["a"] = 2
+    store["b"] = 3
+    assert dict(store.items()) == {"a": 2, "b": 3}
+    store.rollback()
+    assert dict(store.items()) == {"a": 1}
+    assert "b" not in store
+
+
+def test_criteria_store_release_keeps_changes():
+    store = CriteriaStore()
+    store.checkpoint()
+    store["a"] = 1
+    store.checkpoint()
+    store["b"] = 2
+    store.release()
+    assert dict(store.items()) == {"a": 1, "b": 2}
+    store.rollback()
+    assert len(store) == 0
+
+
+def test_criteria_store_rollback_to_level():
+    store = CriteriaStore()
+    store["a"] = 0
+    for i in range(1, 4):
+        level = store.checkpoint()
+        assert level == i
+        store["a"] = i
+    store.rollback_to(2)
+    assert store["a"] == 1
+    store.rollback_to(1)
+    assert store["a"] == 0
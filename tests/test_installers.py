@@ -0,0 +1,148 @@
+import base64
+import hashlib
+import os
+import zipfile
+from collections import namedtuple
+
+from distlib.wheel import Wheel
+from pdm.installers import Installer, Synchronizer, _group_by_install_roots
+from pdm.utils import link_file
+
+Requirement = namedtuple("Requirement", "key,editable")
+
+
+class Candidate(namedtuple("Candidate", "req,name,version,wheel")):
+    def format(self):
+        return self.name
+
+
+def make_wheel(directory, name, files):
+    info_dir = f"{name}-0.1.0.dist-info"
+    metadata = f"Metadata-Version: 2.1\nName: {name}\nVersion: 0.1.0\n"
+    files = {
+        f"{info_dir}/METADATA": metadata,
+        f"{info_dir}/WHEEL": "Wheel-Version: 1.0\nRoot-Is-Purelib: true\n",
+        **files,
+    }
+    path = directory / f"{name}-0.1.0-py3-none-any.whl"
+    with zipfile.ZipFile(path, "w") as zf:
+        records = []
+        for filename, content in files.items():
+            data = content.encode()
+            digest = base64.urlsafe_b64encode(hashlib.sha256(data).digest())
+            digest = digest.rstrip(b"=").decode()
+            records.append(f"{filename},sha256={digest},{len(data)}\n")
+            zf.writestr(filename, data)
+        records.append(f"{info_dir}/RECORD,,\n")
+        zf.writestr(f"{info_dir}/RECORD", "".join(records))
+    return Wheel(str(path))
+
+
+def make_candidate(name, wheel=None, editable=False):
+    return Candidate(Requirement(name, editable), name, "0.1.0", wheel)
+
+
+def test_group_wheels_writing_same_paths(tmp_path):
+    candidates = [
+        make_candidate(name, make_wheel(tmp_path, name, files))
+        for name, files in [
+            ("foo", {"ns/foo/__init__.py": ""}),
+            ("cli", {"cli/__init__.py": ""}),
+            ("bar", {"ns/bar/__init__.py": ""}),
+            (
+                "baz",
+                {
+                    "baz.py": "",
+                    "baz-0.1.0.dist-info/entry_points.txt": (
+                        "[console_scripts]\nCli = baz:main\n"
+                    ),
+                },
+            ),
+            ("qux", {"qux-0.1.0.data/scripts/Cli": "#!python\n"}),
+            ("quux", {"quux-0.1.0.data/platlib/quux.so": ""}),
+        ]
+    ]
+    groups = _group_by_install_roots(candidates)
+    assert sorted([can.name for can in group] for group in groups) == [
+        ["baz", "qux"],
+        ["cli"],
+        ["foo", "bar"],
+        ["quux"],
+    ]
+
+
+def test_install_candidates_in_parallel(project, working_set, tmp_path):
+    project.config["install_workers"] = 4
+    candidates = [
+        make_candidate("editable", editable=True),
+        make_candidate("foo", make_wheel(tmp_path, "foo", {"foo.py": ""})),
+        make_candidate("bar", make_wheel(tmp_path, "bar", {"bar.py": ""})),
+    ]
+    synchronizer = Synchronizer({}, project.environment)
+    installer = synchronizer.get_installer()
+    synchronizer.install_candidates(candidates)
+
+    assert sorted(working_set) == ["bar", "editable", "foo"]
+    assert installer.prepare.call_count == 3
+    # The editable one is installed after all wheels.
+    assert installer.install.call_args_list[-1][0][0].name == "editable"
+
+
+def test_install_candidates_one_by_one(project, working_set):
+    project.config["install_workers"] = 1
+    synchronizer = Synchronizer({}, project.environment)
+    installer = synchronizer.get_installer()
+    synchronizer.install_candidates([make_candidate("foo"), make_candidate("bar")])
+
+    assert list(working_set) == ["foo", "bar"]
+    installer.prepare.assert_not_called()
+
+
+def test_install_wheel_from_package_store(project, tmp_path):
+    project.config["install_cache"] = True
+    wheel = make_wheel(
+        tmp_path,
+        "foo",
+        {
+            "foo/__init__.py": "def main():\n    pass\n",
+            "foo-0.1.0.data/scripts/foo-tool": "#!python\nprint('foo')\n",
+            "foo-0.1.0.dist-info/entry_points.txt": (
+                "[console_scripts]\nfoo = foo:main\n"
+            ),
+        },
+    )
+    Installer(project.environment).install_wheel(wheel)
+
+    paths = project.environment.get_paths()
+    lib = os.path.join(paths["purelib"], "foo", "__init__.py")
+    stored = list((tmp_path / "caches" / "packages").glob("*/*/foo/__init__.py"))
+    assert len(stored) == 1 and os.path.samefile(lib, stored[0])
+    for script in ("foo", "foo-tool"):
+        script_path = os.path.join(paths["scripts"], script)
+        with open(script_path) as fp:
+            assert project.environment.python_executable in fp.readline()
+        assert not os.path.samefile(script_path, stored[0])
+
+    record = os.path.join(paths["purelib"], "foo-0.1.0.dist-info", "RECORD")
+    with open(record) as fp:
+        rows = {line.split(",")[0] for line in fp.read().splitlines()}
+    assert rows >= {
+        os.path.join("foo", "__init__.py"),
+        "foo-0.1.0.dist-info/METADATA",
+        "foo-0.1.0.dist-info/entry_points.txt",
+        "foo-0.1.0.dist-info/RECORD",
+        os.path.relpath(os.path.join(paths["scripts"], "foo"), paths["purelib"]),
+        os.path.relpath(os.path.join(paths["scripts"], "foo-tool"), paths["purelib"]),
+    }
+
+
+def test_link_file_falls_back_to_copy(tmp_path, mocker):
+    src, dst = tmp_path / "src.py", tmp_path / "dst.py"
+    src.write_text("content")
+    dst.write_text("old")
+    assert link_file(str(src), str(dst), "hardlink") == "hardlink"
+    assert os.path.samefile(src, dst)
+
+    mocker.patch("os.link", side_effect=OSError("Invalid cross-device link"))
+    assert link_file(str(src), str(dst), "hardlink") == "copy"
+    assert dst.read_text() == "content" and not os.path.samefile(src, dst)